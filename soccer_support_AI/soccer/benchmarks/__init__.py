@@ -0,0 +1,16 @@
+"""Offline benchmarks for every pipeline stage (no GPU, network or model weights)."""
+
+from .harness import BenchResult, StageTimer, compare_results, load_results, run_stage, save_results
+from .stages import PRESETS, BenchConfig, run_all
+
+__all__ = [
+    "BenchResult",
+    "StageTimer",
+    "run_stage",
+    "save_results",
+    "load_results",
+    "compare_results",
+    "BenchConfig",
+    "PRESETS",
+    "run_all",
+]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+import numpy as np
+
+
+@dataclass
+class BenchResult:
+    name: str
+    unit: str
+    items: int
+    seconds: float
+    throughput: float  # items per second
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    peak_mem_mb: float
+
+
+class StageTimer:
+    """Collects per-step latencies inside a stage body."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+
+    @contextlib.contextmanager
+    def step(self) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        self.latencies.append(time.perf_counter() - start)
+
+
+def run_stage(
+    name: str, unit: str, body: Callable[[StageTimer], int], measure_memory: bool = True
+) -> BenchResult:
+    """Run ``body``; it times its steps on the timer and returns the item count.
+
+    Timing comes from a plain run. Peak memory (tracemalloc high-water mark,
+    which includes NumPy buffers) comes from a second run, because tracing
+    allocations would distort the timings.
+    """
+    timer = StageTimer()
+    items = body(timer)
+    peak = 0
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            body(StageTimer())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    latencies = np.asarray(timer.latencies or [0.0])
+    seconds = float(latencies.sum())
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+    return BenchResult(
+        name=name,
+        unit=unit,
+        items=int(items),
+        seconds=seconds,
+        throughput=items / seconds if seconds > 0 else 0.0,
+        latency_p50_ms=float(p50),
+        latency_p95_ms=float(p95),
+        latency_p99_ms=float(p99),
+        peak_mem_mb=peak / 2**20,
+    )
+
+
+def save_results(results: List[BenchResult], path: str | Path, config: dict | None = None) -> None:
+    payload = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "config": config or {},
+        "results": [asdict(r) for r in results],
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def load_results(path: str | Path) -> Dict[str, BenchResult]:
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {r["name"]: BenchResult(**r) for r in payload["results"]}
+
+
+def compare_results(
+    results: List[BenchResult],
+    baseline: Dict[str, BenchResult],
+    tolerance: float = 0.15,
+) -> List[str]:
+    """Return a message for every stage slower or hungrier than baseline beyond ``tolerance``."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        if base.throughput > 0 and result.throughput < base.throughput * (1.0 - tolerance):
+            regressions.append(
+                f"{result.name}: throughput {result.throughput:,.0f} {result.unit}/s "
+                f"vs baseline {base.throughput:,.0f} ({result.throughput / base.throughput - 1:+.0%})"
+            )
+        if base.peak_mem_mb > 1.0 and result.peak_mem_mb > base.peak_mem_mb * (1.0 + tolerance):
+            regressions.append(
+                f"{result.name}: peak memory {result.peak_mem_mb:.1f} MB "
+                f"vs baseline {base.peak_mem_mb:.1f} MB ({result.peak_mem_mb / base.peak_mem_mb - 1:+.0%})"
+            )
+    return regressions
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import tempfile
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from soccer.core.calibration import AutoCalibrator
+from soccer.core.homography import HomographySequence
+from soccer.core.metrics import ExpectedThreatTable, compute_xt
+from soccer.core.possession import infer_possession
+from soccer.core.reid import EmbeddingGallery
+from soccer.core.smoothing import smooth_tracks
+from soccer.core.spatial_index import SpatialIndex, build_spatial_index
+from soccer.core.teams import kit_features
+from soccer.core.vaep import VAEPModel, value_actions
+from soccer.core.xt_training import XTConfig, fit_xt
+from soccer.core.track_store import PROJECTED_COLUMNS, TrackStoreReader, TrackStoreWriter
+from soccer.core.tracking import ByteTracker, IOUTracker
+from soccer.core.video_io import IngestConfig, iter_batches, iter_frames, make_ingest, open_video
+from soccer.core.warp import project_track_arrays
+
+from .harness import BenchResult, StageTimer, run_stage
+from .synthetic import (
+    StubDetector,
+    iter_broadcast_frames,
+    iter_synthetic_detections,
+    synthetic_actions,
+    synthetic_ball_columns,
+    synthetic_track_columns,
+    write_synthetic_video,
+    write_xt_table,
+)
+
+# Image-to-pitch homography for a 1920x1080 broadcast view (metres).
+EXAMPLE_H = np.array(
+    [[0.055, 0.004, -1.5], [0.0, 0.095, -19.0], [0.0, 0.0002, 1.0]], dtype=np.float64
+)
+
+
+@dataclass
+class BenchConfig:
+    decode_frames: int = 300
+    frame_width: int = 1280
+    frame_height: int = 720
+    detect_batch_size: int = 8
+    track_frames: int = 5000
+    calibration_frames: int = 200
+    players: int = 25
+    rows: int = 1_000_000  # projected samples for projection / xT / store stages
+    vaep_games: int = 380  # a league season of action tables
+    chunk_rows: int = 65536
+    seed: int = 0
+
+
+PRESETS: Dict[str, BenchConfig] = {
+    "quick": BenchConfig(
+        decode_frames=100, track_frames=1000, calibration_frames=50, rows=200_000, vaep_games=40
+    ),
+    "default": BenchConfig(),
+    # A 90-minute match at 25 fps with ~22 tracked players.
+    "match": BenchConfig(
+        decode_frames=1500,
+        frame_width=1920,
+        frame_height=1080,
+        track_frames=135_000,
+        rows=3_000_000,
+    ),
+}
+
+
+def _decode(video: Path, ingest_config: IngestConfig | None = None) -> Callable[[StageTimer], int]:
+    def body(timer: StageTimer) -> int:
+        frames = 0
+        with open_video(str(video)) as cap:
+            stream = iter_frames(cap, ingest=make_ingest(cap, ingest_config))
+            while True:
+                with timer.step():
+                    item = next(stream, None)
+                if item is None:
+                    break
+                frames += 1
+        return frames
+
+    return body
+
+
+def _detect(video: Path, cfg: BenchConfig) -> Callable[[StageTimer], int]:
+    def body(timer: StageTimer) -> int:
+        detector = StubDetector(seed=cfg.seed)
+        frames = 0
+        with open_video(str(video)) as cap:
+            for batch in iter_batches(iter_frames(cap), cfg.detect_batch_size):
+                images = [frame for _, frame in batch]
+                with timer.step():
+                    detector.detect_batch(images)
+                frames += len(batch)
+        return frames
+
+    return body
+
+
+def _track(tracker_cls, cfg: BenchConfig) -> Callable[[StageTimer], int]:
+    def body(timer: StageTimer) -> int:
+        tracker = tracker_cls()
+        detections = iter_synthetic_detections(cfg.track_frames, cfg.players, seed=cfg.seed)
+        for frame_idx, frame_detections in enumerate(detections):
+            with timer.step():
+                tracker.update(frame_detections, frame_idx)
+        return cfg.track_frames
+
+    return body
+
+
+def _reid_gallery(cfg: BenchConfig) -> Callable[[StageTimer], int]:
+    """Lookups of one new track against a gallery of 500 identities x 16 embeddings."""
+    rng = np.random.default_rng(cfg.seed)
+
+    def unit_rows(n: int) -> np.ndarray:
+        rows = rng.normal(size=(n, 128)).astype(np.float32)
+        return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+    gallery = EmbeddingGallery(128, size=16)
+    for identity in range(500):
+        gallery.add(identity, unit_rows(16), identity)
+    queries = unit_rows(2000)
+    visible = list(range(22))
+
+    def body(timer: StageTimer) -> int:
+        for query in queries:
+            with timer.step():
+                gallery.similarities(query, exclude=visible, since=0)
+        return len(queries)
+
+    return body
+
+
+def _team_features(cfg: BenchConfig) -> Callable[[StageTimer], int]:
+    """Kit colour features of every player of a frame, two kits on a green pitch."""
+    rng = np.random.default_rng(cfg.seed)
+    frame = np.empty((cfg.frame_height, cfg.frame_width, 3), dtype=np.uint8)
+    frame[:] = (40, 140, 40)
+    corner = rng.uniform([0, 0], [cfg.frame_width - 40, cfg.frame_height - 90], size=(cfg.players, 2))
+    boxes = np.hstack([corner, corner + [35, 90]])
+    for i, (x, y) in enumerate(corner.astype(int)):
+        shirt = (40, 40, 200) if i % 2 else (230, 230, 230)
+        cv2.rectangle(frame, (x, y + 14), (x + 35, y + 45), shirt, -1)
+        cv2.rectangle(frame, (x, y + 45), (x + 35, y + 72), (30, 30, 30), -1)
+    frames = 500
+
+    def body(timer: StageTimer) -> int:
+        for _ in range(frames):
+            with timer.step():
+                kit_features(frame, boxes)
+        return frames * cfg.players
+
+    return body
+
+
+def _calibrate(cfg: BenchConfig) -> Callable[[StageTimer], int]:
+    def body(timer: StageTimer) -> int:
+        size = (cfg.frame_width, cfg.frame_height)
+        frames = iter_broadcast_frames(cfg.calibration_frames, *size, seed=cfg.seed)
+        calibrator = AutoCalibrator(size)
+        for frame_idx, (frame, _) in enumerate(frames):
+            with timer.step():
+                calibrator.update(frame_idx, frame)
+        return cfg.calibration_frames
+
+    return body
+
+
+def _project(columns: Dict[str, np.ndarray], H, cfg: BenchConfig) -> Callable[[StageTimer], int]:
+    def body(timer: StageTimer) -> int:
+        for lo in range(0, len(columns["frame_index"]), cfg.chunk_rows):
+            hi = lo + cfg.chunk_rows
+            with timer.step():
+                project_track_arrays(columns["frame_index"][lo:hi], columns["bbox"][lo:hi], H)
+        return len(columns["frame_index"])
+
+    return body
+
+
+def _xt(samples: pd.DataFrame, table: ExpectedThreatTable) -> Callable[[StageTimer], int]:
+    def body(timer: StageTimer) -> int:
+        with timer.step():
+            compute_xt(samples, table)
+        return len(samples)
+
+    return body
+
+
+def _smoothing(columns: Dict[str, np.ndarray]) -> Callable[[StageTimer], int]:
+    pitch = {name: columns[name] for name in ("pitch_x", "pitch_y")}
+
+    def body(timer: StageTimer) -> int:
+        with timer.step():
+            smooth_tracks(columns["track_id"], columns["frame_index"], pitch)
+        return len(columns["track_id"])
+
+    return body
+
+
+def _possession(
+    columns: Dict[str, np.ndarray], ball: Dict[str, np.ndarray]
+) -> Callable[[StageTimer], int]:
+    def body(timer: StageTimer) -> int:
+        with timer.step():
+            infer_possession(columns, ball)
+        return len(columns["frame_index"])
+
+    return body
+
+
+def _vaep(cfg: BenchConfig) -> Callable[[StageTimer], int]:
+    actions = synthetic_actions(cfg.vaep_games, seed=cfg.seed)
+    model = VAEPModel().fit(actions[actions["game_id"] < max(cfg.vaep_games // 4, 1)])
+
+    def body(timer: StageTimer) -> int:
+        with timer.step():
+            value_actions(actions, model)
+        return len(actions)
+
+    return body
+
+
+def _spatial_query(columns: Dict[str, np.ndarray], path: Path) -> Callable[[StageTimer], int]:
+    """Players within 10 m of a point in every frame of 10 s windows, over an index on disk."""
+    build_spatial_index(columns, path, PROJECTED_COLUMNS)
+    index = SpatialIndex(path)
+    last = int(columns["frame_index"][-1])
+    windows = [np.arange(lo, lo + 250) for lo in range(0, max(last - 250, 1), max(last // 200, 250))]
+
+    def body(timer: StageTimer) -> int:
+        for frames in windows:
+            with timer.step():
+                index.within_radius(frames, 52.5, 34.0, 10.0)
+        return len(windows)
+
+    return body
+
+
+def _xt_train(cfg: BenchConfig) -> Callable[[StageTimer], int]:
+    """Learn a fine 192x128 xT grid from a season of actions."""
+    actions = synthetic_actions(cfg.vaep_games, seed=cfg.seed)
+
+    def body(timer: StageTimer) -> int:
+        with timer.step():
+            fit_xt(actions, XTConfig(nx=192, ny=128))
+        return len(actions)
+
+    return body
+
+
+def _store_write(columns: Dict[str, np.ndarray], path: Path, cfg: BenchConfig):
+    def body(timer: StageTimer) -> int:
+        with TrackStoreWriter(path, columns=PROJECTED_COLUMNS, chunk_size=cfg.chunk_rows) as writer:
+            for lo in range(0, len(columns["track_id"]), cfg.chunk_rows):
+                chunk = {name: arr[lo : lo + cfg.chunk_rows] for name, arr in columns.items()}
+                with timer.step():
+                    writer.write_columns(**chunk)
+        return len(columns["track_id"])
+
+    return body
+
+
+def _store_read(path: Path, cfg: BenchConfig):
+    def body(timer: StageTimer) -> int:
+        rows = 0
+        chunks = TrackStoreReader(path).iter_chunks(cfg.chunk_rows)
+        while True:
+            with timer.step():
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            rows += len(chunk["track_id"])
+        return rows
+
+    return body
+
+
+def _pitch_ingest(cfg: BenchConfig) -> IngestConfig:
+    """Crop off a broadcast-style scoreboard band and stands, then halve the width."""
+    return IngestConfig(
+        roi=(0, cfg.frame_height // 10, cfg.frame_width, cfg.frame_height * 9 // 10),
+        target_width=cfg.frame_width // 2,
+    )
+
+
+STAGES = (
+    "decode",
+    "decode_ingest",
+    "detect_stub",
+    "track_iou",
+    "track_bytetrack",
+    "reid_gallery",
+    "team_features",
+    "calibration",
+    "project_static",
+    "project_sequence",
+    "smoothing",
+    "compute_xt",
+    "xt_train",
+    "possession",
+    "spatial_query",
+    "vaep",
+    "store_write",
+    "store_read",
+)
+
+
+def run_all(
+    config: BenchConfig,
+    stages: Sequence[str] | None = None,
+    measure_memory: bool = True,
+    log: Callable[[str], None] = print,
+) -> List[BenchResult]:
+    """Build synthetic inputs in a temp dir and benchmark the selected stages."""
+    selected = list(stages or STAGES)
+    unknown = set(selected) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}")
+    results: List[BenchResult] = []
+    with tempfile.TemporaryDirectory(prefix="soccer-bench-") as tmp:
+        tmp = Path(tmp)
+        video = tmp / "synthetic.avi"
+        if {"decode", "decode_ingest", "detect_stub"} & set(selected):
+            write_synthetic_video(
+                video, config.decode_frames, config.frame_width, config.frame_height, seed=config.seed
+            )
+        columns = synthetic_track_columns(config.rows, seed=config.seed)
+        samples = pd.DataFrame(
+            {name: columns[name] for name in ("track_id", "frame_index", "pitch_x", "pitch_y")}
+        )
+        ball = synthetic_ball_columns(columns, seed=config.seed)
+        write_xt_table(tmp / "xt.csv")
+        xt_table = ExpectedThreatTable(csv_path=str(tmp / "xt.csv"))
+        keyframes = np.arange(0, int(columns["frame_index"].max()) + 250, 250)
+        drift = np.zeros((len(keyframes), 3, 3))
+        drift[:, 0, 2] = np.sin(keyframes / 500.0)
+        sequence = HomographySequence(keyframes, EXAMPLE_H[None] + drift)
+
+        bodies = {
+            "decode": ("frames", lambda: _decode(video)),
+            "decode_ingest": ("frames", lambda: _decode(video, _pitch_ingest(config))),
+            "detect_stub": ("frames", lambda: _detect(video, config)),
+            "track_iou": ("frames", lambda: _track(IOUTracker, config)),
+            "track_bytetrack": ("frames", lambda: _track(ByteTracker, config)),
+            "reid_gallery": ("queries", lambda: _reid_gallery(config)),
+            "team_features": ("crops", lambda: _team_features(config)),
+            "calibration": ("frames", lambda: _calibrate(config)),
+            "project_static": ("rows", lambda: _project(columns, EXAMPLE_H, config)),
+            "project_sequence": ("rows", lambda: _project(columns, sequence, config)),
+            "smoothing": ("rows", lambda: _smoothing(columns)),
+            "compute_xt": ("rows", lambda: _xt(samples, xt_table)),
+            "xt_train": ("actions", lambda: _xt_train(config)),
+            "possession": ("rows", lambda: _possession(columns, ball)),
+            "spatial_query": ("queries", lambda: _spatial_query(columns, tmp / "index")),
+            "vaep": ("actions", lambda: _vaep(config)),
+            "store_write": ("rows", lambda: _store_write(columns, tmp / "store", config)),
+            "store_read": ("rows", lambda: _store_read(tmp / "store", config)),
+        }
+        if "store_read" in selected and "store_write" not in selected:
+            _store_write(columns, tmp / "store", config)(StageTimer())
+        for name in STAGES:
+            if name not in selected:
+                continue
+            unit, make_body = bodies[name]
+            result = run_stage(name, unit, make_body(), measure_memory=measure_memory)
+            log(format_result(result))
+            results.append(result)
+    return results
+
+
+def format_result(r: BenchResult) -> str:
+    return (
+        f"{r.name:<17} {r.throughput:>14,.0f} {r.unit}/s  "
+        f"p50 {r.latency_p50_ms:8.3f} ms  p95 {r.latency_p95_ms:8.3f} ms  "
+        f"p99 {r.latency_p99_ms:8.3f} ms  peak {r.peak_mem_mb:8.1f} MB"
+    )
+
+
+def config_dict(config: BenchConfig) -> dict:
+    return asdict(config)
+
+
+def with_overrides(config: BenchConfig, **overrides) -> BenchConfig:
+    return replace(config, **{k: v for k, v in overrides.items() if v is not None})
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from soccer.core.types import Detection
+
+
+def write_synthetic_video(
+    path: str | Path, frames: int, width: int, height: int, fps: float = 25.0, seed: int = 0
+) -> None:
+    """Green pitch with moving player-sized blobs, MJPG encoded."""
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    pos = rng.uniform([0, 0], [width - 40, height - 90], size=(22, 2))
+    background = np.zeros((height, width, 3), dtype=np.uint8)
+    background[:] = (40, 140, 40)
+    for _ in range(frames):
+        pos = np.clip(pos + rng.normal(0, 3, size=pos.shape), 0, [width - 40, height - 90])
+        frame = background.copy()
+        for x, y in pos.astype(int):
+            cv2.rectangle(frame, (x, y), (x + 30, y + 80), (230, 230, 230), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def iter_broadcast_frames(
+    frames: int, width: int, height: int, seed: int = 0
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """``(frame, image_to_pitch_H)`` of a panning broadcast camera with one hard cut.
+
+    Markings are rendered from :func:`camera_homography` on a striped pitch
+    surrounded by stands, with white-shirted player blobs and sensor noise as
+    clutter for line detection.
+    """
+    from soccer.core.calibration import camera_homography, pitch_polylines
+
+    rng = np.random.default_rng(seed)
+    runs = pitch_polylines(spacing=0.5)
+    surround = np.array([[-4.0, -4.0], [109.0, -4.0], [109.0, 72.0], [-4.0, 72.0]])
+    corners = zip(surround, np.roll(surround, -1, axis=0))
+    edge = np.concatenate([a + np.linspace(0, 1, 200)[:, None] * (b - a) for a, b in corners])
+    # (position, pan, tilt, fov) of the two shots, each centred on the middle third of the pitch.
+    shots = [((52.5, -35.0, 17.0), 8.0, 15.0, 42.0), ((50.0, -45.0, 24.0), -10.0, 17.0, 34.0)]
+    stripe = (np.arange(width) // max(width // 12, 1)) % 2 == 1
+    for i in range(frames):
+        shot = 0 if i < frames // 2 else 1
+        position, pan, tilt, fov = shots[shot]
+        t = i - shot * (frames // 2)
+        H = camera_homography(
+            (width, height), pan + 15.0 * np.sin(t / 80.0), tilt, fov + 4.0 * np.sin(t / 110.0), position
+        )
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:] = (90, 80, 70)  # stands
+        q = np.column_stack([edge, np.ones(len(edge))]) @ H.T
+        outline = (q[q[:, 2] > 0, :2] / q[q[:, 2] > 0, 2:3]).round().astype(np.int32)
+        grass = np.zeros((height, width), dtype=np.uint8)
+        cv2.fillPoly(grass, [outline], 1)
+        frame[(grass > 0) & ~stripe] = (40, 130, 40)
+        frame[(grass > 0) & stripe] = (45, 145, 45)
+        for run in runs:
+            q = np.column_stack([run, np.ones(len(run))]) @ H.T
+            front = q[:, 2] > 0
+            if front.sum() > 1:
+                pts = (q[front, :2] / q[front, 2:3]).round().astype(np.int32)
+                cv2.polylines(frame, [pts], False, (235, 235, 235), 2, cv2.LINE_AA)
+        for x, y in rng.uniform([0, height // 4], [width - 20, height - 50], size=(20, 2)).astype(int):
+            cv2.rectangle(frame, (x, y), (x + 14, y + 40), (230, 230, 230), -1)
+        noise = rng.normal(0, 4, size=frame.shape)
+        yield np.clip(frame + noise, 0, 255).astype(np.uint8), np.linalg.inv(H)
+
+
+def iter_synthetic_detections(
+    frames: int, players: int, seed: int = 0
+) -> Iterator[List[Detection]]:
+    """Random-walk players with jitter, missed detections and low-score clutter."""
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([0, 200], [1800, 900], size=(players, 2))
+    vel = rng.normal(0.0, 3.0, size=(players, 2))
+    size = rng.uniform([25, 60], [40, 110], size=(players, 2))
+    for _ in range(frames):
+        vel = 0.9 * vel + rng.normal(0.0, 1.0, size=vel.shape)
+        pos = np.clip(pos + vel, [0, 0], [1880, 1000])
+        boxes = np.hstack([pos, pos + size]) + rng.normal(0.0, 1.5, size=(players, 4))
+        scores = rng.uniform(0.2, 1.0, size=players)
+        visible = rng.random(players) > 0.05
+        yield [
+            Detection(tuple(box), score, 0)
+            for box, score in zip(boxes[visible].tolist(), scores[visible].tolist())
+        ]
+
+
+def synthetic_track_columns(rows: int, tracks: int = 30, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Track-store columns (plus pitch coordinates) sorted by frame, ``tracks`` per frame."""
+    rng = np.random.default_rng(seed)
+    frame_index = (np.arange(rows) // tracks).astype(np.int32)
+    track_id = (np.arange(rows) % tracks + 1).astype(np.int32)
+    x = rng.uniform(0, 1880, size=rows).astype(np.float32)
+    y = rng.uniform(200, 1000, size=rows).astype(np.float32)
+    bbox = np.column_stack([x, y, x + 35, y + 85]).astype(np.float32)
+    return {
+        "track_id": track_id,
+        "frame_index": frame_index,
+        "bbox": bbox,
+        "score": rng.uniform(0.3, 1.0, size=rows).astype(np.float32),
+        "pitch_x": rng.uniform(0, 105, size=rows).astype(np.float32),
+        "pitch_y": rng.uniform(0, 68, size=rows).astype(np.float32),
+        "valid": np.ones(rows, dtype=np.uint8),
+    }
+
+
+def synthetic_ball_columns(
+    columns: Dict[str, np.ndarray], tracks: int = 30, seed: int = 0
+) -> Dict[str, np.ndarray]:
+    """Ball pitch positions next to one player per frame of ``columns``, with 20% of frames missing."""
+    rng = np.random.default_rng(seed)
+    frames = int(columns["frame_index"][-1]) + 1
+    owner = np.arange(frames) * tracks + rng.integers(0, tracks, size=frames)
+    keep = (rng.random(frames) > 0.2) & (owner < len(columns["frame_index"]))
+    rows = owner[keep]
+    return {
+        "frame_index": columns["frame_index"][rows],
+        "pitch_x": columns["pitch_x"][rows] + rng.normal(0, 0.3, size=len(rows)).astype(np.float32),
+        "pitch_y": columns["pitch_y"][rows] + rng.normal(0, 0.3, size=len(rows)).astype(np.float32),
+    }
+
+
+def synthetic_actions(games: int, actions_per_game: int = 1600, seed: int = 0) -> pd.DataFrame:
+    """Action tables (see :mod:`soccer.core.events`) for ``games`` matches.
+
+    Two teams move the ball up the pitch in possession chains that end in a
+    turnover or, close to goal, in a shot that scores more often from nearby.
+    """
+    from soccer.core.events import ACTION_COLUMNS, ACTION_TYPES
+    from soccer.core.metrics import segment_starts
+
+    rng = np.random.default_rng(seed)
+    tables = []
+    n = actions_per_game
+    for game in range(games):
+        chain = np.cumsum(rng.random(n) < 0.15)
+        starts = segment_starts(chain)
+        last = np.r_[starts[1:] - 1, n - 1]
+        team = (chain + game) % 2
+        step = rng.normal(6.0, 8.0, size=n)
+        run = np.cumsum(step)
+        offset = np.repeat(run[starts] - step[starts], np.diff(np.r_[starts, n]))
+        start_ax = np.clip(rng.uniform(5, 60, size=chain[-1] + 1)[chain] + run - offset - step, 0, 104)
+        end_ax = np.clip(start_ax + step, 0, 104)
+        start_ay = rng.uniform(5, 63, size=n)
+        end_ay = np.clip(start_ay + rng.normal(0, 8, size=n), 0, 68)
+        type_code = (rng.random(n) < 0.5).astype(np.int8)
+        result = np.ones(n, dtype=np.int8)
+        shot = np.zeros(n, dtype=bool)
+        shot[last] = start_ax[last] > 80
+        result[last] = 0
+        distance = np.hypot(105 - start_ax, start_ay - 34)
+        goal = shot & (rng.random(n) < 0.5 / (1 + np.exp((distance - 12) / 4)))
+        type_code[shot] = 2
+        end_ax[shot] = 105.0
+        end_ay[goal] = 34.0
+        result[goal] = 1
+        direction = np.where(team == 0, 1, -1).astype(np.int8)
+        mirror = direction < 0
+        frame_start = np.cumsum(rng.integers(10, 80, size=n))
+        tables.append(
+            pd.DataFrame(
+                {
+                    "game_id": game,
+                    "action_id": np.arange(n),
+                    "frame_start": frame_start,
+                    "frame_end": frame_start + rng.integers(5, 40, size=n),
+                    "track_id": team * 11 + rng.integers(1, 12, size=n),
+                    "team": team,
+                    "direction": direction,
+                    "type": pd.Categorical.from_codes(type_code, ACTION_TYPES),
+                    "start_x": np.where(mirror, 105 - start_ax, start_ax),
+                    "start_y": np.where(mirror, 68 - start_ay, start_ay),
+                    "end_x": np.where(mirror, 105 - end_ax, end_ax),
+                    "end_y": np.where(mirror, 68 - end_ay, end_ay),
+                    "result": result,
+                    "goal": goal.astype(np.int8),
+                },
+                columns=list(ACTION_COLUMNS),
+            )
+        )
+    return pd.concat(tables, ignore_index=True)
+
+
+def write_xt_table(path: str | Path, nx: int = 16, ny: int = 12) -> None:
+    xs, ys = np.meshgrid(np.arange(nx), np.arange(ny))
+    value = (xs / (nx - 1)) ** 2 * np.exp(-(((ys - (ny - 1) / 2) / ny) ** 2) * 4)
+    pd.DataFrame({"x_bin": xs.ravel(), "y_bin": ys.ravel(), "value": value.ravel()}).to_csv(
+        path, index=False
+    )
+
+
+class StubDetector:
+    """Stands in for YoloDetector: does the input resize a real model would, returns canned boxes."""
+
+    def __init__(self, input_size: int = 640, players: int = 22, seed: int = 0):
+        self.input_size = input_size
+        self._detections = iter_synthetic_detections(1 << 30, players, seed=seed)
+
+    def detect(self, frame: np.ndarray) -> Sequence[Detection]:
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[List[Detection]]:
+        results = []
+        for frame in frames:
+            height, width = frame.shape[:2]
+            scale = self.input_size / max(height, width)
+            cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_LINEAR)
+            results.append(next(self._detections))
+        return results
@@ -0,0 +1,116 @@
+"""Single ``soccer`` entry point dispatching to the pipeline scripts.
+
+``python -m soccer <command> [args...]`` runs one script in-process;
+``python -m soccer batch FILE`` runs one command per line in a single
+interpreter, so heavy imports are paid once per batch instead of per step.
+Each script module is imported only when its command runs.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import shlex
+import sys
+import time
+from typing import Dict, List, Tuple
+
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    "detect-track": ("run_detect_track", "Detect and track players in a video"),
+    "live": ("run_live", "Track a live stream within a latency budget"),
+    "detect-ball": ("run_ball", "Detect and track the ball in a video"),
+    "replay": ("replay_tracks", "Re-run tracking on cached detections"),
+    "reid": ("run_reid", "Re-link track IDs across camera cuts by appearance"),
+    "merge-ids": ("merge_ids", "Offline identity merge over a Re-ID track store"),
+    "teams": ("assign_teams", "Label tracks with teams and roles from kit colours"),
+    "homography": ("run_homography", "Compute a homography from point pairs"),
+    "auto-homography": ("auto_homography", "Per-frame homographies from pitch line markings"),
+    "warp": ("warp_to_pitch", "Project tracks to pitch coordinates"),
+    "smooth": ("smooth_tracks", "Smooth projected tracks and add velocities"),
+    "index": ("build_index", "Build a spatial query index over projected tracks"),
+    "possession": ("infer_possession", "Assign the ball to the nearest player per frame"),
+    "train-xt": ("train_xt", "Learn an xT grid from action tables"),
+    "compute-xt": ("compute_xt", "Aggregate expected threat per player"),
+    "events": ("extract_events", "Extract carries, passes and shots from possession"),
+    "train-vaep": ("train_vaep", "Fit VAEP scoring/conceding models on action tables"),
+    "vaep": ("compute_vaep", "Value actions with VAEP and rate players"),
+    "export-onnx": ("export_onnx", "Export YOLO weights to ONNX"),
+    "run-matches": ("run_matches", "Resumable pipeline run over a manifest of matches"),
+    "bench": ("run_benchmarks", "Offline benchmark suite for all stages"),
+    "bench-startup": ("bench_startup", "Import and CLI startup time"),
+    "bench-detectors": ("bench_detectors", "Compare detector backends on a clip"),
+    "bench-tracker": ("bench_tracker", "IOUTracker against the reference tracker"),
+    "bench-trackers": ("bench_trackers", "IOUTracker vs ByteTracker ID stability and per-frame cost"),
+    "bench-xt": ("bench_xt", "Vectorized xT against the reference loop"),
+    "bench-calibration": ("bench_calibration", "Calibration with temporal reuse vs per-frame solve"),
+    "bench-sharding": ("bench_sharding", "Sharded tracking scaling efficiency"),
+}
+
+
+def run_command(command: str, args: List[str]) -> int:
+    """Run one script's ``main`` with ``args`` as its argv; returns an exit code."""
+    if command not in COMMANDS:
+        print(f"soccer: unknown command '{command}' (see 'soccer --help')", file=sys.stderr)
+        return 2
+    module = importlib.import_module(f"soccer.scripts.{COMMANDS[command][0]}")
+    saved_argv = sys.argv
+    sys.argv = [f"soccer {command}", *args]
+    try:
+        module.main()
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        print(exc.code, file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def run_batch(path: str, keep_going: bool = False) -> int:
+    """Run ``command args...`` lines from ``path`` ('-' for stdin); '#' starts a comment."""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with stream:
+        jobs = [shlex.split(line, comments=True) for line in stream]
+    jobs = [job for job in jobs if job]
+    status = 0
+    for i, (command, *args) in enumerate(jobs, 1):
+        print(f"[{i}/{len(jobs)}] soccer {shlex.join([command, *args])}", file=sys.stderr)
+        start = time.perf_counter()
+        code = run_command(command, args)
+        print(f"[{i}/{len(jobs)}] exit {code} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        if code:
+            status = status or code
+            if not keep_going:
+                break
+    return status
+
+
+def build_parser() -> argparse.ArgumentParser:
+    width = max(map(len, COMMANDS))
+    listing = "\n".join(f"  {name:<{width}}  {help_text}" for name, (_, help_text) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog="soccer",
+        description="soccer_support_AI pipeline",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"commands:\n{listing}\n  {'batch':<{width}}  Run one command per line of FILE in this process\n\n"
+        "Run 'soccer <command> --help' for command options.",
+    )
+    parser.add_argument("command", metavar="command", help="Command to run (see below)")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = build_parser()
+    parsed = parser.parse_args(argv)
+    if parsed.command == "batch":
+        batch = argparse.ArgumentParser(prog="soccer batch", description="Run many commands in one interpreter")
+        batch.add_argument("file", help="File with one 'command args...' per line ('-' for stdin)")
+        batch.add_argument("--keep-going", action="store_true", help="Continue after a failing command")
+        batch_args = batch.parse_args(parsed.args)
+        return run_batch(batch_args.file, keep_going=batch_args.keep_going)
+    return run_command(parsed.command, parsed.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,128 @@
-"""Core utilities for soccer_support_AI pipeline."""
-
-from .types import Detection, TrackRecord
-from .detection import YoloDetector
-from .tracking import IOUTracker
-from .homography import (
-    load_point_pairs,
-    compute_homography,
-    save_homography,
-    load_homography,
-    project_points,
-)
-from .warp import project_track_records
-from .metrics import ExpectedThreatTable, compute_xt
-
-__all__ = [
-    "Detection",
-    "TrackRecord",
-    "YoloDetector",
-    "IOUTracker",
-    "load_point_pairs",
-    "compute_homography",
-    "save_homography",
-    "load_homography",
-    "project_points",
-    "project_track_records",
-    "ExpectedThreatTable",
-    "compute_xt",
-]
+"""Core utilities for soccer_support_AI pipeline.
+
+Public names are resolved lazily (PEP 562), so ``from soccer.core import
+project_points`` imports only :mod:`soccer.core.homography` and its
+dependencies rather than OpenCV, SciPy and the detector stack.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
+    "Detection": "types",
+    "TrackRecord": "types",
+    "YoloDetector": "detection",
+    "OnnxDetector": "detection",
+    "make_detector": "detection",
+    "TiledDetector": "detection",
+    "CachedDetections": "detection_cache",
+    "DetectionCacheWriter": "detection_cache",
+    "IOUTracker": "tracking",
+    "ByteTracker": "tracking",
+    "BallTracker": "tracking",
+    "ReIDConfig": "reid",
+    "ReIDLinker": "reid",
+    "EmbeddingGallery": "reid",
+    "make_embedder": "reid",
+    "merge_identities": "reid",
+    "TeamConfig": "teams",
+    "TeamLabels": "teams",
+    "classify_teams": "teams",
+    "kit_features": "teams",
+    "load_point_pairs": "homography",
+    "compute_homography": "homography",
+    "save_homography": "homography",
+    "load_homography": "homography",
+    "project_points": "homography",
+    "HomographySequence": "homography",
+    "save_homography_sequence": "homography",
+    "load_homography_sequence": "homography",
+    "project_points_by_frame": "homography",
+    "AutoCalibrator": "calibration",
+    "CalibrationConfig": "calibration",
+    "calibrate_video": "calibration",
+    "TrackStoreWriter": "track_store",
+    "TrackStoreReader": "track_store",
+    "ProjectionConfig": "warp",
+    "project_track_arrays": "warp",
+    "project_track_records": "warp",
+    "SmoothingConfig": "smoothing",
+    "smooth_tracks": "smoothing",
+    "IndexConfig": "spatial_index",
+    "SpatialIndex": "spatial_index",
+    "build_spatial_index": "spatial_index",
+    "ExpectedThreatTable": "metrics",
+    "compute_xt": "metrics",
+    "XTConfig": "xt_training",
+    "fit_xt": "xt_training",
+    "save_xt_table": "xt_training",
+    "PossessionConfig": "possession",
+    "infer_possession": "possession",
+    "on_ball_mask": "possession",
+    "EventConfig": "events",
+    "extract_actions": "events",
+    "VAEPConfig": "vaep",
+    "VAEPModel": "vaep",
+    "value_actions": "vaep",
+    "player_ratings": "vaep",
+    "PitchControlConfig": "pitch_control",
+    "PitchControlModel": "pitch_control",
+    "Metrics": "instrumentation",
+    "get_metrics": "instrumentation",
+    "JsonLinesExporter": "instrumentation",
+    "serve_prometheus": "instrumentation",
+    "start_exporters": "instrumentation",
+    "LatestFrameReader": "live",
+    "LiveConfig": "live",
+    "LivePipeline": "live",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from .types import Detection, TrackRecord
+    from .detection import OnnxDetector, TiledDetector, YoloDetector, make_detector
+    from .detection_cache import CachedDetections, DetectionCacheWriter
+    from .tracking import BallTracker, ByteTracker, IOUTracker
+    from .reid import EmbeddingGallery, ReIDConfig, ReIDLinker, make_embedder, merge_identities
+    from .teams import TeamConfig, TeamLabels, classify_teams, kit_features
+    from .homography import (
+        HomographySequence,
+        compute_homography,
+        load_homography,
+        load_homography_sequence,
+        load_point_pairs,
+        project_points,
+        project_points_by_frame,
+        save_homography,
+        save_homography_sequence,
+    )
+    from .calibration import AutoCalibrator, CalibrationConfig, calibrate_video
+    from .track_store import TrackStoreReader, TrackStoreWriter
+    from .warp import ProjectionConfig, project_track_arrays, project_track_records
+    from .smoothing import SmoothingConfig, smooth_tracks
+    from .spatial_index import IndexConfig, SpatialIndex, build_spatial_index
+    from .metrics import ExpectedThreatTable, compute_xt
+    from .xt_training import XTConfig, fit_xt, save_xt_table
+    from .possession import PossessionConfig, infer_possession, on_ball_mask
+    from .events import EventConfig, extract_actions
+    from .vaep import VAEPConfig, VAEPModel, player_ratings, value_actions
+    from .pitch_control import PitchControlConfig, PitchControlModel
+    from .instrumentation import JsonLinesExporter, Metrics, get_metrics, serve_prometheus, start_exporters
+    from .live import LatestFrameReader, LiveConfig, LivePipeline
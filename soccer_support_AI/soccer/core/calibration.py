@@ -0,0 +1,595 @@
+"""Automatic pitch calibration from painted line markings.
+
+Each frame is reduced to a mask of thin bright structures on grass. A
+candidate image-to-pitch homography is scored by a symmetric chamfer
+distance. The first term is how far projected pitch markings land from line
+pixels. The second is how far line pixels, projected onto the pitch, land
+from the markings. Both are distance-transform lookups, so nothing is
+rendered per candidate. The first frame of a shot is matched against a
+dictionary of broadcast camera poses, using loose truncation so that nearby
+poses still rank well. The best poses are aligned coarse-to-fine by
+Levenberg-Marquardt on the same distance, with a shrinking cap, and finally
+refined ICP-style with :func:`fit_homography` (RANSAC). Later frames reuse the
+previous H while its reprojection error stays low. On drift the previous H is
+the warm start for a short alignment, and the dictionary is searched again
+only after a shot change or when tracking is lost, so solve cost is paid per
+shot rather than per frame.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .homography import HomographySequence, fit_homography
+from .instrumentation import METRICS
+from .video_io import iter_frames, open_video
+
+STATUSES = ("initialized", "refined", "reused", "lost")
+
+
+def pitch_polylines(length: float = 105.0, width: float = 68.0, spacing: float = 1.0) -> List[np.ndarray]:
+    """Standard pitch markings as ``(K, 2)`` point runs sampled every ``spacing`` metres."""
+    cy = width / 2
+    segments = [
+        ((0, 0), (length, 0)),
+        ((length, 0), (length, width)),
+        ((length, width), (0, width)),
+        ((0, width), (0, 0)),
+        ((length / 2, 0), (length / 2, width)),
+    ]
+    for goal_x, sign in ((0.0, 1.0), (length, -1.0)):
+        for depth, breadth in ((16.5, 40.32), (5.5, 18.32)):
+            x1 = goal_x + sign * depth
+            y0, y1 = cy - breadth / 2, cy + breadth / 2
+            segments += [((goal_x, y0), (x1, y0)), ((x1, y0), (x1, y1)), ((x1, y1), (goal_x, y1))]
+    runs = []
+    for a, b in segments:
+        a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+        n = max(2, int(np.ceil(np.linalg.norm(b - a) / spacing)) + 1)
+        runs.append(a + np.linspace(0.0, 1.0, n)[:, None] * (b - a))
+    radius = 9.15
+    # Centre circle, then the penalty arcs outside each box (|angle| < acos(5.5 / 9.15)).
+    arc = np.arccos(5.5 / radius)
+    circles = ((length / 2, 0.0, 2 * np.pi), (11.0, -arc, arc), (length - 11.0, np.pi - arc, np.pi + arc))
+    for cx, start, stop in circles:
+        n = max(8, int(np.ceil(radius * (stop - start) / spacing)) + 1)
+        theta = np.linspace(start, stop, n)
+        runs.append(np.column_stack([cx + radius * np.cos(theta), cy + radius * np.sin(theta)]))
+    return runs
+
+
+def pitch_model_points(length: float = 105.0, width: float = 68.0, spacing: float = 1.0) -> np.ndarray:
+    """``(M, 2)`` points along every pitch marking."""
+    return np.concatenate(pitch_polylines(length, width, spacing))
+
+
+def camera_homography(
+    image_size: Tuple[int, int],
+    pan: float,
+    tilt: float,
+    fov: float,
+    position: Tuple[float, float, float] = (52.5, -40.0, 20.0),
+) -> np.ndarray:
+    """Pitch-to-image homography of a pinhole camera at ``position`` (metres).
+
+    The camera sits beside the ``y = 0`` touchline facing +y. ``pan`` turns it
+    (positive values turn towards -x), ``tilt`` points it down and ``fov`` is
+    the horizontal field of view, all in degrees.
+    """
+    w, h = image_size
+    f = (w / 2) / np.tan(np.radians(fov) / 2)
+    K = np.array([[f, 0.0, w / 2], [0.0, f, h / 2], [0.0, 0.0, 1.0]])
+    t, p = np.radians(tilt), np.radians(pan)
+    right = np.array([1.0, 0.0, 0.0])
+    down = np.array([0.0, -np.sin(t), -np.cos(t)])
+    forward = np.array([0.0, np.cos(t), -np.sin(t)])
+    rz = np.array([[np.cos(p), np.sin(p), 0.0], [-np.sin(p), np.cos(p), 0.0], [0.0, 0.0, 1.0]])
+    R = np.stack([right, down, forward]) @ rz.T
+    tvec = -R @ np.asarray(position, dtype=np.float64)
+    H = K @ np.column_stack([R[:, 0], R[:, 1], tvec])
+    return H / H[2, 2]
+
+
+def image_from_pitch(H: np.ndarray, image_size: Tuple[int, int]) -> np.ndarray:
+    """Invert an image-to-pitch H, signed so points in front of the camera have w > 0."""
+    inv = np.linalg.inv(H)
+    w, h = image_size
+    # The bottom-centre pixel of a broadcast view always looks at the pitch.
+    ground = H @ np.array([w / 2, h - 1.0, 1.0])
+    if (inv @ (ground / ground[2]))[2] < 0:
+        inv = -inv
+    return inv
+
+
+def _project(H: np.ndarray, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    q = points @ H[:, :2].T + H[:, 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return q[:, :2] / q[:, 2:3], q[:, 2]
+
+
+def _handedness(H: np.ndarray, point: Tuple[float, float]) -> float:
+    """Sign of the local Jacobian determinant of ``H`` at ``point``; mirrored fits flip it."""
+    x, y = point
+    pts, _ = _project(H, np.array([[x, y], [x + 1.0, y], [x, y + 1.0]]))
+    du, dv = pts[1] - pts[0], pts[2] - pts[0]
+    return float(np.sign(du[0] * dv[1] - du[1] * dv[0]))
+
+
+def pitch_masks(
+    frame: np.ndarray, tophat_size: int = 7, threshold: int = 25
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Boolean ``(lines, field)`` masks: thin bright unsaturated structures and the grass around them."""
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    grass = cv2.inRange(hsv, (30, 40, 30), (90, 255, 255))
+    field = cv2.morphologyEx(grass, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 15))) > 0
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (tophat_size, tophat_size))
+    tophat = cv2.morphologyEx(hsv[..., 2], cv2.MORPH_TOPHAT, kernel)
+    return (tophat > threshold) & field & (hsv[..., 1] < 100), field
+
+
+class LineEvidence:
+    """Distance transform of a line mask, with the nearest line pixel of every cell.
+
+    Points are given in the caller's units and mapped to cells by ``origin``
+    and ``resolution`` (units per cell); distances come back in those units.
+    Only points on ``field`` count as visible, so markings hidden by stands,
+    graphics or the frame edge do not count against a homography.
+    """
+
+    def __init__(
+        self,
+        mask: np.ndarray,
+        field: np.ndarray | None = None,
+        origin: Tuple[float, float] = (0.0, 0.0),
+        resolution: float = 1.0,
+    ):
+        self.height, self.width = mask.shape
+        self.field = np.ones_like(mask, dtype=bool) if field is None else field
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.resolution = resolution
+        # (x, y) of line pixels in raster order, which is how DIST_LABEL_PIXEL numbers them.
+        self.pixels = np.argwhere(mask)[:, ::-1] * resolution + self.origin
+        inverted = np.where(mask, 0, 255).astype(np.uint8)
+        self.distance, self._labels = cv2.distanceTransformWithLabels(
+            inverted, cv2.DIST_L2, 5, labelType=cv2.DIST_LABEL_PIXEL
+        )
+        self.distance *= resolution
+
+    @property
+    def empty(self) -> bool:
+        return len(self.pixels) == 0
+
+    def cells(self, xy: np.ndarray, w: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cell indices ``(col, row)`` of points and which of them are visible."""
+        # Cell centres sit on integer coordinates, as in OpenCV.
+        grid = (np.nan_to_num(xy, nan=-1.0, posinf=-1.0, neginf=-1.0) - self.origin) / self.resolution + 0.5
+        col = np.clip(grid[..., 0], -1, self.width).astype(np.intp)
+        row = np.clip(grid[..., 1], -1, self.height).astype(np.intp)
+        ok = (w > 0) & (grid[..., 0] >= 0) & (col < self.width) & (grid[..., 1] >= 0) & (row < self.height)
+        col, row = np.where(ok, col, 0), np.where(ok, row, 0)
+        return col, row, ok & self.field[row, col]
+
+    def lookup(self, xy: np.ndarray, w: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(distance, nearest line point, visible)`` for ``(N, 2)`` points."""
+        col, row, visible = self.cells(xy, w)
+        return self.distance[row, col], self.pixels[self._labels[row, col] - 1], visible
+
+    def sample(self, xy: np.ndarray) -> np.ndarray:
+        """Bilinearly interpolated distance at ``(N, 2)`` points, clamped to the grid.
+
+        Unlike :meth:`lookup` this is smooth in ``xy``, so it can be differentiated.
+        """
+        grid = np.nan_to_num((xy - self.origin) / self.resolution, nan=0.0, posinf=0.0, neginf=0.0)
+        x = np.clip(grid[:, 0], 0, self.width - 1.001)
+        y = np.clip(grid[:, 1], 0, self.height - 1.001)
+        x0, y0 = x.astype(np.intp), y.astype(np.intp)
+        fx, fy = x - x0, y - y0
+        d = self.distance
+        top = d[y0, x0] * (1 - fx) + d[y0, x0 + 1] * fx
+        bottom = d[y0 + 1, x0] * (1 - fx) + d[y0 + 1, x0 + 1] * fx
+        return top * (1 - fy) + bottom * fy
+
+
+@dataclass
+class CalibrationConfig:
+    work_width: int = 640  # frames are calibrated at this width; H is rescaled to full size
+    pitch_length: float = 105.0
+    pitch_width: float = 68.0
+    reuse_error: float = 1.0  # mean px distance (at work_width) below which the previous H is kept
+    max_error: float = 3.0  # solves worse than this are rejected
+    max_coverage: float = 1.0  # ... as are solves whose line pixels sit this far (m) from the markings
+    truncate: float = 10.0  # px cap on one model point's distance when scoring
+    truncate_m: float = 2.0  # metre cap on one line pixel's distance to the markings
+    search_truncate: float = 40.0  # looser caps for the dictionary search, so near misses still rank
+    search_truncate_m: float = 6.0
+    min_points: int = 40  # visible model points / correspondences a solve needs
+    shot_threshold: float = 0.35  # Bhattacharyya distance of HSV histograms that marks a cut
+    lost_retry: int = 25  # frames between re-initialisation attempts while lost
+    align_truncations: Sequence[float] = (60.0, 30.0, 15.0, 8.0)  # px caps of the coarse-to-fine alignment
+    track_truncations: Sequence[float] = (15.0, 8.0)  # ... and from the previous frame's H
+    align_iterations: int = 30
+    icp_iterations: int = 20  # upper bound; ICP stops as soon as the error stops falling
+    icp_max_distance: float = 10.0  # px between a point and the line it is snapped to
+    icp_tolerance: float = 0.01  # px of error improvement an ICP step must make
+    ransac_threshold: float = 5.0  # px
+    line_samples: int = 400  # line pixels used for the image-to-pitch direction
+    align_candidates: int = 8  # dictionary poses given a coarse alignment
+    refine_candidates: int = 2  # ... of which this many are aligned and refined fully
+    camera_position: Tuple[float, float, float] = (52.5, -40.0, 20.0)
+    pans: Sequence[float] = tuple(np.arange(-54.0, 55.0, 3.0))
+    tilts: Sequence[float] = (8.0, 12.0, 16.0, 20.0, 24.0, 28.0, 32.0)
+    fovs: Sequence[float] = tuple(np.geomspace(12.0, 75.0, 10))
+
+
+@dataclass
+class CalibrationResult:
+    frame_index: int
+    status: str  # one of STATUSES
+    error: float  # mean truncated model-to-line distance in work-resolution pixels
+    H: np.ndarray | None  # image-to-pitch at full resolution
+
+
+@dataclass
+class _Keyframes:
+    frames: List[int] = field(default_factory=list)
+    matrices: List[np.ndarray] = field(default_factory=list)
+    shots: List[int] = field(default_factory=list)
+
+    def add(self, frame: int, H: np.ndarray, shot: int) -> None:
+        if self.frames and self.frames[-1] == frame:
+            return
+        self.frames.append(frame)
+        self.matrices.append(H)
+        self.shots.append(shot)
+
+
+class AutoCalibrator:
+    """Per-frame calibration with temporal reuse; see the module docstring.
+
+    ``seeds`` are extra image-to-pitch homographies (full resolution, e.g. from
+    a manual calibration) tried alongside the camera dictionary.
+    """
+
+    def __init__(
+        self,
+        image_size: Tuple[int, int],
+        config: CalibrationConfig | None = None,
+        seeds: Sequence[np.ndarray] = (),
+    ):
+        self.config = cfg = config or CalibrationConfig()
+        self.image_size = image_size
+        self.scale = min(1.0, cfg.work_width / image_size[0])
+        self.work_size = (int(round(image_size[0] * self.scale)), int(round(image_size[1] * self.scale)))
+        # Full-resolution pixel -> work pixel, keeping pixel centres aligned under INTER_AREA.
+        offset = 0.5 * self.scale - 0.5
+        self._to_work = np.array([[self.scale, 0.0, offset], [0.0, self.scale, offset], [0.0, 0.0, 1.0]])
+        self.model = pitch_model_points(cfg.pitch_length, cfg.pitch_width, spacing=1.0)
+        self._markings = self._rasterize_markings(resolution=0.25, margin=15.0)
+        self._search_model = pitch_model_points(cfg.pitch_length, cfg.pitch_width, spacing=2.0)
+        pitch_to_image = [
+            camera_homography(self.work_size, pan, tilt, fov, cfg.camera_position)
+            for pan in cfg.pans
+            for tilt in cfg.tilts
+            for fov in cfg.fovs
+        ]
+        for H in seeds:
+            work_H = np.asarray(H) @ np.linalg.inv(self._to_work)
+            pitch_to_image.append(image_from_pitch(work_H, self.work_size))
+        self._candidates = np.asarray(pitch_to_image, dtype=np.float32)
+        # Every real camera has this orientation; ICP can otherwise settle on a mirrored pitch.
+        centre = (self.work_size[0] / 2, self.work_size[1] / 2)
+        self._handedness = _handedness(np.linalg.inv(pitch_to_image[0]), centre)
+        self._rng = np.random.default_rng(0)
+        self.counts: Dict[str, int] = {status: 0 for status in STATUSES}
+        self.keyframes = _Keyframes()
+        self._shot = -1
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the current solution so the next frame is calibrated from scratch."""
+        self._H: np.ndarray | None = None  # image-to-pitch at work resolution
+        self._hist: np.ndarray | None = None
+        self._last_reused: int | None = None
+        self._lost_since: int | None = None
+
+    def _rasterize_markings(self, resolution: float, margin: float) -> LineEvidence:
+        cfg = self.config
+        shape = (
+            int(np.ceil((cfg.pitch_width + 2 * margin) / resolution)),
+            int(np.ceil((cfg.pitch_length + 2 * margin) / resolution)),
+        )
+        canvas = np.zeros(shape, dtype=np.uint8)
+        runs = [
+            np.round((run + margin) / resolution).astype(np.int32)
+            for run in pitch_polylines(cfg.pitch_length, cfg.pitch_width, spacing=resolution)
+        ]
+        cv2.polylines(canvas, runs, False, 255, 1)
+        return LineEvidence(canvas > 0, origin=(-margin, -margin), resolution=resolution)
+
+    @METRICS.timed("calibration")
+    def update(self, frame_index: int, frame: np.ndarray) -> CalibrationResult:
+        cfg = self.config
+        small = frame
+        if self.scale != 1.0:
+            small = cv2.resize(frame, self.work_size, interpolation=cv2.INTER_AREA)
+        evidence = LineEvidence(*pitch_masks(small))
+        hist = self._histogram(small)
+        cut = self._hist is not None and (
+            cv2.compareHist(self._hist, hist, cv2.HISTCMP_BHATTACHARYYA) > cfg.shot_threshold
+        )
+        self._hist = hist
+
+        status, H, error = None, None, np.inf
+        if self._H is not None and not cut:
+            error = self.reprojection_error(self._H, evidence)
+            if error <= cfg.reuse_error:
+                status, H = "reused", self._H
+            else:
+                H = self._solve(self._H, evidence, self._line_sample(evidence), cfg.track_truncations)
+                error = self.reprojection_error(H, evidence) if H is not None else np.inf
+                status = "refined" if error <= cfg.max_error else None
+        if status is None:
+            retry = self._lost_since is None or cut or frame_index - self._lost_since >= cfg.lost_retry
+            H, error = self._initialize(evidence) if retry else (None, np.inf)
+            status = "initialized" if H is not None else "lost"
+            if H is None and retry:
+                self._lost_since = frame_index
+
+        self.counts[status] += 1
+        self._record(frame_index, status, H)
+        full = None if H is None else H @ self._to_work
+        return CalibrationResult(frame_index, status, float(error), full)
+
+    def _record(self, frame_index: int, status: str, H: np.ndarray | None) -> None:
+        if status == "reused":
+            self._last_reused = frame_index
+            return
+        if self._H is not None and self._last_reused is not None:
+            # The previous H was verified up to here; hold it rather than interpolating.
+            self.keyframes.add(self._last_reused, self._H @ self._to_work, self._shot)
+        self._last_reused = None
+        if status == "lost":
+            self._H = None
+            return
+        if status == "initialized":
+            self._shot += 1
+        self._lost_since = None
+        self._H = H
+        self.keyframes.add(frame_index, H @ self._to_work, self._shot)
+
+    def to_sequence(self) -> HomographySequence:
+        """Frame-indexed homographies (full resolution) of every solve so far."""
+        if self._H is not None and self._last_reused is not None:
+            self.keyframes.add(self._last_reused, self._H @ self._to_work, self._shot)
+            self._last_reused = None
+        if not self.keyframes.frames:
+            raise RuntimeError("No frame could be calibrated")
+        return HomographySequence(
+            np.array(self.keyframes.frames), np.array(self.keyframes.matrices), np.array(self.keyframes.shots)
+        )
+
+    def reprojection_error(self, H: np.ndarray, evidence: LineEvidence) -> float:
+        """Mean truncated distance (px) from projected model points to the nearest line pixel."""
+        xy, w = _project(image_from_pitch(H, self.work_size), self.model)
+        distance, _, visible = evidence.lookup(xy, w)
+        if evidence.empty or visible.sum() < self.config.min_points:
+            return np.inf
+        return float(np.minimum(distance[visible], self.config.truncate).mean())
+
+    def coverage(self, H: np.ndarray, pixels: np.ndarray) -> float:
+        """Mean truncated distance (m) from line pixels projected onto the pitch to the nearest marking."""
+        pitch, w = _project(H, pixels)
+        distance, _, visible = self._markings.lookup(pitch, w)
+        cap = self.config.truncate_m
+        return float(np.where(visible, np.minimum(distance, cap), cap).mean())
+
+    def _histogram(self, frame: np.ndarray) -> np.ndarray:
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [30, 32], [0, 180, 0, 256])
+        return cv2.normalize(hist, hist).astype(np.float32)
+
+    def _line_sample(self, evidence: LineEvidence) -> np.ndarray:
+        count = min(self.config.line_samples, len(evidence.pixels))
+        return evidence.pixels[self._rng.choice(len(evidence.pixels), count, replace=False)]
+
+    def _score(self, H: np.ndarray, evidence: LineEvidence, pixels: np.ndarray) -> Tuple[float, float, float]:
+        """``(combined, reprojection_error, coverage)`` of one candidate."""
+        error = self.reprojection_error(H, evidence)
+        coverage = self.coverage(H, pixels)
+        return error / self.config.truncate + coverage / self.config.truncate_m, error, coverage
+
+    def _search_scores(
+        self, pitch_to_image: np.ndarray, evidence: LineEvidence, pixels: np.ndarray
+    ) -> np.ndarray:
+        """Symmetric chamfer score, with the loose search caps, of each of ``pitch_to_image``."""
+        cfg = self.config
+        pitch_to_image = np.asarray(pitch_to_image, dtype=np.float32)
+        forward = self._batch_distance(pitch_to_image, self._search_model, evidence, cfg.search_truncate)
+        backward = self._batch_distance(
+            np.linalg.inv(pitch_to_image), pixels, self._markings, cfg.search_truncate_m, missing=True
+        )
+        return forward / cfg.search_truncate + backward / cfg.search_truncate_m
+
+    def _solve(
+        self, H: np.ndarray, evidence: LineEvidence, pixels: np.ndarray, truncations: Sequence[float]
+    ) -> np.ndarray | None:
+        """Align from ``H`` at each cap of ``truncations`` in turn, then refine with ICP."""
+        for truncate in truncations:
+            H = self._align(H, evidence, pixels, truncate)
+            if H is None:
+                return None
+        return self._refine(H, evidence, pixels)
+
+    def _align(
+        self, H: np.ndarray, evidence: LineEvidence, pixels: np.ndarray, truncate: float
+    ) -> np.ndarray | None:
+        """Levenberg-Marquardt on the symmetric chamfer distance, capped at ``truncate`` px.
+
+        H is parametrised by where four fixed pitch points land in the image,
+        so every parameter is a pixel offset and a numeric Jacobian is well
+        scaled. Line-pixel distances are converted from metres at the image centre.
+        """
+        cfg = self.config
+        w, h = self.work_size
+        corners = np.array([[0.2 * w, 0.4 * h], [0.8 * w, 0.4 * h], [0.8 * w, 0.95 * h], [0.2 * w, 0.95 * h]])
+        anchors = _project(H, corners)[0].astype(np.float32)
+        xy, visible_w = _project(image_from_pitch(H, self.work_size), self.model)
+        model = self.model[evidence.cells(xy, visible_w)[2]]
+        if len(model) < cfg.min_points or not np.isfinite(anchors).all():
+            return None
+        to_px = 1.0 / self._metres_per_pixel(H)
+        balance = np.sqrt(len(model) / len(pixels))
+
+        def residuals(offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            G = cv2.getPerspectiveTransform(anchors, (corners + offsets.reshape(4, 2)).astype(np.float32))
+            forward = np.minimum(evidence.sample(_project(G, model)[0]), truncate)
+            pitch = _project(np.linalg.inv(G), pixels)[0]
+            backward = np.minimum(self._markings.sample(pitch) * to_px, truncate)
+            return np.concatenate([forward, balance * backward]), G
+
+        offsets, damping = np.zeros(8), 1e-2
+        r, G = residuals(offsets)
+        cost = r @ r
+        for _ in range(cfg.align_iterations):
+            J = np.empty((len(r), 8))
+            for j in range(8):
+                step = np.zeros(8)
+                step[j] = 0.5
+                J[:, j] = (residuals(offsets + step)[0] - r) / 0.5
+            A, g = J.T @ J, J.T @ r
+            while damping < 1e6:
+                step = np.linalg.solve(A + damping * np.diag(np.diag(A) + 1e-9), -g)
+                trial, trial_G = residuals(offsets + step)
+                if trial @ trial < cost:
+                    offsets, r, G, cost = offsets + step, trial, trial_G, trial @ trial
+                    damping = max(damping / 3, 1e-4)
+                    break
+                damping *= 4
+            else:
+                break
+            if np.abs(step).max() < 0.05:
+                break
+        return np.linalg.inv(G)
+
+    def _initialize(self, evidence: LineEvidence) -> Tuple[np.ndarray | None, float]:
+        cfg = self.config
+        if len(evidence.pixels) < cfg.min_points:
+            return None, np.inf
+        pixels = self._line_sample(evidence)
+        score = self._search_scores(self._candidates, evidence, pixels)
+        # Align the best dictionary poses at the loosest cap, then finish only the best few of those.
+        starts = []
+        for k in np.argsort(score)[: cfg.align_candidates]:
+            if not np.isfinite(score[k]):
+                break
+            start = np.linalg.inv(self._candidates[k].astype(np.float64))
+            H = self._align(start, evidence, pixels, cfg.align_truncations[0])
+            if H is not None:
+                starts.append(H)
+        if not starts:
+            return None, np.inf
+        coarse = self._search_scores(np.linalg.inv(np.asarray(starts)), evidence, pixels)
+        best, best_score, best_error = None, np.inf, np.inf
+        for k in np.argsort(coarse)[: cfg.refine_candidates]:
+            H = self._solve(starts[k], evidence, pixels, cfg.align_truncations[1:])
+            if H is None:
+                continue
+            total, error, coverage = self._score(H, evidence, pixels)
+            if error <= cfg.max_error and coverage <= cfg.max_coverage and total < best_score:
+                best, best_score, best_error = H, total, error
+        return best, best_error
+
+    def _batch_distance(
+        self,
+        mats: np.ndarray,
+        points: np.ndarray,
+        evidence: LineEvidence,
+        truncate: float,
+        missing: bool = False,
+    ) -> np.ndarray:
+        """Mean truncated distance of ``points`` mapped by each of ``mats`` (N, 3, 3).
+
+        Invisible points are skipped, or count as ``truncate`` with ``missing``.
+        """
+        q = np.einsum("nij,mj->nmi", mats[:, :, :2], points.astype(np.float32)) + mats[:, None, :, 2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xy = q[..., :2] / q[..., 2:3]
+        col, row, visible = evidence.cells(xy, q[..., 2])
+        distance = np.minimum(evidence.distance[row, col], truncate)
+        if missing:
+            return np.where(visible, distance, truncate).mean(axis=1)
+        count = visible.sum(axis=1)
+        mean = (distance * visible).sum(axis=1) / np.maximum(count, 1)
+        return np.where(count >= self.config.min_points, mean, np.inf)
+
+    def _refine(self, H: np.ndarray, evidence: LineEvidence, pixels: np.ndarray) -> np.ndarray | None:
+        """ICP from ``H``: snap model points to lines and line pixels to the markings, refit with RANSAC.
+
+        The fit maps pitch to image so the RANSAC tolerance is in pixels, which
+        treats near and far markings alike. Iteration stops once the
+        reprojection error no longer improves; the best H seen is returned.
+        """
+        cfg = self.config
+        if evidence.empty:
+            return None
+        max_distance = cfg.icp_max_distance
+        centre = (self.work_size[0] / 2, self.work_size[1] / 2)
+        best, best_error = None, np.inf
+        for _ in range(cfg.icp_iterations + 1):
+            xy, w = _project(image_from_pitch(H, self.work_size), self.model)
+            distance, nearest, visible = evidence.lookup(xy, w)
+            if visible.sum() < cfg.min_points:
+                break
+            error = float(np.minimum(distance[visible], cfg.truncate).mean())
+            if error > best_error - cfg.icp_tolerance:
+                break
+            best, best_error = H, error
+            near = visible & (distance < max_distance)
+            # Same tolerance on the pitch side, converted at the image centre.
+            pitch, pw = _project(H, pixels)
+            gap, marking, on_grid = self._markings.lookup(pitch, pw)
+            close = on_grid & (gap < max_distance * self._metres_per_pixel(H))
+            pitch_pts = np.concatenate([self.model[near], marking[close]])
+            image_pts = np.concatenate([nearest[near], pixels[close]])
+            if len(image_pts) < cfg.min_points:
+                break
+            try:
+                G, inliers = fit_homography(pitch_pts, image_pts, cfg.ransac_threshold)
+                H = np.linalg.inv(G)
+            except (RuntimeError, np.linalg.LinAlgError):
+                break
+            if inliers.sum() < cfg.min_points or _handedness(H, centre) != self._handedness:
+                break
+        return best
+
+    def _metres_per_pixel(self, H: np.ndarray) -> float:
+        """Pitch distance covered by one pixel at the image centre under ``H``."""
+        cx, cy = self.work_size[0] / 2, self.work_size[1] / 2
+        pitch, _ = _project(H, np.array([[cx, cy], [cx + 1.0, cy]]))
+        return float(np.linalg.norm(pitch[1] - pitch[0]))
+
+
+def calibrate_video(
+    path: str | Path,
+    config: CalibrationConfig | None = None,
+    stride: int = 1,
+    start: int = 0,
+    stop: int | None = None,
+    seeds: Sequence[np.ndarray] = (),
+    on_result=None,
+) -> AutoCalibrator:
+    """Calibrate every ``stride``-th frame of a video; ``to_sequence()`` gives the result."""
+    with open_video(str(path)) as cap:
+        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        calibrator = AutoCalibrator(size, config, seeds)
+        for frame_index, frame in iter_frames(cap, start, stop):
+            if (frame_index - start) % stride:
+                continue
+            result = calibrator.update(frame_index, frame)
+            if on_result is not None:
+                on_result(result)
+    return calibrator
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import ast
 from dataclasses import dataclass
-from typing import List, Sequence
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
 
+import cv2
 import numpy as np
 
+from .instrumentation import METRICS
+from .tracking import bbox_iou_matrix
 from .types import Detection
 
 
@@ -14,6 +19,18 @@ class DetectorConfig:
     device: str | None = None
     conf: float = 0.3
     target_class: str | None = "person"
+    backend: str = "ultralytics"  # "ultralytics" or "onnx"
+    input_size: int = 640
+    iou: float = 0.7  # NMS IoU threshold
+    int8: bool = False  # onnx: run dynamically quantized INT8 weights
+    threads: int | None = None  # intra-op CPU threads of the onnx session or torch (None: runtime default)
+
+
+def _allowed_classes(class_map: Dict[int, str], target_class: str | None) -> set[int] | None:
+    if not target_class:
+        return None
+    target = target_class.lower()
+    return {cid for cid, name in class_map.items() if name.lower() == target}
 
 
 class YoloDetector:
@@ -28,6 +45,10 @@ class YoloDetector:
             ) from exc
 
         self.config = config
+        if config.threads:
+            import torch
+
+            torch.set_num_threads(config.threads)
         self.model = YOLO(config.model_name)
         self.model.fuse()
         # Build lookup for class filtering once
@@ -39,19 +60,27 @@ class YoloDetector:
         self.allowed_classes = self._resolve_allowed_classes()
 
     def _resolve_allowed_classes(self) -> set[int] | None:
-        if not self.config.target_class:
-            return None
-        target = self.config.target_class.lower()
-        return {cid for cid, name in self.class_map.items() if name.lower() == target}
+        return _allowed_classes(self.class_map, self.config.target_class)
 
     def detect(self, frame: np.ndarray) -> Sequence[Detection]:
+        return self.detect_batch([frame])[0]
+
+    @METRICS.timed("inference")
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[List[Detection]]:
+        """Run one ``predict`` call over several frames, preserving their order."""
+        if len(frames) == 0:
+            return []
         results = self.model.predict(
-            frame,
+            list(frames),
             conf=self.config.conf,
+            iou=self.config.iou,
+            imgsz=self.config.input_size,
             device=self.config.device,
             verbose=False,
         )
-        result = results[0]
+        return [self._parse_result(result) for result in results]
+
+    def _parse_result(self, result) -> List[Detection]:
         boxes = result.boxes
         if boxes is None:
             return []
@@ -64,3 +93,297 @@ class YoloDetector:
                 continue
             detections.append(Detection(tuple(map(float, bbox)), float(score), int(cls_id)))
         return detections
+
+
+def letterbox(
+    frame: np.ndarray, size: int, out: np.ndarray | None = None
+) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """Resize keeping aspect ratio and pad to ``size`` x ``size`` with grey (114).
+
+    Returns the padded image plus the scale and ``(pad_x, pad_y)`` needed to
+    map boxes back to ``frame`` coordinates.
+    """
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    if out is None:
+        out = np.empty((size, size, 3), dtype=np.uint8)
+    out[:] = 114
+    cv2.resize(
+        frame,
+        (new_w, new_h),
+        dst=out[pad_y : pad_y + new_h, pad_x : pad_x + new_w],
+        interpolation=cv2.INTER_LINEAR,
+    )
+    return out, scale, (float(pad_x), float(pad_y))
+
+
+def nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float,
+    max_det: int = 300,
+    max_candidates: int = 30000,
+    block_size: int = 1024,
+) -> np.ndarray:
+    """Greedy non-maximum suppression; returns kept indices in descending score order.
+
+    Only the ``max_candidates`` best scores are considered (as in ultralytics).
+    They are suppressed in score-ordered blocks: a block is first checked
+    against the boxes already kept, then against itself with one IoU matrix,
+    so each greedy step is a single boolean OR over a row and memory stays
+    ``O(block_size ** 2)`` however many boxes pass a low confidence threshold.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.intp)
+    scores = np.asarray(scores)
+    if len(scores) > max_candidates:
+        top = np.argpartition(-scores, max_candidates - 1)[:max_candidates]
+        order = top[np.argsort(-scores[top], kind="stable")]
+    else:
+        order = np.argsort(-scores, kind="stable")
+    boxes = np.asarray(boxes)[order]
+    keep: List[int] = []
+    for lo in range(0, len(order), block_size):
+        block = boxes[lo : lo + block_size]
+        if keep:
+            alive = np.flatnonzero(~(bbox_iou_matrix(boxes[keep], block) > iou_threshold).any(axis=0))
+        else:
+            alive = np.arange(len(block))
+        overlaps = bbox_iou_matrix(block[alive], block[alive]) > iou_threshold
+        suppressed = np.zeros(len(alive), dtype=bool)
+        for i in range(len(alive)):
+            if suppressed[i]:
+                continue
+            keep.append(lo + int(alive[i]))
+            if len(keep) >= max_det:
+                return order[keep]
+            suppressed |= overlaps[i]
+    return order[keep]
+
+
+class OnnxDetector:
+    """YOLOv8-family detector on ONNX Runtime with its own pre/post-processing.
+
+    Expects an ultralytics ONNX export (output ``(N, 4 + classes, anchors)``).
+    ``device`` selects the execution provider: ``None``/``"cpu"``,
+    ``"openvino"`` or ``"cuda"``. With ``int8`` the weights are dynamically
+    quantized once and cached next to the model as ``<name>.int8.onnx``.
+    """
+
+    _PROVIDERS = {
+        "cpu": ["CPUExecutionProvider"],
+        "openvino": ["OpenVINOExecutionProvider", "CPUExecutionProvider"],
+        "cuda": ["CUDAExecutionProvider", "CPUExecutionProvider"],
+    }
+
+    def __init__(self, config: DetectorConfig):
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ImportError(
+                "onnxruntime is missing. Install onnxruntime (or onnxruntime-openvino) for the onnx backend."
+            ) from exc
+
+        self.config = config
+        model_path = Path(config.model_name)
+        if config.int8:
+            model_path = quantize_onnx_model(model_path)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if config.threads:
+            options.intra_op_num_threads = config.threads
+        device = (config.device or "cpu").split(":")[0].lower()
+        if device not in self._PROVIDERS:
+            raise ValueError(f"Unsupported onnx device '{config.device}'; use cpu, openvino or cuda")
+        self.session = ort.InferenceSession(str(model_path), options, providers=self._PROVIDERS[device])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch_dim, _, height, width = model_input.shape
+        # Static exports fix the batch and image size; dynamic ones accept the config.
+        self.fixed_batch = batch_dim if isinstance(batch_dim, int) else None
+        self.input_size = height if isinstance(height, int) else config.input_size
+        if isinstance(width, int) and width != self.input_size:
+            raise ValueError(f"Only square ONNX inputs are supported, got {height}x{width}")
+        self.class_map = self._read_class_map()
+        self.allowed_classes = _allowed_classes(self.class_map, config.target_class)
+        self._allowed = (
+            None if self.allowed_classes is None else np.array(sorted(self.allowed_classes), dtype=np.intp)
+        )
+        self._canvas = np.empty((0, self.input_size, self.input_size, 3), dtype=np.uint8)
+
+    def _read_class_map(self) -> Dict[int, str]:
+        names = self.session.get_modelmeta().custom_metadata_map.get("names")
+        if not names:
+            # Exports without metadata are assumed to be COCO, where person is class 0.
+            return {0: "person"}
+        return {int(k): v for k, v in ast.literal_eval(names).items()}
+
+    def detect(self, frame: np.ndarray) -> Sequence[Detection]:
+        return self.detect_batch([frame])[0]
+
+    @METRICS.timed("inference")
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[List[Detection]]:
+        if len(frames) == 0:
+            return []
+        size = self.input_size
+        if len(self._canvas) < len(frames):
+            self._canvas = np.empty((len(frames), size, size, 3), dtype=np.uint8)
+        transforms = [letterbox(frame, size, out=self._canvas[i])[1:] for i, frame in enumerate(frames)]
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1], one pass over the whole batch.
+        blob = self._canvas[: len(frames), :, :, ::-1].transpose(0, 3, 1, 2).astype(np.float32) / 255.0
+        step = self.fixed_batch or len(frames)
+        outputs = [
+            self.session.run(None, {self.input_name: np.ascontiguousarray(blob[i : i + step])})[0]
+            for i in range(0, len(frames), step)
+        ]
+        predictions = np.concatenate(outputs)
+        return [
+            self._postprocess(pred, scale, pad, frame.shape[:2])
+            for pred, (scale, pad), frame in zip(predictions, transforms, frames)
+        ]
+
+    def _postprocess(
+        self, pred: np.ndarray, scale: float, pad: Tuple[float, float], shape: Tuple[int, int]
+    ) -> List[Detection]:
+        if self._allowed is not None and self._allowed.size == 0:
+            return []
+        pred = pred.T  # (anchors, 4 + classes)
+        class_scores = pred[:, 4:]
+        if self._allowed is not None:
+            class_ids = self._allowed[np.argmax(class_scores[:, self._allowed], axis=1)]
+        else:
+            class_ids = np.argmax(class_scores, axis=1)
+        scores = class_scores[np.arange(len(pred)), class_ids]
+        keep = scores >= self.config.conf
+        if not keep.any():
+            return []
+        cxcywh, scores, class_ids = pred[keep, :4], scores[keep], class_ids[keep]
+        boxes = np.empty_like(cxcywh, dtype=np.float64)
+        boxes[:, :2] = cxcywh[:, :2] - cxcywh[:, 2:] / 2
+        boxes[:, 2:] = cxcywh[:, :2] + cxcywh[:, 2:] / 2
+        # Class-aware NMS in one pass: offset each class into its own coordinate range.
+        offsets = class_ids[:, None].astype(np.float64) * (self.input_size + 1)
+        kept = nms(boxes + offsets, scores, self.config.iou)
+        boxes = (boxes[kept] - np.array([pad[0], pad[1], pad[0], pad[1]])) / scale
+        height, width = shape
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+        return [
+            Detection(tuple(box), score, cls_id)
+            for box, score, cls_id in zip(boxes.tolist(), scores[kept].tolist(), class_ids[kept].tolist())
+        ]
+
+
+def quantize_onnx_model(model_path: str | Path, out_path: str | Path | None = None) -> Path:
+    """Dynamically quantize weights to INT8, reusing an existing output file."""
+    model_path = Path(model_path)
+    out_path = Path(out_path) if out_path else model_path.with_suffix(".int8.onnx")
+    if out_path.exists() and out_path.stat().st_mtime >= model_path.stat().st_mtime:
+        return out_path
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as exc:  # pragma: no cover - import guard
+        raise ImportError("onnxruntime is missing; it is required for INT8 quantization.") from exc
+    quantize_dynamic(str(model_path), str(out_path), weight_type=QuantType.QInt8)
+    return out_path
+
+
+DETECTOR_BACKENDS = {
+    "ultralytics": YoloDetector,
+    "onnx": OnnxDetector,
+}
+
+
+def make_detector(config: DetectorConfig | None = None):
+    """Build the detector backend named by ``config.backend``."""
+    config = config or DetectorConfig()
+    try:
+        backend = DETECTOR_BACKENDS[config.backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown detector backend '{config.backend}'; choose from {sorted(DETECTOR_BACKENDS)}"
+        ) from None
+    return backend(config)
+
+
+def tile_grid(
+    width: int, height: int, tile_size: int, overlap: float
+) -> List[Tuple[int, int, int, int]]:
+    """``(x1, y1, x2, y2)`` tiles of at most ``tile_size`` covering a frame.
+
+    Neighbouring tiles share at least ``overlap`` of a tile, so an object cut
+    by one tile edge lies whole inside the next tile.
+    """
+    step = max(int(tile_size * (1.0 - overlap)), 1)
+
+    def starts(extent: int) -> List[int]:
+        if extent <= tile_size:
+            return [0]
+        positions = list(range(0, extent - tile_size, step))
+        return positions + [extent - tile_size]
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+class TiledDetector:
+    """Runs a detector on overlapping native-resolution tiles for small objects.
+
+    A full 1920x1080 frame letterboxed to 640 shrinks a 12 px ball to 4 px,
+    below what YOLO anchors resolve; tiles of ``tile_size`` keep it at full
+    size. All tiles of a batch go through one ``detect_batch`` call, boxes are
+    shifted back to frame coordinates and duplicates from overlaps are removed
+    by class-aware NMS. With ``full_frame`` the whole frame is detected too, so
+    objects larger than a tile are not cut in pieces.
+    """
+
+    def __init__(
+        self, detector, tile_size: int = 640, overlap: float = 0.2, full_frame: bool = False, iou: float = 0.5
+    ):
+        self.detector = detector
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.full_frame = full_frame
+        self.iou = iou
+        self._grids: Dict[Tuple[int, int], List[Tuple[int, int, int, int]]] = {}
+
+    def _tiles(self, shape: Tuple[int, ...]) -> List[Tuple[int, int, int, int]]:
+        height, width = shape[:2]
+        if (width, height) not in self._grids:
+            tiles = tile_grid(width, height, self.tile_size, self.overlap)
+            if self.full_frame and len(tiles) > 1:
+                tiles.append((0, 0, width, height))
+            self._grids[(width, height)] = tiles
+        return self._grids[(width, height)]
+
+    def detect(self, frame: np.ndarray) -> Sequence[Detection]:
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[List[Detection]]:
+        if len(frames) == 0:
+            return []
+        crops, owners = [], []
+        for i, frame in enumerate(frames):
+            for x1, y1, x2, y2 in self._tiles(frame.shape):
+                crops.append(frame[y1:y2, x1:x2])
+                owners.append((i, x1, y1))
+        merged: List[List[Detection]] = [[] for _ in frames]
+        for (i, x, y), detections in zip(owners, self.detector.detect_batch(crops)):
+            for det in detections:
+                x1, y1, x2, y2 = det.bbox
+                merged[i].append(Detection((x1 + x, y1 + y, x2 + x, y2 + y), det.score, det.class_id))
+        return [self._suppress(detections) for detections in merged]
+
+    def _suppress(self, detections: List[Detection]) -> List[Detection]:
+        if len(detections) < 2:
+            return detections
+        boxes = np.array([det.bbox for det in detections], dtype=np.float64)
+        scores = np.array([det.score for det in detections], dtype=np.float64)
+        classes = np.array([det.class_id for det in detections], dtype=np.float64)
+        offsets = classes[:, None] * (boxes.max() + 1.0)
+        return [detections[k] for k in nms(boxes + offsets, scores, self.iou).tolist()]
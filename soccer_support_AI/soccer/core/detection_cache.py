@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Generator, List, Sequence, Tuple
+
+import numpy as np
+
+from .detection import DetectorConfig
+from .track_store import ColumnSpec, TrackStoreReader, TrackStoreWriter, is_track_store
+from .types import Detection
+from .video_io import IngestConfig
+
+DETECTION_COLUMNS: Dict[str, ColumnSpec] = {
+    "frame_index": ("<i4", ()),
+    "bbox": ("<f4", (4,)),
+    "score": ("<f4", ()),
+    "class_id": ("<i4", ()),
+}
+
+
+def video_fingerprint(path: str | Path, samples: int = 16, block_size: int = 1 << 20) -> str:
+    """Content hash of a video from its size and evenly spaced blocks.
+
+    Hashing every byte of a full-match file costs more than re-reading it, so
+    only ``samples`` blocks of ``block_size`` bytes are read.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    digest = hashlib.sha1(str(size).encode())
+    with path.open("rb") as f:
+        if size <= samples * block_size:
+            digest.update(f.read())
+        else:
+            for offset in np.linspace(0, size - block_size, samples).astype(np.int64):
+                f.seek(int(offset))
+                digest.update(f.read(block_size))
+    return digest.hexdigest()
+
+
+_MODEL_DIGESTS: Dict[str, Tuple[int, int, str]] = {}
+
+
+def model_fingerprint(model_name: str | Path) -> str:
+    """Content hash of local weights (a file or an exported model directory).
+
+    Digests are memoised by size and mtime, so a process that opens many
+    caches hashes each weight file once. A name that is not a local path
+    (hub weights such as ``yolov8n.pt``, downloaded on first use) is its
+    own fingerprint.
+    """
+    path = Path(model_name)
+    if path.is_dir():
+        digest = hashlib.sha1()
+        for child in sorted(p for p in path.rglob("*") if p.is_file()):
+            digest.update(f"{child.relative_to(path)}={model_fingerprint(child)};".encode())
+        return digest.hexdigest()
+    if not path.is_file():
+        return os.path.basename(str(model_name))
+    stat = path.stat()
+    key = str(path.resolve())
+    cached = _MODEL_DIGESTS.get(key)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    digest = hashlib.sha1()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    _MODEL_DIGESTS[key] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def detection_cache_key(
+    fingerprint: str, config: DetectorConfig, ingest: IngestConfig | None = None
+) -> str:
+    """Cache key over everything that changes detector output (not device or decoder)."""
+    fields = {
+        "video": fingerprint,
+        "model": model_fingerprint(config.model_name),
+        "conf": round(float(config.conf), 6),
+        "target_class": config.target_class,
+        "backend": config.backend,
+        "input_size": config.input_size,
+        "iou": round(float(config.iou), 6),
+        "int8": config.int8,
+    }
+    if ingest is not None and (ingest.roi or ingest.target_width or ingest.mask_path):
+        fields["ingest"] = {
+            "roi": list(ingest.roi) if ingest.roi else None,
+            "target_width": ingest.target_width,
+            "mask": hashlib.sha1(Path(ingest.mask_path).read_bytes()).hexdigest()
+            if ingest.mask_path
+            else None,
+        }
+    payload = json.dumps(fields, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:20]
+
+
+def detection_cache_path(
+    cache_dir: str | Path,
+    video_path: str | Path,
+    config: DetectorConfig,
+    ingest: IngestConfig | None = None,
+) -> Path:
+    return Path(cache_dir) / detection_cache_key(video_fingerprint(video_path), config, ingest)
+
+
+class DetectionCacheWriter:
+    """Stream per-frame detections into a columnar store; only ``close`` marks it complete.
+
+    Each flushed chunk records how many frames it covers, so with ``resume``
+    an interrupted cache continues at :func:`resumable_frames`.
+    """
+
+    def __init__(
+        self, path: str | Path, metadata: dict | None = None, chunk_size: int = 65536, resume: bool = False
+    ):
+        self._store = TrackStoreWriter(
+            path,
+            columns=DETECTION_COLUMNS,
+            metadata={**(metadata or {}), "complete": False},
+            chunk_size=chunk_size,
+            resume=resume,
+        )
+        self.num_frames = int(self._store.metadata.get("num_frames", 0)) if resume else 0
+
+    def __enter__(self) -> "DetectionCacheWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    def write_frame(self, frame_index: int, detections: Sequence[Detection]) -> None:
+        self.num_frames = max(self.num_frames, frame_index + 1)
+        # Set before writing: a chunk flushed by this call already holds the whole frame.
+        self._store.metadata["num_frames"] = self.num_frames
+        self._store.write_columns(
+            frame_index=np.full(len(detections), frame_index),
+            bbox=[det.bbox for det in detections],
+            score=[det.score for det in detections],
+            class_id=[det.class_id for det in detections],
+        )
+
+    def close(self) -> None:
+        self._store.metadata.update({"complete": True, "num_frames": self.num_frames})
+        self._store.close()
+
+
+class CachedDetections:
+    """Memory-mapped per-frame access to a detection cache."""
+
+    def __init__(self, path: str | Path, allow_partial: bool = False):
+        self._store = TrackStoreReader(path)
+        self.metadata = self._store.metadata
+        if not self.metadata.get("complete") and not allow_partial:
+            raise ValueError(f"Detection cache is incomplete: {path}")
+        self.num_frames = int(self.metadata.get("num_frames", 0))
+        self.frame_index = self._store.column("frame_index")
+        self.bbox = self._store.column("bbox")
+        self.score = self._store.column("score")
+        self.class_id = self._store.column("class_id")
+        self.offsets = np.searchsorted(self.frame_index, np.arange(self.num_frames + 1))
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def frame_arrays(self, frame_index: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        lo, hi = self.offsets[frame_index], self.offsets[frame_index + 1]
+        return self.bbox[lo:hi], self.score[lo:hi], self.class_id[lo:hi]
+
+    def frame(self, frame_index: int) -> List[Detection]:
+        boxes, scores, classes = self.frame_arrays(frame_index)
+        return [
+            Detection(tuple(bbox), score, cls_id)
+            for bbox, score, cls_id in zip(boxes.tolist(), scores.tolist(), classes.tolist())
+        ]
+
+    def iter_frames(self) -> Generator[Tuple[int, List[Detection]], None, None]:
+        for frame_index in range(self.num_frames):
+            yield frame_index, self.frame(frame_index)
+
+
+def is_complete_cache(path: str | Path) -> bool:
+    if not is_track_store(path):
+        return False
+    return bool(TrackStoreReader(path).metadata.get("complete"))
+
+
+def resumable_frames(path: str | Path) -> int:
+    """Frames already flushed to an interrupted cache (0 if absent or complete)."""
+    if not is_track_store(path):
+        return 0
+    metadata = TrackStoreReader(path).metadata
+    if metadata.get("complete"):
+        return 0
+    return int(metadata.get("num_frames", 0))
@@ -0,0 +1,186 @@
+"""On-ball actions extracted from a possession table.
+
+Each possession spell of one player becomes a ``carry`` from where the ball
+was won to where it was released. The ball's flight from the end of a spell
+to the start of the next spell becomes a ``pass``, or a ``shot`` when it
+leaves over the goal line the player attacks close to the goal. Goals come
+from the ball trajectory itself: the ball crossing a goal line between the
+posts. Shots that are saved or blocked before reaching the line are recorded
+as passes to the receiving player.
+
+Spells come from run lengths and goal-line crossings from a sorted index
+search over the whole match, so there is no per-spell Python loop.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Hashable, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import METRICS
+from .possession import NO_OWNER, run_lengths
+
+ACTION_TYPES = ("carry", "pass", "shot")
+NO_TEAM = -1
+ACTION_COLUMNS = (
+    "game_id",
+    "action_id",
+    "frame_start",
+    "frame_end",
+    "track_id",
+    "team",
+    "direction",
+    "type",
+    "start_x",
+    "start_y",
+    "end_x",
+    "end_y",
+    "result",
+    "goal",
+)
+
+
+@dataclass
+class EventConfig:
+    pitch_length: float = 105.0
+    pitch_width: float = 68.0
+    goal_width: float = 7.32
+    shot_width: float = 20.0  # balls leaving over the attacked goal line this close to its centre are shots
+    min_carry: float = 1.0  # metres; shorter spells are receptions without a carry
+    right_team: int = 0  # team attacking towards x = pitch_length at kick-off; the others attack x = 0
+    switch_frames: Tuple[int, ...] = ()  # frames where the teams change ends (half time, extra time)
+
+
+def team_directions(
+    team: np.ndarray,
+    right_team: int,
+    frames: np.ndarray | None = None,
+    switch_frames: Sequence[int] = (),
+) -> np.ndarray:
+    """+1 for samples whose team attacks towards increasing x, -1 otherwise.
+
+    ``right_team`` attacks towards increasing x until the first of
+    ``switch_frames``; every switch at or before a sample's frame flips it.
+    """
+    direction = np.where(np.asarray(team) == right_team, 1, -1)
+    if frames is not None and len(switch_frames):
+        switches = np.searchsorted(np.sort(np.asarray(switch_frames)), np.asarray(frames), side="right")
+        direction = np.where(switches % 2 == 1, -direction, direction)
+    return direction.astype(np.int8)
+
+
+@METRICS.timed("events")
+def extract_actions(
+    possession: pd.DataFrame,
+    teams: Mapping[int, Hashable] | None = None,
+    config: EventConfig | None = None,
+    game_id: Hashable = 0,
+) -> pd.DataFrame:
+    """Action table with :data:`ACTION_COLUMNS` from the output of :func:`infer_possession`.
+
+    ``teams`` maps track ids to integer team labels; unmapped owners get
+    :data:`NO_TEAM`, and their passes count as completed whenever another
+    player receives the ball. ``direction`` is +1 when the acting team
+    attacks towards increasing x at the start of the spell (see
+    :attr:`EventConfig.switch_frames`). ``goal`` is 1 for a goal scored by the
+    acting team, -1 for an own goal and 0 otherwise.
+    """
+    cfg = config or EventConfig()
+    possession = possession.sort_values("frame_index", kind="stable")
+    frames = possession["frame_index"].to_numpy(dtype=np.int64)
+    owners = possession["track_id"].to_numpy(dtype=np.int64)
+    x = possession["ball_x"].to_numpy(dtype=np.float64)
+    y = possession["ball_y"].to_numpy(dtype=np.float64)
+
+    starts, lengths = run_lengths(owners)
+    held = owners[starts] != NO_OWNER
+    first, last = starts[held], (starts + lengths - 1)[held]
+    owner = owners[first]
+    if teams is not None:
+        team = pd.Series(owner).map(teams).fillna(NO_TEAM).to_numpy(dtype=np.int64)
+    else:
+        team = np.full(len(owner), NO_TEAM, dtype=np.int64)
+    direction = team_directions(team, cfg.right_team, frames[first], cfg.switch_frames)
+    n = len(first)
+    next_first = np.r_[first[1:], len(frames)]
+
+    # First frame after each spell where the ball is beyond a goal line.
+    out_rows = np.flatnonzero((x <= 0.0) | (x >= cfg.pitch_length))
+    j = np.searchsorted(out_rows, last, side="right")
+    candidate = out_rows[np.minimum(j, max(len(out_rows) - 1, 0))] if len(out_rows) else last
+    crossed = (j < len(out_rows)) & (candidate < next_first)
+    exit_row = np.where(crossed, candidate, np.minimum(next_first, len(frames) - 1))
+    offset = np.abs(y[exit_row] - cfg.pitch_width / 2)
+    attacked_end = np.where(direction > 0, x[exit_row] >= cfg.pitch_length, x[exit_row] <= 0.0)
+    in_goal = crossed & (offset <= cfg.goal_width / 2)
+    shot = crossed & attacked_end & (offset <= cfg.shot_width / 2)
+    goal = np.where(in_goal, np.where(attacked_end, 1, -1), 0)
+
+    has_next = np.r_[np.ones(n - 1, dtype=bool), False] if n else np.zeros(0, dtype=bool)
+    next_team = np.r_[team[1:], NO_TEAM]
+    received = has_next & ~crossed
+    completed = received & ((team == NO_TEAM) | (next_team == team))
+    # The ball's flight after the last spell only counts if it reached a goal line.
+    moves = has_next | crossed
+
+    carry_length = np.hypot(x[last] - x[first], y[last] - y[first])
+    carries = carry_length >= cfg.min_carry
+    carry = {
+        "frame_start": frames[first],
+        "frame_end": frames[last],
+        "start_x": x[first],
+        "start_y": y[first],
+        "end_x": x[last],
+        "end_y": y[last],
+        "type": np.zeros(n, dtype=np.int8),
+        "result": np.ones(n, dtype=np.int8),
+        "goal": np.zeros(n, dtype=np.int8),
+    }
+    ball = {
+        "frame_start": frames[last],
+        "frame_end": frames[exit_row],
+        "start_x": x[last],
+        "start_y": y[last],
+        "end_x": x[exit_row],
+        "end_y": y[exit_row],
+        "type": np.where(shot, 2, 1).astype(np.int8),
+        "result": np.where(shot, goal == 1, completed).astype(np.int8),
+        "goal": goal.astype(np.int8),
+    }
+    keep = np.r_[carries, moves]
+    spell = np.r_[np.arange(n), np.arange(n)][keep]
+    columns = {name: np.r_[carry[name], ball[name]][keep] for name in carry}
+    # Within a spell the carry precedes the ball's flight.
+    order = np.lexsort((np.r_[np.zeros(n), np.ones(n)][keep], spell))
+    actions = pd.DataFrame(
+        {
+            "game_id": game_id,
+            "action_id": np.arange(len(order)),
+            "frame_start": columns["frame_start"][order],
+            "frame_end": columns["frame_end"][order],
+            "track_id": owner[spell][order],
+            "team": team[spell][order],
+            "direction": direction[spell][order],
+            "type": pd.Categorical.from_codes(columns["type"][order], ACTION_TYPES),
+            "start_x": columns["start_x"][order],
+            "start_y": columns["start_y"][order],
+            "end_x": columns["end_x"][order],
+            "end_y": columns["end_y"][order],
+            "result": columns["result"][order],
+            "goal": columns["goal"][order],
+        },
+        columns=list(ACTION_COLUMNS),
+    )
+    return actions
+
+
+def read_actions(path) -> pd.DataFrame:
+    """Load an action table written by ``extract_events.py``, restoring the ``type`` categories."""
+    actions = pd.read_csv(path)
+    missing = set(ACTION_COLUMNS) - set(actions.columns)
+    if missing:
+        raise ValueError(f"{path} is missing action columns {sorted(missing)}")
+    actions["type"] = pd.Categorical(actions["type"], categories=ACTION_TYPES)
+    return actions
@@ -4,9 +4,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
-import cv2
 import numpy as np
-import pandas as pd
 import yaml
 
 from .types import Point
@@ -19,6 +17,8 @@ class PointPair:
 
 
 def load_point_pairs(csv_path: str | Path) -> List[PointPair]:
+    import pandas as pd
+
     df = pd.read_csv(csv_path)
     required = {"image_x", "image_y", "pitch_x", "pitch_y"}
     if not required.issubset(df.columns):
@@ -36,10 +36,28 @@ def compute_homography(pairs: Iterable[PointPair]) -> np.ndarray:
         raise ValueError("Need at least four point pairs to compute homography")
     image_pts = np.array([p.image for p in pairs], dtype=np.float32)
     pitch_pts = np.array([p.pitch for p in pairs], dtype=np.float32)
-    H, mask = cv2.findHomography(image_pts, pitch_pts, cv2.RANSAC)
+    H, _ = fit_homography(image_pts, pitch_pts)
+    return H
+
+
+def fit_homography(
+    src_pts: np.ndarray, dst_pts: np.ndarray, ransac_threshold: float = 3.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """RANSAC fit of H mapping ``(N, 2)`` ``src_pts`` to ``dst_pts``; returns ``(H, inlier_mask)``.
+
+    ``ransac_threshold`` is the reprojection tolerance in ``dst_pts`` units.
+    """
+    import cv2
+
+    H, mask = cv2.findHomography(
+        np.asarray(src_pts, dtype=np.float32),
+        np.asarray(dst_pts, dtype=np.float32),
+        cv2.RANSAC,
+        ransac_threshold,
+    )
     if H is None:
         raise RuntimeError("OpenCV failed to compute homography")
-    return H
+    return H, mask.ravel().astype(bool)
 
 
 def save_homography(H: np.ndarray, path: str | Path) -> None:
@@ -59,8 +77,140 @@ def load_homography(path: str | Path) -> np.ndarray:
     return H
 
 
-def project_points(H: np.ndarray, points: Iterable[Point]) -> np.ndarray:
-    pts = np.array([[x, y, 1.0] for x, y in points], dtype=np.float64).T
-    projected = H @ pts
-    projected /= projected[2:3]
-    return projected[:2].T
+def project_points(H: np.ndarray, points: Iterable[Point] | np.ndarray) -> np.ndarray:
+    """Project ``(N, 2)`` image points with one homography; arrays are used as-is."""
+    if not isinstance(points, np.ndarray):
+        points = list(points)
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    H = np.asarray(H, dtype=np.float64)
+    projected = pts @ H[:, :2].T + H[:, 2]
+    return projected[:, :2] / projected[:, 2:3]
+
+
+@dataclass
+class HomographySequence:
+    """Frame-indexed homographies with linear interpolation between keyframes.
+
+    Keyframes sharing a ``shot_id`` are interpolated; across a shot change the
+    earlier keyframe is held until the next shot's first keyframe. Frames
+    outside the keyframe range use the nearest keyframe.
+    """
+
+    frame_indices: np.ndarray  # (K,) distinct keyframe indices, sorted on construction
+    matrices: np.ndarray  # (K, 3, 3), normalised so H[2, 2] == 1
+    shot_ids: np.ndarray | None = None  # (K,)
+
+    def __post_init__(self):
+        frames = np.asarray(self.frame_indices, dtype=np.int64).reshape(-1)
+        mats = np.asarray(self.matrices, dtype=np.float64).reshape(-1, 3, 3)
+        if len(frames) == 0 or len(frames) != len(mats):
+            raise ValueError("Homography sequence needs one 3x3 matrix per keyframe")
+        order = np.argsort(frames, kind="stable")
+        self.frame_indices = frames[order]
+        repeated = self.frame_indices[1:][np.diff(self.frame_indices) == 0]
+        if len(repeated):
+            # Interpolation divides by the gap between neighbouring keyframes.
+            raise ValueError(f"Homography sequence has more than one keyframe at frames {repeated.tolist()}")
+        self.matrices = mats[order] / mats[order][:, 2:3, 2:3]
+        if self.shot_ids is None:
+            self.shot_ids = np.zeros(len(frames), dtype=np.int64)
+        else:
+            self.shot_ids = np.asarray(self.shot_ids, dtype=np.int64).reshape(-1)[order]
+
+    @classmethod
+    def static(cls, H: np.ndarray) -> "HomographySequence":
+        return cls(np.array([0]), np.asarray(H)[None])
+
+    def at(self, frames: np.ndarray) -> np.ndarray:
+        """Return ``(N, 3, 3)`` homographies for an array of frame indices."""
+        frames = np.asarray(frames, dtype=np.float64).reshape(-1)
+        if len(self.frame_indices) == 1:
+            return np.broadcast_to(self.matrices[0], (len(frames), 3, 3)).copy()
+        keys = self.frame_indices
+        hi = np.clip(np.searchsorted(keys, frames, side="right"), 1, len(keys) - 1)
+        lo = hi - 1
+        weight = np.clip((frames - keys[lo]) / (keys[hi] - keys[lo]), 0.0, 1.0)
+        cut = self.shot_ids[lo] != self.shot_ids[hi]
+        weight[cut] = frames[cut] >= keys[hi][cut]
+        w = weight[:, None, None]
+        return self.matrices[lo] * (1.0 - w) + self.matrices[hi] * w
+
+
+def save_homography_sequence(seq: HomographySequence, path: str | Path) -> None:
+    """Write a sequence as ``.npz`` (compact, for per-frame data) or YAML."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".npz":
+        np.savez_compressed(
+            path, frame_index=seq.frame_indices, homography=seq.matrices, shot_id=seq.shot_ids
+        )
+        return
+    data = {
+        "homographies": [
+            {"frame_index": int(f), "shot_id": int(s), "homography": H.tolist()}
+            for f, s, H in zip(seq.frame_indices, seq.shot_ids, seq.matrices)
+        ]
+    }
+    with path.open("w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f)
+
+
+def load_homography_sequence(path: str | Path) -> HomographySequence:
+    """Load a sequence; a single-matrix file from ``save_homography`` becomes a static one."""
+    path = Path(path)
+    if path.suffix.lower() == ".npz":
+        with np.load(path) as data:
+            shot_ids = data["shot_id"] if "shot_id" in data else None
+            return HomographySequence(data["frame_index"], data["homography"], shot_ids)
+    with path.open("r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    if "homographies" in data:
+        entries = data["homographies"]
+        return HomographySequence(
+            np.array([e["frame_index"] for e in entries]),
+            np.array([e["homography"] for e in entries], dtype=np.float64),
+            np.array([e.get("shot_id", 0) for e in entries]),
+        )
+    if "homography" in data:
+        return HomographySequence.static(np.array(data["homography"], dtype=np.float64))
+    raise ValueError("YAML missing 'homography' or 'homographies'")
+
+
+def project_points_by_frame(
+    seq: HomographySequence,
+    frame_indices: np.ndarray,
+    points: np.ndarray,
+    chunk_size: int = 1 << 20,
+    return_scale: bool = False,
+    reference: Tuple[float, float] | None = None,
+) -> np.ndarray | Tuple[np.ndarray, np.ndarray]:
+    """Project ``(N, 2)`` points, each with the homography of its own frame.
+
+    Matrices are resolved once per distinct frame and gathered by index, so
+    the cost is a few fused multiply-adds per point. With ``return_scale``
+    the homogeneous ``w`` of every point is returned too; it is 0 on the
+    horizon and changes sign across it. ``H`` and ``-H`` project alike, so
+    the sign alone says nothing: pass ``reference``, an image point known to
+    look at the pitch, and every frame's matrix is signed so that point has
+    ``w > 0`` (ground side positive, sky side negative).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    frame_indices = np.asarray(frame_indices).reshape(-1)
+    out = np.empty_like(points)
+    scale = np.empty(len(points))
+    for lo in range(0, len(points), chunk_size):
+        hi = lo + chunk_size
+        frames, inverse = np.unique(frame_indices[lo:hi], return_inverse=True)
+        mats = seq.at(frames).reshape(-1, 9)
+        if reference is not None:
+            rx, ry = reference
+            mats *= np.where(mats[:, 6] * rx + mats[:, 7] * ry + mats[:, 8] < 0, -1.0, 1.0)[:, None]
+        mats = mats[inverse]
+        x = points[lo:hi, 0]
+        y = points[lo:hi, 1]
+        w = scale[lo:hi] = mats[:, 6] * x + mats[:, 7] * y + mats[:, 8]
+        out[lo:hi, 0] = (mats[:, 0] * x + mats[:, 1] * y + mats[:, 2]) / w
+        out[lo:hi, 1] = (mats[:, 3] * x + mats[:, 4] * y + mats[:, 5]) / w
+    if return_scale:
+        return out, scale
+    return out
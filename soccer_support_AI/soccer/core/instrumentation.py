@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import bisect
+import contextlib
+import functools
+import json
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, TextIO
+
+if TYPE_CHECKING:  # pragma: no cover
+    from http.server import ThreadingHTTPServer
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf.
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Bucket upper bound containing quantile ``q`` (the max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_stage", "_start")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self._metrics = metrics
+        self._stage = stage
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._metrics.observe(self._stage, time.perf_counter() - self._start)
+
+
+class Metrics:
+    """Per-stage latency histograms, counters and gauges.
+
+    Disabled (the default), ``timer`` hands back a shared no-op context and
+    ``incr``/``gauge``/``observe`` return immediately, so instrumented code
+    pays one attribute check per call.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.realtime_fps: float | None = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms: Dict[str, _Histogram] = {}
+            self._counters: Dict[str, float] = {}
+            self._gauges: Dict[str, float] = {}
+            self._started = time.time()
+
+    def timer(self, stage: str):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Timer(self, stage)
+
+    def timed(self, stage: str) -> Callable[[Callable], Callable]:
+        """Decorator form of :meth:`timer`."""
+
+        def decorate(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Timer(self, stage):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = _Histogram()
+            hist.observe(seconds)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = time.time() - self._started
+            stages = {
+                name: {
+                    "count": h.count,
+                    "mean_ms": h.total / h.count * 1e3 if h.count else 0.0,
+                    "p50_ms": h.quantile(0.5) * 1e3,
+                    "p95_ms": h.quantile(0.95) * 1e3,
+                    "p99_ms": h.quantile(0.99) * 1e3,
+                    "max_ms": h.max * 1e3,
+                }
+                for name, h in self._histograms.items()
+            }
+            snap = {
+                "time": time.time(),
+                "elapsed_s": elapsed,
+                "stages": stages,
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+            }
+        frames = snap["counters"].get("frames_processed", 0)
+        if self.realtime_fps and elapsed > 0:
+            # Video seconds processed per wall second; below 1.0 means falling behind.
+            snap["realtime_factor"] = frames / self.realtime_fps / elapsed
+        return snap
+
+    def prometheus_text(self, prefix: str = "soccer") -> str:
+        lines: List[str] = []
+        with self._lock:
+            lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+            for name, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS, h.counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {h.count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {h.total}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {h.count}')
+            for name, value in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+            for name, value in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {value}")
+        realtime = self.snapshot().get("realtime_factor")
+        if realtime is not None:
+            lines.append(f"# TYPE {prefix}_realtime_factor gauge")
+            lines.append(f"{prefix}_realtime_factor {realtime}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Process-wide metrics registry used by the instrumented pipeline stages."""
+    return METRICS
+
+
+class JsonLinesExporter:
+    """Append a metrics snapshot as one JSON line every ``interval`` seconds."""
+
+    def __init__(self, metrics: Metrics, target: str | Path | TextIO, interval: float = 10.0):
+        self.metrics = metrics
+        self.interval = interval
+        self._owns_stream = isinstance(target, (str, Path))
+        self._stream = Path(target).open("a", encoding="utf-8") if self._owns_stream else target
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-jsonl", daemon=True)
+
+    def start(self) -> "JsonLinesExporter":
+        self._thread.start()
+        return self
+
+    def write(self) -> None:
+        self._stream.write(json.dumps(self.metrics.snapshot()) + "\n")
+        self._stream.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.write()
+        if self._owns_stream:
+            self._stream.close()
+
+
+def serve_prometheus(metrics: Metrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` in Prometheus text format from a daemon thread."""
+    # Deferred: http.server pulls in email/html parsing that instrumented code never needs.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802 - http.server API
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # silence per-request logging
+            return
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_exporters(
+    metrics: Metrics,
+    jsonl_path: str | Path | None = None,
+    interval: float = 10.0,
+    port: int | None = None,
+) -> Callable[[], None]:
+    """Enable ``metrics`` and start the requested exporters; returns a callable that stops them.
+
+    With neither ``jsonl_path`` nor ``port`` the registry stays disabled.
+    """
+    if jsonl_path is None and port is None:
+        return lambda: None
+    metrics.enabled = True
+    metrics.reset()
+    exporter = JsonLinesExporter(metrics, jsonl_path, interval).start() if jsonl_path else None
+    server = serve_prometheus(metrics, port) if port is not None else None
+
+    def stop() -> None:
+        if exporter is not None:
+            exporter.close()
+        if server is not None:
+            server.shutdown()
+
+    return stop
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, NamedTuple, TextIO
+
+import cv2
+import numpy as np
+
+from .homography import HomographySequence
+from .instrumentation import METRICS
+from .types import TrackRecord
+from .video_io import FrameIngest
+from .warp import ProjectionConfig, project_track_arrays
+
+
+class LiveFrame(NamedTuple):
+    frame_index: int
+    frame: np.ndarray
+    captured_at: float  # time.perf_counter() when the frame left the decoder
+
+
+@dataclass
+class LiveUpdate:
+    frame_index: int
+    latency: float  # seconds from capture to emitted result
+    tracks: List[TrackRecord]
+    pitch: np.ndarray | None = None  # (N, 2) pitch coordinates aligned with ``tracks``
+    valid: np.ndarray | None = None  # (N,) False where ``pitch`` is off the pitch or beyond the horizon
+
+    def to_dict(self) -> dict:
+        tracks = [rec.to_dict() for rec in self.tracks]
+        if self.pitch is not None:
+            valid = self.valid if self.valid is not None else np.ones(len(tracks), dtype=bool)
+            for data, (px, py), ok in zip(tracks, self.pitch.tolist(), valid.tolist()):
+                data["pitch"] = [px, py] if ok else None
+        return {"frame_index": self.frame_index, "latency_ms": self.latency * 1e3, "tracks": tracks}
+
+
+def open_capture(source: str) -> cv2.VideoCapture:
+    """Open a camera index (``"0"``), stream URL (rtsp://, udp://, http://) or file path."""
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Cannot open capture source: {source}")
+    return cap
+
+
+class LatestFrameReader:
+    """Decode a capture source on a background thread, keeping only the newest frame.
+
+    Frames the consumer never picked up are overwritten and counted in
+    ``dropped``. ``pace_fps`` replays a file at wall-clock speed so it behaves
+    like a live feed; ``follow`` keeps polling a file that is still being
+    written until no new frame has appeared for ``idle_timeout`` seconds.
+    With ``ingest`` (pool of at least 3), frames are cropped/downscaled into
+    pooled buffers; the matching :class:`LivePipeline` maps boxes back. The
+    pending frame and the one handed out by :meth:`get` are held in the pool,
+    so the decoder writes into a third buffer however far the consumer falls
+    behind; a frame stays valid until :meth:`release` or the next ``get``.
+    """
+
+    def __init__(
+        self,
+        cap: cv2.VideoCapture,
+        pace_fps: float | None = None,
+        follow: bool = False,
+        poll_interval: float = 0.05,
+        idle_timeout: float = 5.0,
+        ingest: FrameIngest | None = None,
+    ):
+        self.cap = cap
+        self.ingest = ingest
+        self.pace_fps = pace_fps
+        self.follow = follow
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.decoded = 0
+        self.dropped = 0
+        self._latest: LiveFrame | None = None
+        self._handed: LiveFrame | None = None  # returned by get(), not yet released
+        self._consumed = True
+        self._finished = False
+        self._error: BaseException | None = None
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="live-decoder", daemon=True)
+
+    def __enter__(self) -> "LatestFrameReader":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def start(self) -> "LatestFrameReader":
+        self._thread.start()
+        return self
+
+    def _read(self, frame_idx: int):
+        idle_since = None
+        while not self._stop.is_set():
+            with METRICS.timer("decode"):
+                if self.ingest is None:
+                    success, frame = self.cap.read()
+                else:
+                    frame = self.ingest.read(self.cap)
+                    success = frame is not None
+            if success:
+                return frame
+            if not self.follow:
+                return None
+            now = time.perf_counter()
+            idle_since = idle_since or now
+            if now - idle_since > self.idle_timeout:
+                return None
+            time.sleep(self.poll_interval)
+            # Re-seek so the demuxer notices data appended after it hit EOF.
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        return None
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        frame_idx = 0
+        try:
+            while not self._stop.is_set():
+                frame = self._read(frame_idx)
+                if frame is None:
+                    break
+                if self.pace_fps:
+                    delay = start + frame_idx / self.pace_fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                with self._cond:
+                    if not self._consumed:
+                        self.dropped += 1
+                        METRICS.incr("frames_dropped")
+                        self._release(self._latest)
+                    if self.ingest is not None:
+                        self.ingest.hold(frame)
+                    self._latest = LiveFrame(frame_idx, frame, time.perf_counter())
+                    self._consumed = False
+                    self.decoded += 1
+                    self._cond.notify_all()
+                frame_idx += 1
+        except BaseException as exc:  # pragma: no cover - surfaced to consumer
+            self._error = exc
+        finally:
+            with self._cond:
+                self._finished = True
+                self._cond.notify_all()
+
+    def get(self, timeout: float | None = None) -> LiveFrame | None:
+        """Block until an unseen frame is available; ``None`` once the source has ended."""
+        with self._cond:
+            ready = self._cond.wait_for(lambda: not self._consumed or self._finished, timeout)
+            if self._error is not None:
+                raise self._error
+            if not ready or self._consumed:
+                return None
+            self._release(self._handed)
+            self._consumed = True
+            self._handed = self._latest
+            return self._latest
+
+    @property
+    def finished(self) -> bool:
+        """Whether the source has ended and every decoded frame was handed out."""
+        with self._cond:
+            return self._finished and self._consumed
+
+    def release(self, item: LiveFrame) -> None:
+        """Hand the buffer of a frame from :meth:`get` back to the decoder."""
+        with self._cond:
+            if item is self._handed:
+                self._release(item)
+                self._handed = None
+
+    def _release(self, item: LiveFrame | None) -> None:
+        if item is not None and self.ingest is not None:
+            self.ingest.release(item.frame)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+@dataclass
+class LiveConfig:
+    latency_budget: float = 0.2  # seconds from capture to emitted update
+    fps: float = 25.0  # source frame rate, used to judge whether waiting for a fresher frame pays off
+    smoothing: float = 0.2  # EMA weight of the newest processing-time sample
+    max_consecutive_skips: int = 5
+    poll_interval: float = 0.1  # seconds between checks of the deadline and stop flag while waiting
+
+
+class AdaptiveSkipPolicy:
+    """Skip frames that are already too old to make the latency budget.
+
+    Processing time is tracked as an EMA. A frame is skipped when its age plus
+    the expected processing time exceeds the budget, but only if a fresh frame
+    could still make it (otherwise skipping just loses data), and never more
+    than ``max_consecutive_skips`` times in a row.
+    """
+
+    def __init__(self, config: LiveConfig):
+        self.config = config
+        self.expected = 0.0
+        self._consecutive = 0
+
+    def observe(self, processing_time: float) -> None:
+        if self.expected == 0.0:
+            self.expected = processing_time
+        else:
+            alpha = self.config.smoothing
+            self.expected = (1 - alpha) * self.expected + alpha * processing_time
+
+    def should_skip(self, age: float) -> bool:
+        cfg = self.config
+        late = age + self.expected > cfg.latency_budget
+        recoverable = self.expected + 1.0 / cfg.fps <= cfg.latency_budget
+        if late and recoverable and self._consecutive < cfg.max_consecutive_skips:
+            self._consecutive += 1
+            return True
+        self._consecutive = 0
+        return False
+
+
+@dataclass
+class LatencyReport:
+    budget: float
+    latencies: List[float] = field(default_factory=list)
+    skipped: int = 0
+    dropped: int = 0
+    decoded: int = 0
+
+    @property
+    def processed(self) -> int:
+        return len(self.latencies)
+
+    def summary(self) -> dict:
+        lat = np.asarray(self.latencies, dtype=np.float64)
+        misses = int((lat > self.budget).sum())
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99]) * 1e3 if lat.size else (0.0, 0.0, 0.0)
+        return {
+            "budget_ms": self.budget * 1e3,
+            "decoded": self.decoded,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "budget_misses": misses,
+            "miss_rate": misses / max(lat.size, 1),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(lat.max() * 1e3) if lat.size else 0.0,
+        }
+
+
+class LivePipeline:
+    """Detect, track and (optionally) project the freshest frame of a live source.
+
+    Every processed frame produces a :class:`LiveUpdate` passed to ``on_update``.
+    Projections are checked against ``projection`` (by default sized to the
+    source frames) and flagged in :attr:`LiveUpdate.valid`.
+    Frames are lost in two places, both counted in the report: the reader
+    overwrites frames while inference is busy (``dropped``) and the skip policy
+    discards frames that arrive too stale to meet the budget (``skipped``).
+    """
+
+    def __init__(
+        self,
+        detector,
+        tracker,
+        config: LiveConfig | None = None,
+        H: np.ndarray | HomographySequence | None = None,
+        on_update: Callable[[LiveUpdate], None] | None = None,
+        ingest: FrameIngest | None = None,
+        projection: ProjectionConfig | None = None,
+    ):
+        self.detector = detector
+        self.tracker = tracker
+        self.config = config or LiveConfig()
+        self.H = H
+        self.projection = projection
+        self.on_update = on_update
+        self.ingest = ingest
+        self.policy = AdaptiveSkipPolicy(self.config)
+        self.report: LatencyReport | None = None  # kept current so an interrupted run can still report
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Make :meth:`run` return within ``poll_interval``, e.g. from a signal handler or another thread."""
+        self._stop.set()
+
+    def process(self, item: LiveFrame) -> LiveUpdate:
+        detections = self.detector.detect_batch([item.frame])[0]
+        if self.ingest is not None:
+            detections = self.ingest.map_detections(detections)
+        tracks = self.tracker.update(detections, item.frame_index)
+        pitch = valid = None
+        if self.H is not None:
+            pitch, valid = project_track_arrays(
+                np.full(len(tracks), item.frame_index),
+                np.array([rec.bbox for rec in tracks], dtype=np.float64).reshape(-1, 4),
+                self.H,
+                self._projection(item),
+                return_valid=True,
+            )
+        return LiveUpdate(item.frame_index, time.perf_counter() - item.captured_at, tracks, pitch, valid)
+
+    def _projection(self, item: LiveFrame) -> ProjectionConfig:
+        if self.projection is None:
+            # Boxes are in source pixels, so the horizon reference is the source frame's.
+            size = self.ingest.source_size if self.ingest is not None else item.frame.shape[1::-1]
+            self.projection = ProjectionConfig(image_size=tuple(size))
+        return self.projection
+
+    def run(
+        self, reader: LatestFrameReader, max_frames: int | None = None, duration: float | None = None
+    ) -> LatencyReport:
+        report = self.report = LatencyReport(budget=self.config.latency_budget)
+        try:
+            self._run(reader, report, max_frames, duration)
+        finally:
+            report.decoded = reader.decoded
+            report.dropped = reader.dropped
+        return report
+
+    def _run(
+        self, reader: LatestFrameReader, report: LatencyReport, max_frames: int | None, duration: float | None
+    ) -> None:
+        deadline = time.perf_counter() + duration if duration else None
+        while (max_frames is None or report.processed < max_frames) and not self._stop.is_set():
+            timeout = self.config.poll_interval
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.perf_counter())
+                if timeout <= 0:
+                    break
+            # A stalled source must not block past the deadline or a stop request.
+            item = reader.get(timeout)
+            if item is None:
+                if reader.finished:
+                    break
+                continue
+            if self.policy.should_skip(time.perf_counter() - item.captured_at):
+                reader.release(item)
+                report.skipped += 1
+                METRICS.incr("frames_skipped")
+                continue
+            started = time.perf_counter()
+            try:
+                update = self.process(item)
+            finally:
+                reader.release(item)
+            self.policy.observe(time.perf_counter() - started)
+            report.latencies.append(update.latency)
+            METRICS.incr("frames_processed")
+            METRICS.observe("end_to_end", update.latency)
+            if update.latency > self.config.latency_budget:
+                METRICS.incr("budget_misses")
+            if self.on_update is not None:
+                self.on_update(update)
+
+
+class JsonLinesSink:
+    """``on_update`` callback writing one JSON object per processed frame."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def __call__(self, update: LiveUpdate) -> None:
+        self.stream.write(json.dumps(update.to_dict()) + "\n")
+        self.stream.flush()
@@ -5,6 +5,8 @@ from dataclasses import dataclass
 import numpy as np
 import pandas as pd
 
+from .instrumentation import METRICS
+
 
 @dataclass
 class ExpectedThreatTable:
@@ -20,29 +22,80 @@ class ExpectedThreatTable:
         self.nx = int(df["x_bin"].max()) + 1
         self.ny = int(df["y_bin"].max()) + 1
         grid = np.full((self.ny, self.nx), 0.0, dtype=np.float64)
-        for row in df.itertuples():
-            grid[int(row.y_bin), int(row.x_bin)] = float(row.value)
+        y_bin = df["y_bin"].to_numpy(dtype=np.intp)
+        x_bin = df["x_bin"].to_numpy(dtype=np.intp)
+        grid[y_bin, x_bin] = df["value"].to_numpy(dtype=np.float64)
         self.grid = grid
 
     def value_at(self, px: float, py: float) -> float:
-        nx, ny = self.nx, self.ny
-        x_norm = np.clip(px / self.pitch_length, 0.0, 0.999)
-        y_norm = np.clip(py / self.pitch_width, 0.0, 0.999)
-        x_idx = int(x_norm * nx)
-        y_idx = int(y_norm * ny)
-        return float(self.grid[y_idx, x_idx])
+        return float(self.values_at(np.asarray([px]), np.asarray([py]))[0])
+
+    def values_at(
+        self, px: np.ndarray, py: np.ndarray, interpolate: bool = False
+    ) -> np.ndarray:
+        """Look up xT for arrays of pitch coordinates in one pass.
+
+        With ``interpolate`` the grid is treated as samples at cell centres and
+        values are bilinearly interpolated between neighbouring cells.
+        """
+        px = np.asarray(px, dtype=np.float64)
+        py = np.asarray(py, dtype=np.float64)
+        if interpolate:
+            return self._bilinear(px, py)
+        x_idx = (np.clip(px / self.pitch_length, 0.0, 0.999) * self.nx).astype(np.intp)
+        y_idx = (np.clip(py / self.pitch_width, 0.0, 0.999) * self.ny).astype(np.intp)
+        return self.grid[y_idx, x_idx]
+
+    def _bilinear(self, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        gx = np.clip(px / self.pitch_length * self.nx - 0.5, 0.0, self.nx - 1)
+        gy = np.clip(py / self.pitch_width * self.ny - 0.5, 0.0, self.ny - 1)
+        x0 = np.floor(gx).astype(np.intp)
+        y0 = np.floor(gy).astype(np.intp)
+        x1 = np.minimum(x0 + 1, self.nx - 1)
+        y1 = np.minimum(y0 + 1, self.ny - 1)
+        wx = gx - x0
+        wy = gy - y0
+        grid = self.grid
+        top = grid[y0, x0] * (1.0 - wx) + grid[y0, x1] * wx
+        bottom = grid[y1, x0] * (1.0 - wx) + grid[y1, x1] * wx
+        return top * (1.0 - wy) + bottom * wy
 
 
-def compute_xt(samples: pd.DataFrame, xt_table: ExpectedThreatTable) -> pd.DataFrame:
+def segment_starts(keys: np.ndarray) -> np.ndarray:
+    """Indices where a sorted key array changes value (always includes 0)."""
+    if len(keys) == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+@METRICS.timed("xt")
+def compute_xt(
+    samples: pd.DataFrame,
+    xt_table: ExpectedThreatTable,
+    interpolate: bool = False,
+    on_ball: np.ndarray | None = None,
+) -> pd.DataFrame:
+    """Sum of each track's frame-to-frame xT change.
+
+    With ``on_ball`` (one flag per sample, e.g. from
+    :func:`soccer.core.possession.on_ball_mask`) only steps between two
+    consecutive on-ball samples of a track count, so players are credited for
+    carrying the ball rather than for every run they make.
+    """
     if samples.empty:
         return pd.DataFrame(columns=["track_id", "xt"])
-    samples = samples.copy()
-    samples.sort_values(["track_id", "frame_index"], inplace=True)
-    samples["xt_value"] = samples.apply(
-        lambda row: xt_table.value_at(row.pitch_x, row.pitch_y), axis=1
-    )
-    samples["xt_delta"] = samples.groupby("track_id")["xt_value"].diff().fillna(0.0)
-    agg = (
-        samples.groupby("track_id")["xt_delta"].sum().reset_index().rename(columns={"xt_delta": "xt"})
+    track_ids = samples["track_id"].to_numpy()
+    order = np.lexsort((samples["frame_index"].to_numpy(), track_ids))
+    track_ids = track_ids[order]
+    values = xt_table.values_at(
+        samples["pitch_x"].to_numpy()[order],
+        samples["pitch_y"].to_numpy()[order],
+        interpolate=interpolate,
     )
-    return agg
+    starts = segment_starts(track_ids)
+    deltas = np.diff(values, prepend=values[0])
+    deltas[starts] = 0.0
+    if on_ball is not None:
+        held = np.asarray(on_ball, dtype=bool)[order]
+        deltas[~(held & np.r_[False, held[:-1]])] = 0.0
+    return pd.DataFrame({"track_id": track_ids[starts], "xt": np.add.reduceat(deltas, starts)})
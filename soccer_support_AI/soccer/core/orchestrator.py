@@ -0,0 +1,375 @@
+"""Resumable multi-match batch runs of the pipeline scripts.
+
+A YAML manifest lists matches; each match expands into a small DAG of stages
+(detect-track -> homography -> warp -> compute-xt) that run the ``soccer``
+commands in-process. A stage is skipped when the hash of its command line and
+input contents matches the one recorded after its last successful run and its
+outputs are unchanged. Detection shares a detection cache that resumes from
+its last flushed chunk, so a crashed match restarts close to where it stopped.
+Independent matches run on a local process pool, each worker pinned to its own
+CPU set and optionally capped in address space.
+
+Manifest layout::
+
+    work_dir: runs/season        # relative paths resolve against the manifest
+    defaults:
+      detect_args: [--tracker, bytetrack, --batch-size, "8"]
+      xt_table: configs/xt_table.csv
+    matches:
+      - id: m001
+        video: videos/m001.mp4
+        points: points/m001.csv   # or homography: H/m001.yaml
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+STATE_DIR = ".state"
+FULL_HASH_LIMIT = 64 << 20
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+@dataclass
+class MatchSpec:
+    match_id: str
+    video: str
+    xt_table: str
+    points: str | None = None
+    homography: str | None = None
+    detect_args: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Stage:
+    name: str
+    command: str
+    args: List[str]
+    inputs: List[str]
+    outputs: List[str]
+    deps: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StageResult:
+    match_id: str
+    stage: str
+    status: str  # "ran", "skipped", "failed", "blocked" or "stale" (dry run)
+    seconds: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class ResourceLimits:
+    """Per-worker limits; ``None`` leaves the inherited setting untouched."""
+
+    cpus_per_worker: int | None = None
+    memory_mb: int | None = None
+
+
+def load_manifest(path: str | Path) -> tuple[Path, List[MatchSpec]]:
+    """Read a manifest into ``(work_dir, matches)`` with paths made absolute."""
+    import yaml
+
+    path = Path(path)
+    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    base = path.resolve().parent
+
+    def resolve(value):
+        return None if value is None else str((base / value).resolve())
+
+    defaults = data.get("defaults") or {}
+    matches = []
+    for entry in data.get("matches") or []:
+        if "id" not in entry or "video" not in entry:
+            raise ValueError(f"Manifest match entries need 'id' and 'video': {entry}")
+        if not entry.get("points") and not entry.get("homography"):
+            raise ValueError(f"Match {entry['id']} needs 'points' or 'homography'")
+        xt_table = entry.get("xt_table", defaults.get("xt_table"))
+        if not xt_table:
+            raise ValueError(f"Match {entry['id']} needs an 'xt_table' (or one in defaults)")
+        matches.append(
+            MatchSpec(
+                match_id=str(entry["id"]),
+                video=resolve(entry["video"]),
+                xt_table=resolve(xt_table),
+                points=resolve(entry.get("points")),
+                homography=resolve(entry.get("homography")),
+                detect_args=[str(a) for a in entry.get("detect_args", defaults.get("detect_args", []))],
+            )
+        )
+    ids = [m.match_id for m in matches]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Manifest match ids must be unique")
+    return Path(resolve(data.get("work_dir", "work"))), matches
+
+
+def build_stages(match: MatchSpec, work_dir: str | Path) -> List[Stage]:
+    """Stages of one match in dependency order."""
+    work_dir = Path(work_dir)
+    match_dir = work_dir / match.match_id
+    tracks = str(match_dir / "tracks")
+    xy = str(match_dir / "xy.csv")
+    xt = str(match_dir / "xt_player.csv")
+    # The detection cache is shared and not an output: it only makes reruns cheaper.
+    detect_args = ["--input", match.video, "--out", tracks, "--detection-cache", str(work_dir / "det_cache")]
+    detect_inputs = [match.video]
+    if "--detector" in match.detect_args[:-1]:
+        # Retrained weights at the same path must rerun detection.
+        detect_inputs.append(match.detect_args[match.detect_args.index("--detector") + 1])
+    stages = [
+        Stage("detect_track", "detect-track", [*detect_args, *match.detect_args], detect_inputs, [tracks])
+    ]
+    H = match.homography
+    warp_deps = ["detect_track"]
+    if match.points:
+        H = str(match_dir / "H.yaml")
+        stages.append(
+            Stage("homography", "homography", ["--point-csv", match.points, "--out", H], [match.points], [H])
+        )
+        warp_deps.append("homography")
+    warp_args = ["--tracks", tracks, "--H", H, "--out", xy]
+    stages.append(Stage("warp", "warp", warp_args, [tracks, H], [xy], warp_deps))
+    xt_args = ["--xy", xy, "--xt-table", match.xt_table, "--out", xt]
+    stages.append(Stage("xt", "compute-xt", xt_args, [xy, match.xt_table], [xt], ["warp"]))
+    return stages
+
+
+class HashCache:
+    """Content digests of files and directories, memoised by size and mtime."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._entries: Dict[str, list] = {}
+        if self.path.exists():
+            self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def digest(self, path: str | Path) -> str | None:
+        """Digest of ``path`` (``None`` if it is missing); directories hash their files."""
+        path = Path(path)
+        if path.is_dir():
+            digest = hashlib.sha1()
+            for child in sorted(p for p in path.rglob("*") if p.is_file()):
+                digest.update(f"{child.relative_to(path)}={self.digest(child)};".encode())
+            return digest.hexdigest()
+        if not path.is_file():
+            return None
+        stat = path.stat()
+        key = str(path.resolve())
+        cached = self._entries.get(key)
+        if cached and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return cached[2]
+        value = _file_digest(path, stat.st_size)
+        self._entries[key] = [stat.st_size, stat.st_mtime_ns, value]
+        return value
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self._entries), encoding="utf-8")
+
+
+def _file_digest(path: Path, size: int) -> str:
+    if size > FULL_HASH_LIMIT:
+        # Match videos are gigabytes; sample them the same way the detection cache does.
+        from .detection_cache import video_fingerprint
+
+        return video_fingerprint(path)
+    digest = hashlib.sha1()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_key(stage: Stage, hashes: HashCache) -> str:
+    payload = {
+        "command": stage.command,
+        "args": stage.args,
+        "inputs": {path: hashes.digest(path) for path in stage.inputs},
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _state_path(match_dir: Path, stage: Stage) -> Path:
+    return match_dir / STATE_DIR / f"{stage.name}.json"
+
+
+def is_up_to_date(stage: Stage, key: str, match_dir: Path, hashes: HashCache) -> bool:
+    state_path = _state_path(match_dir, stage)
+    if not state_path.exists():
+        return False
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    if state.get("key") != key:
+        return False
+    return all(hashes.digest(path) == state["outputs"].get(path) for path in stage.outputs)
+
+
+def run_stage(stage: Stage, log_path: Path) -> int:
+    """Run one stage's command in this process with its output captured to ``log_path``."""
+    from soccer.cli import run_command
+
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with log_path.open("w", encoding="utf-8") as log:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            return run_command(stage.command, stage.args)
+
+
+def run_match(
+    match: MatchSpec, work_dir: str | Path, force: bool = False, dry_run: bool = False
+) -> List[StageResult]:
+    """Run the stale stages of one match; failures block their dependents only."""
+    match_dir = Path(work_dir) / match.match_id
+    hashes = HashCache(match_dir / STATE_DIR / "hashes.json")
+    results: Dict[str, StageResult] = {}
+    for stage in build_stages(match, work_dir):
+        if any(results[dep].status in ("failed", "blocked", "stale") for dep in stage.deps):
+            status = "stale" if dry_run else "blocked"
+            results[stage.name] = StageResult(match.match_id, stage.name, status)
+            continue
+        key = stage_key(stage, hashes)
+        if not force and is_up_to_date(stage, key, match_dir, hashes):
+            results[stage.name] = StageResult(match.match_id, stage.name, "skipped")
+            continue
+        if dry_run:
+            results[stage.name] = StageResult(match.match_id, stage.name, "stale")
+            continue
+        start = time.perf_counter()
+        try:
+            code = run_stage(stage, match_dir / "logs" / f"{stage.name}.log")
+            error = f"exit code {code}" if code else None
+        except Exception as exc:  # noqa: BLE001 - one stage must not take down the batch
+            error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        seconds = time.perf_counter() - start
+        if error is None:
+            state = {
+                "key": key,
+                "outputs": {path: hashes.digest(path) for path in stage.outputs},
+                "seconds": seconds,
+                "finished": time.time(),
+            }
+            state_path = _state_path(match_dir, stage)
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        results[stage.name] = StageResult(
+            match.match_id, stage.name, "failed" if error else "ran", seconds, error
+        )
+    hashes.save()
+    return list(results.values())
+
+
+def partition_cpus(workers: int, cpus_per_worker: int | None = None) -> List[List[int]]:
+    """Disjoint CPU sets, one per worker, from this process's affinity mask."""
+    if hasattr(os, "sched_getaffinity"):
+        available = sorted(os.sched_getaffinity(0))
+    else:
+        available = list(range(os.cpu_count() or 1))
+    size = cpus_per_worker or max(1, len(available) // workers)
+    return [[available[(w * size + i) % len(available)] for i in range(size)] for w in range(workers)]
+
+
+def _init_worker(cpu_sets, limits: ResourceLimits) -> None:
+    cpus = cpu_sets.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    # Spawned workers have not imported numpy/onnxruntime/torch yet, so these take effect.
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(len(cpus))
+    if limits.memory_mb:
+        import resource
+
+        limit = limits.memory_mb << 20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def run_matches(
+    matches: Sequence[MatchSpec],
+    work_dir: str | Path,
+    workers: int = 1,
+    limits: ResourceLimits | None = None,
+    force: bool = False,
+    dry_run: bool = False,
+    on_match=None,
+) -> List[StageResult]:
+    """Run every match, ``workers`` at a time; ``on_match(results)`` is called as each finishes."""
+    limits = limits or ResourceLimits()
+    results: List[StageResult] = []
+    if workers <= 1 or len(matches) <= 1:
+        for match in matches:
+            match_results = run_match(match, work_dir, force, dry_run)
+            results.extend(match_results)
+            if on_match:
+                on_match(match_results)
+        return results
+
+    workers = min(workers, len(matches))
+    context = multiprocessing.get_context("spawn")
+    cpu_sets = context.Queue()
+    for cpus in partition_cpus(workers, limits.cpus_per_worker):
+        cpu_sets.put(cpus)
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(cpu_sets, limits)
+    ) as pool:
+        futures = {pool.submit(run_match, match, work_dir, force, dry_run): match for match in matches}
+        for future in as_completed(futures):
+            try:
+                match_results = future.result()
+            except Exception as exc:  # noqa: BLE001 - e.g. a worker killed by the OOM limit
+                match_results = [
+                    StageResult(futures[future].match_id, "*", "failed", error=f"worker died: {exc!r}")
+                ]
+            results.extend(match_results)
+            if on_match:
+                on_match(match_results)
+    return results
+
+
+def summarize(results: Sequence[StageResult]) -> Dict[str, object]:
+    """Per-stage counts and time spent, plus the failed stages."""
+    stages: Dict[str, Dict[str, float]] = {}
+    for result in results:
+        entry = stages.setdefault(result.stage, {"seconds": 0.0})
+        entry[result.status] = entry.get(result.status, 0) + 1
+        entry["seconds"] += result.seconds
+    return {
+        "stages": stages,
+        "total_seconds": sum(r.seconds for r in results),
+        "failed": [asdict(r) for r in results if r.status == "failed"],
+    }
+
+
+def format_summary(results: Sequence[StageResult], wall_seconds: float) -> str:
+    summary = summarize(results)
+    statuses = ("ran", "skipped", "failed", "blocked", "stale")
+    lines = [f"{'stage':<14}" + "".join(f"{s:>9}" for s in statuses) + f"{'seconds':>10}"]
+    for name, entry in summary["stages"].items():
+        counts = "".join(f"{int(entry.get(s, 0)):>9}" for s in statuses)
+        lines.append(f"{name:<14}{counts}{entry['seconds']:>10.1f}")
+    lines.append(f"stage time {summary['total_seconds']:.1f}s, wall time {wall_seconds:.1f}s")
+    for failure in summary["failed"]:
+        lines.append(f"FAILED {failure['match_id']}/{failure['stage']}: {failure['error']}")
+    return "\n".join(lines)
+
+
+def write_run_report(
+    results: Sequence[StageResult], work_dir: str | Path, wall_seconds: float, settings: dict | None = None
+) -> Path:
+    """Write ``<work_dir>/runs/<timestamp>.json`` with every stage result and the summary."""
+    path = Path(work_dir) / "runs" / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "settings": settings or {},
+        "wall_seconds": wall_seconds,
+        "summary": summarize(results),
+        "results": [asdict(r) for r in results],
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
@@ -0,0 +1,186 @@
+"""Ball possession from projected player and ball tracks.
+
+Every frame's ball is assigned to the nearest player within
+``max_distance`` metres. Rather than comparing the ball with every player,
+all player samples of a match go into one KD-tree over
+``(pitch_x, pitch_y, frame_index * spacing)``. The spacing exceeds the
+search radius, so one vectorised nearest-neighbour query per ball sample
+only ever sees players of its own frame. Raw owners are then cleaned with
+run-length rules: brief losses between touches of the same player are
+bridged, and spells too short to be real possession are dropped.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import METRICS
+
+NO_OWNER = -1
+POSSESSION_COLUMNS = ("frame_index", "track_id", "ball_x", "ball_y", "distance")
+
+
+@dataclass
+class PossessionConfig:
+    max_distance: float = 2.0  # metres between ball and player for control
+    min_frames: int = 5  # shorter spells are deflections, not possession
+    hold_frames: int = 12  # gaps up to this long between touches of one player are bridged
+    max_gap: int = 50  # ball frames missing up to this long are interpolated
+
+
+def run_lengths(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """``(starts, lengths)`` of runs of equal consecutive values."""
+    if len(values) == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    return starts, np.diff(np.r_[starts, len(values)])
+
+
+def interpolate_ball(
+    frame_index: np.ndarray, xy: np.ndarray, max_gap: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fill missing frames of ``(N, 2)`` ball positions linearly across gaps of at most ``max_gap``.
+
+    Duplicate frames keep their first sample. Returns sorted ``(frames, xy)``.
+    """
+    frame_index = np.asarray(frame_index, dtype=np.int64)
+    if len(frame_index) == 0:
+        return frame_index, np.empty((0, 2))
+    frames, first = np.unique(frame_index, return_index=True)
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)[first]
+    gaps = np.diff(frames)
+    fill = (gaps > 1) & (gaps <= max_gap + 1)
+    if not fill.any():
+        return frames, xy
+    missing = np.concatenate(
+        [np.arange(a + 1, b) for a, b in zip(frames[:-1][fill].tolist(), frames[1:][fill].tolist())]
+    )
+    all_frames = np.sort(np.concatenate([frames, missing]))
+    filled = np.column_stack([np.interp(all_frames, frames, xy[:, k]) for k in range(2)])
+    return all_frames, filled
+
+
+def nearest_players(
+    player_frames: np.ndarray,
+    player_ids: np.ndarray,
+    player_xy: np.ndarray,
+    ball_frames: np.ndarray,
+    ball_xy: np.ndarray,
+    max_distance: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """``(track_id, distance)`` of the nearest same-frame player to each ball sample.
+
+    Balls without a player within ``max_distance`` get :data:`NO_OWNER` and ``inf``.
+    """
+    from scipy.spatial import cKDTree
+
+    owners = np.full(len(ball_frames), NO_OWNER, dtype=np.int64)
+    distance = np.full(len(ball_frames), np.inf)
+    player_ids = np.asarray(player_ids)
+    valid = np.isfinite(player_xy).all(axis=1)
+    if not valid.any() or len(ball_frames) == 0:
+        return owners, distance
+    spacing = 4.0 * max_distance + 1.0
+    # Offsetting by the first frame keeps the z coordinate small.
+    origin = min(int(np.min(player_frames)), int(np.min(ball_frames)))
+    players = np.column_stack([player_xy[valid], (player_frames[valid] - origin) * spacing])
+    balls = np.column_stack([ball_xy, (np.asarray(ball_frames) - origin) * spacing])
+    tree = cKDTree(players, balanced_tree=False, compact_nodes=False)
+    found = np.isfinite(balls).all(axis=1)
+    d, idx = tree.query(balls[found], k=1, distance_upper_bound=max_distance)
+    hit = np.isfinite(d)
+    rows = np.flatnonzero(found)[hit]
+    owners[rows] = player_ids[valid][idx[hit]]
+    distance[rows] = d[hit]
+    return owners, distance
+
+
+def smooth_owners(owners: np.ndarray, min_frames: int, hold_frames: int) -> np.ndarray:
+    """Bridge short ownerless gaps inside one player's spell, then drop spells under ``min_frames``.
+
+    ``owners`` must be one entry per consecutive frame.
+    """
+    owners = np.asarray(owners, dtype=np.int64)
+    starts, lengths = run_lengths(owners)
+    values = owners[starts]
+    inner = np.arange(1, len(starts) - 1)
+    bridge = inner[
+        (values[inner] == NO_OWNER)
+        & (lengths[inner] <= hold_frames)
+        & (values[inner - 1] == values[inner + 1])
+    ]
+    values[bridge] = values[bridge - 1]
+    owners = np.repeat(values, lengths)
+    starts, lengths = run_lengths(owners)
+    values = owners[starts]
+    values[(values != NO_OWNER) & (lengths < min_frames)] = NO_OWNER
+    return np.repeat(values, lengths)
+
+
+@METRICS.timed("possession")
+def infer_possession(
+    players: Dict[str, np.ndarray], ball: Dict[str, np.ndarray], config: PossessionConfig | None = None
+) -> pd.DataFrame:
+    """Per-frame ball owner from projected columns (``frame_index``, ``pitch_x``, ``pitch_y``).
+
+    ``players`` also needs ``track_id``. Returns one row per ball frame (after
+    gap interpolation) with :data:`POSSESSION_COLUMNS`; ``track_id`` is
+    :data:`NO_OWNER` while nobody controls the ball.
+    """
+    cfg = config or PossessionConfig()
+    frames, ball_xy = interpolate_ball(
+        ball["frame_index"], np.column_stack([ball["pitch_x"], ball["pitch_y"]]), cfg.max_gap
+    )
+    owners, distance = nearest_players(
+        np.asarray(players["frame_index"], dtype=np.int64),
+        players["track_id"],
+        np.column_stack([players["pitch_x"], players["pitch_y"]]).astype(np.float64),
+        frames,
+        ball_xy,
+        cfg.max_distance,
+    )
+    # Smooth on the dense frame range so ball-less frames break spells.
+    if len(frames):
+        dense = np.full(int(frames[-1] - frames[0]) + 1, NO_OWNER, dtype=np.int64)
+        dense[frames - frames[0]] = owners
+        owners = smooth_owners(dense, cfg.min_frames, cfg.hold_frames)[frames - frames[0]]
+    return pd.DataFrame(
+        {
+            "frame_index": frames,
+            "track_id": owners,
+            "ball_x": ball_xy[:, 0],
+            "ball_y": ball_xy[:, 1],
+            "distance": distance,
+        }
+    )
+
+
+def on_ball_mask(
+    frame_index: np.ndarray, track_id: np.ndarray, possession: pd.DataFrame
+) -> np.ndarray:
+    """Whether each ``(frame_index, track_id)`` sample is the ball owner of its frame."""
+    held = possession[possession["track_id"] != NO_OWNER]
+    return np.isin(_pair_keys(frame_index, track_id), _pair_keys(held["frame_index"], held["track_id"]))
+
+
+def _pair_keys(frame_index, track_id) -> np.ndarray:
+    """One int64 per ``(frame_index, track_id)`` pair."""
+    frames = np.asarray(frame_index, dtype=np.int64)
+    return (frames << 32) | (np.asarray(track_id, dtype=np.int64) & 0xFFFFFFFF)
+
+
+def possession_summary(possession: pd.DataFrame) -> pd.DataFrame:
+    """Frames and spells of possession per track, most possession first."""
+    owners = possession["track_id"].to_numpy()
+    starts, _ = run_lengths(owners)
+    spells = pd.Series(owners[starts]).value_counts()
+    frames = pd.Series(owners[owners != NO_OWNER]).value_counts()
+    summary = pd.DataFrame(
+        {"frames": frames, "spells": spells.reindex(frames.index).fillna(0).astype(int)}
+    )
+    summary.index.name = "track_id"
+    return summary.reset_index()
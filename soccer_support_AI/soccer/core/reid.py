@@ -0,0 +1,472 @@
+"""Appearance re-identification to recover player identities across camera cuts.
+
+Trackers lose every track at a broadcast cut, so one player collects many
+track IDs per match. :class:`ReIDLinker` maps tracker IDs to persistent
+identities online: a new track is compared against a bounded gallery of
+recent embeddings of identities that are currently lost and is re-linked to
+the best match above a similarity threshold. :func:`merge_identities` is
+the offline pass over a finished store; it merges identities that never
+appear in the same frame and whose mean embeddings agree.
+
+Embeddings come from kit colour histograms by default (no model needed) or
+from a Re-ID network on ONNX Runtime. Either way all tracks of a frame are
+embedded in one batch.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .instrumentation import METRICS
+from .track_store import TrackStoreReader, TrackStoreWriter
+
+TRACKLET_FILE = "tracklets.npz"
+
+
+@dataclass
+class ReIDConfig:
+    embedder: str = "hist"  # "hist" (kit colour histograms) or "onnx" (Re-ID network)
+    model_path: str | None = None  # onnx: Re-ID model taking (N, 3, H, W) RGB crops
+    device: str | None = None  # onnx: cpu, openvino or cuda
+    threads: int | None = None  # onnx: intra-op CPU threads
+    crop_size: Tuple[int, int] = (32, 64)  # hist: (width, height) every crop is resized to
+    hue_bins: int = 16
+    sat_bins: int = 4
+    stride: int = 5  # embed each track every N frames; new tracks are always embedded
+    gallery_size: int = 16  # most recent embeddings kept per identity
+    similarity: float = 0.85  # cosine similarity needed to re-link a new track
+    margin: float = 0.02  # ...and by how much the match must beat the runner-up (identical kits tie)
+    max_lost: int = 1500  # frames an identity stays linkable after it was last seen
+    merge_similarity: float = 0.9  # offline merge threshold on identity mean embeddings
+
+
+def _crop_stack(frame: np.ndarray, boxes: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """``(N, h, w, 3)`` crops of xyxy ``boxes`` resized to ``size = (w, h)``."""
+    height, width = frame.shape[:2]
+    w, h = size
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    x1 = np.clip(np.floor(boxes[:, 0]), 0, width - 1).astype(np.intp)
+    y1 = np.clip(np.floor(boxes[:, 1]), 0, height - 1).astype(np.intp)
+    x2 = np.maximum(np.clip(np.ceil(boxes[:, 2]), 0, width).astype(np.intp), x1 + 1)
+    y2 = np.maximum(np.clip(np.ceil(boxes[:, 3]), 0, height).astype(np.intp), y1 + 1)
+    stack = np.empty((len(boxes), h, w, 3), dtype=np.uint8)
+    for i, (a, b, c, d) in enumerate(zip(x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist())):
+        stack[i] = cv2.resize(frame[b:d, a:c], (w, h), interpolation=cv2.INTER_AREA)
+    return stack
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norm, 1e-12)
+
+
+class HistogramEmbedder:
+    """Hue/saturation histograms of the shirt and shorts bands of each crop.
+
+    Green pitch and dark pixels are ignored, so the embedding describes the
+    kit. Crops are stacked into one image, so the colour conversion and the
+    histograms run once per frame rather than once per track.
+    """
+
+    def __init__(self, config: ReIDConfig):
+        self.config = config
+        self.bins = config.hue_bins * config.sat_bins
+        self.dim = 2 * self.bins
+        _, h = config.crop_size
+        rows = np.arange(h) / h
+        # Band 0 is the shirt, band 1 the shorts; head and legs are skipped.
+        self._band = np.select([(rows >= 0.15) & (rows < 0.5), (rows >= 0.5) & (rows < 0.8)], [0, 1], -1)
+
+    @METRICS.timed("reid_embed")
+    def embed(self, frame: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        cfg = self.config
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        n = len(boxes)
+        if n == 0:
+            return np.empty((0, self.dim), dtype=np.float32)
+        stack = _crop_stack(frame, boxes, cfg.crop_size)
+        _, h, w, _ = stack.shape
+        hsv = cv2.cvtColor(stack.reshape(n * h, w, 3), cv2.COLOR_BGR2HSV).reshape(n, h, w, 3)
+        hue, sat, val = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+        pitch = (hue >= 35) & (hue <= 85) & (sat >= 60)
+        band = self._band[None, :, None]
+        keep = ~pitch & (val >= 30) & (band >= 0)
+        hue_bin = hue.astype(np.intp) * cfg.hue_bins // 180
+        cell = hue_bin * cfg.sat_bins + sat.astype(np.intp) * cfg.sat_bins // 256
+        index = (np.arange(n)[:, None, None] * 2 + band) * self.bins + cell
+        hist = np.bincount(index[keep], minlength=n * self.dim).reshape(n, 2, self.bins).astype(np.float32)
+        hist /= np.maximum(hist.sum(axis=2, keepdims=True), 1.0)
+        # Square roots turn the L2 dot product into the Bhattacharyya coefficient.
+        return _normalize(np.sqrt(hist).reshape(n, self.dim))
+
+
+class OnnxEmbedder:
+    """Re-ID network (e.g. an OSNet export) on ONNX Runtime.
+
+    Crops are resized to the model input, converted to RGB with ImageNet
+    normalisation and run as one batch (chunked for static batch exports).
+    """
+
+    _PROVIDERS = {
+        "cpu": ["CPUExecutionProvider"],
+        "openvino": ["OpenVINOExecutionProvider", "CPUExecutionProvider"],
+        "cuda": ["CUDAExecutionProvider", "CPUExecutionProvider"],
+    }
+    _MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32) * 255.0
+    _STD = np.array([0.229, 0.224, 0.225], dtype=np.float32) * 255.0
+
+    def __init__(self, config: ReIDConfig):
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ImportError(
+                "onnxruntime is missing. Install onnxruntime for the onnx Re-ID embedder."
+            ) from exc
+        if not config.model_path:
+            raise ValueError("The onnx Re-ID embedder needs model_path")
+        self.config = config
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if config.threads:
+            options.intra_op_num_threads = config.threads
+        device = (config.device or "cpu").split(":")[0].lower()
+        if device not in self._PROVIDERS:
+            raise ValueError(f"Unsupported onnx device '{config.device}'; use cpu, openvino or cuda")
+        self.session = ort.InferenceSession(config.model_path, options, providers=self._PROVIDERS[device])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch_dim, _, height, width = model_input.shape
+        self.fixed_batch = batch_dim if isinstance(batch_dim, int) else None
+        self.input_size = (
+            width if isinstance(width, int) else 128,
+            height if isinstance(height, int) else 256,
+        )
+        out_dim = self.session.get_outputs()[0].shape[-1]
+        self.dim = out_dim if isinstance(out_dim, int) else None
+
+    @METRICS.timed("reid_embed")
+    def embed(self, frame: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if len(boxes) == 0:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        stack = _crop_stack(frame, boxes, self.input_size)[..., ::-1].astype(np.float32)
+        blob = np.ascontiguousarray(((stack - self._MEAN) / self._STD).transpose(0, 3, 1, 2))
+        step = self.fixed_batch or len(blob)
+        outputs = []
+        for lo in range(0, len(blob), step):
+            chunk = blob[lo : lo + step]
+            pad = step - len(chunk)
+            if pad:
+                chunk = np.concatenate([chunk, np.zeros((pad, *chunk.shape[1:]), dtype=np.float32)])
+            outputs.append(self.session.run(None, {self.input_name: chunk})[0][: step - pad])
+        return _normalize(np.concatenate(outputs).reshape(len(boxes), -1).astype(np.float32))
+
+
+EMBEDDER_BACKENDS = {
+    "hist": HistogramEmbedder,
+    "onnx": OnnxEmbedder,
+}
+
+
+def make_embedder(config: ReIDConfig | None = None):
+    """Build the embedder named by ``config.embedder``."""
+    config = config or ReIDConfig()
+    try:
+        backend = EMBEDDER_BACKENDS[config.embedder]
+    except KeyError:
+        raise ValueError(
+            f"Unknown Re-ID embedder '{config.embedder}'; choose from {sorted(EMBEDDER_BACKENDS)}"
+        ) from None
+    return backend(config)
+
+
+class EmbeddingGallery:
+    """Bounded ring buffer of the most recent embeddings of each identity.
+
+    Identities own fixed blocks of ``size`` rows in one ``(blocks, size, dim)``
+    array, so a query against every stored embedding is one matrix product
+    followed by a max within each block. Blocks of evicted identities are
+    reused and the array doubles when full.
+    """
+
+    def __init__(self, dim: int, size: int = 16, capacity: int = 64):
+        self.dim = dim
+        self.size = size
+        self.bank = np.zeros((capacity, size, dim), dtype=np.float32)
+        self.filled = np.zeros((capacity, size), dtype=bool)
+        self.cursor = np.zeros(capacity, dtype=np.int64)
+        self.last_seen = np.zeros(capacity, dtype=np.int64)
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self._blocks: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __contains__(self, identity: int) -> bool:
+        return identity in self._blocks
+
+    def _block(self, identity: int) -> int:
+        block = self._blocks.get(identity)
+        if block is not None:
+            return block
+        free = np.flatnonzero(self.ids < 0)
+        if not len(free):
+            capacity = len(self.ids)
+            self.bank = np.concatenate([self.bank, np.zeros_like(self.bank)])
+            self.filled = np.concatenate([self.filled, np.zeros_like(self.filled)])
+            self.cursor = np.r_[self.cursor, np.zeros(capacity, dtype=np.int64)]
+            self.last_seen = np.r_[self.last_seen, np.zeros(capacity, dtype=np.int64)]
+            self.ids = np.r_[self.ids, np.full(capacity, -1, dtype=np.int64)]
+            free = np.array([capacity])
+        block = int(free[0])
+        self.ids[block] = identity
+        self.filled[block] = False
+        self.cursor[block] = 0
+        self._blocks[identity] = block
+        return block
+
+    def add(self, identity: int, embeddings: np.ndarray, frame_index: int) -> None:
+        """Store L2-normalised ``(K, dim)`` embeddings, overwriting the identity's oldest."""
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dim)[-self.size :]
+        block = self._block(identity)
+        slots = (self.cursor[block] + np.arange(len(embeddings))) % self.size
+        self.bank[block, slots] = embeddings
+        self.filled[block, slots] = True
+        self.cursor[block] += len(embeddings)
+        self.last_seen[block] = max(int(self.last_seen[block]), frame_index)
+
+    def similarities(
+        self, embeddings: np.ndarray, exclude: Iterable[int] = (), since: int | None = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """``(identities, (N, I) best cosine similarity)`` against identities seen since ``since``."""
+        mask = self.ids >= 0
+        if since is not None:
+            mask &= self.last_seen >= since
+        excluded = [self._blocks[i] for i in exclude if i in self._blocks]
+        mask[excluded] = False
+        blocks = np.flatnonzero(mask)
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dim)
+        if not len(blocks) or not len(embeddings):
+            return self.ids[blocks], np.empty((len(embeddings), len(blocks)), dtype=np.float32)
+        # One product over the contiguous bank is cheaper than gathering the live blocks first.
+        sims = (embeddings @ self.bank.reshape(-1, self.dim).T).reshape(len(embeddings), -1, self.size)
+        sims = np.where(self.filled[None], sims, -np.inf).max(axis=2)
+        return self.ids[blocks], sims[:, blocks]
+
+    def evict(self, before: int) -> None:
+        """Forget identities last seen before frame ``before``."""
+        stale = np.flatnonzero((self.ids >= 0) & (self.last_seen < before))
+        for block in stale.tolist():
+            del self._blocks[int(self.ids[block])]
+        self.ids[stale] = -1
+
+
+class ReIDLinker:
+    """Online mapping from tracker IDs to persistent identities.
+
+    A track keeps the identity it was given when it first appeared. New
+    tracks are matched (Hungarian, on cosine similarity) against identities
+    that are not visible in the current frame and were seen within
+    ``max_lost`` frames; unmatched tracks start an identity named after
+    their own track ID. If a re-linked identity later shows up twice in one
+    frame, the re-linked track is split off again.
+    """
+
+    def __init__(self, config: ReIDConfig | None = None):
+        self.config = config or ReIDConfig()
+        self.gallery: EmbeddingGallery | None = None
+        self.relinked = 0
+        self._identity: Dict[int, int] = {}
+        self._first: Dict[int, int] = {}
+        self._last: Dict[int, int] = {}
+        self._sum: Dict[int, np.ndarray] = {}
+        self._count: Dict[int, int] = {}
+
+    def needs_embedding(self, frame_index: int, track_ids: np.ndarray) -> np.ndarray:
+        """Which tracks of this frame to embed: new ones, and known ones every ``stride`` frames."""
+        stride = max(self.config.stride, 1)
+        first = self._first
+        ids = np.asarray(track_ids).tolist()
+        due = [tid not in first or (frame_index - first[tid]) % stride == 0 for tid in ids]
+        return np.array(due, dtype=bool)
+
+    @METRICS.timed("reid_link")
+    def update(self, frame_index: int, track_ids: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+        """Identities of ``track_ids``; ``embeddings`` rows are NaN for tracks not embedded this frame."""
+        cfg = self.config
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(track_ids), -1)
+        embedded = np.isfinite(embeddings).all(axis=1) & (embeddings.shape[1] > 0)
+        if self.gallery is None and embedded.any():
+            self.gallery = EmbeddingGallery(embeddings.shape[1], cfg.gallery_size)
+        ids = track_ids.tolist()
+        new = [i for i, tid in enumerate(ids) if tid not in self._identity]
+        visible = {self._identity[tid] for tid in ids if tid in self._identity}
+        for i in new:
+            self._identity[ids[i]] = ids[i]
+            self._first[ids[i]] = frame_index
+        queries = [i for i in new if embedded[i]]
+        if queries and self.gallery is not None and len(self.gallery):
+            since = frame_index - cfg.max_lost
+            candidates, sims = self.gallery.similarities(embeddings[queries], exclude=visible, since=since)
+            if len(candidates):
+                rows, cols = linear_sum_assignment(-np.maximum(sims, -1.0))
+                runner_up = _runner_up(sims, rows, cols)
+                for r, c in zip(rows.tolist(), cols.tolist()):
+                    if sims[r, c] >= cfg.similarity and sims[r, c] - runner_up[r] >= cfg.margin:
+                        self._identity[ids[queries[r]]] = int(candidates[c])
+                        self.relinked += 1
+
+        identities = np.array([self._identity[tid] for tid in ids], dtype=np.int64)
+        unique, counts = np.unique(identities, return_counts=True)
+        for identity in unique[counts > 1].tolist():
+            rows = np.flatnonzero(identities == identity).tolist()
+            keep = next((i for i in rows if ids[i] == identity), rows[0])
+            for i in rows:
+                if i != keep:
+                    self._identity[ids[i]] = ids[i]
+                    identities[i] = ids[i]
+
+        for i in np.flatnonzero(embedded).tolist():
+            tid, identity = ids[i], int(identities[i])
+            self.gallery.add(identity, embeddings[i], frame_index)
+            self._sum[tid] = self._sum.get(tid, 0.0) + embeddings[i]
+            self._count[tid] = self._count.get(tid, 0) + 1
+        for tid in ids:
+            self._last[tid] = frame_index
+        if self.gallery is not None:
+            self.gallery.evict(frame_index - cfg.max_lost)
+        return identities
+
+    def tracklets(self) -> Dict[str, np.ndarray]:
+        """Per-track summary: identity, first/last frame and mean embedding (zeros if never embedded)."""
+        track_ids = np.array(sorted(self._identity), dtype=np.int64)
+        dim = self.gallery.dim if self.gallery is not None else 0
+        embedding = np.zeros((len(track_ids), dim), dtype=np.float32)
+        count = np.zeros(len(track_ids), dtype=np.int64)
+        for row, tid in enumerate(track_ids.tolist()):
+            if tid in self._count:
+                embedding[row] = self._sum[tid] / self._count[tid]
+                count[row] = self._count[tid]
+        return {
+            "track_id": track_ids,
+            "identity": np.array([self._identity[t] for t in track_ids.tolist()], dtype=np.int64),
+            "first_frame": np.array([self._first[t] for t in track_ids.tolist()], dtype=np.int64),
+            "last_frame": np.array([self._last[t] for t in track_ids.tolist()], dtype=np.int64),
+            "embedding": _normalize(embedding) if dim else embedding,
+            "count": count,
+        }
+
+
+def _runner_up(sims: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Best similarity of each row excluding its assigned column (``-inf`` for unassigned rows)."""
+    out = np.full(len(sims), -np.inf)
+    if sims.shape[1] > 1:
+        others = sims[rows].copy()
+        others[np.arange(len(rows)), cols] = -np.inf
+        out[rows] = others.max(axis=1)
+    return out
+
+
+def save_tracklets(store_path: str | Path, tracklets: Dict[str, np.ndarray]) -> None:
+    """Write a tracklet summary next to a track store's columns."""
+    np.savez_compressed(Path(store_path) / TRACKLET_FILE, **tracklets)
+
+
+def load_tracklets(store_path: str | Path) -> Dict[str, np.ndarray]:
+    path = Path(store_path) / TRACKLET_FILE
+    if not path.is_file():
+        raise FileNotFoundError(f"{path} not found; run run_reid.py on the track store first")
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def _overlaps(a: np.ndarray, b: np.ndarray) -> bool:
+    """Whether any ``(first, last)`` interval of ``a`` intersects one of ``b``."""
+    spans = np.concatenate([a, b])
+    spans = spans[np.argsort(spans[:, 0], kind="stable")]
+    return bool((spans[1:, 0] <= np.maximum.accumulate(spans[:-1, 1])).any())
+
+
+@METRICS.timed("reid_merge")
+def merge_identities(tracklets: Dict[str, np.ndarray], config: ReIDConfig | None = None) -> Dict[int, int]:
+    """Offline merge of identities that never share a frame and look alike.
+
+    Candidate pairs come from one similarity matrix of identity mean
+    embeddings and are visited best first; each merge re-checks the merged
+    clusters' mean embeddings and time spans, so teammates in identical kits
+    (who share frames) stay apart. Returns ``identity -> merged
+    identity`` (the smallest identity of each cluster) for every identity.
+    """
+    cfg = config or ReIDConfig()
+    identity = np.asarray(tracklets["identity"], dtype=np.int64)
+    count = np.asarray(tracklets["count"], dtype=np.float64)
+    weighted = np.asarray(tracklets["embedding"], dtype=np.float64) * count[:, None]
+    spans_all = np.column_stack([tracklets["first_frame"], tracklets["last_frame"]]).astype(np.int64)
+    labels, inverse = np.unique(identity, return_inverse=True)
+    sums = np.zeros((len(labels), weighted.shape[1]))
+    np.add.at(sums, inverse, weighted)
+    spans = [spans_all[inverse == k] for k in range(len(labels))]
+    embedded = np.flatnonzero(np.linalg.norm(sums, axis=1) > 0)
+    means = _normalize(sums[embedded])
+    sims = means @ means.T
+    a, b = np.triu_indices(len(embedded), k=1)
+    keep = sims[a, b] >= cfg.merge_similarity
+    a, b, score = embedded[a[keep]], embedded[b[keep]], sims[a[keep], b[keep]]
+    parent = np.arange(len(labels))
+
+    def find(k: int) -> int:
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    for k in np.argsort(-score, kind="stable").tolist():
+        ra, rb = find(int(a[k])), find(int(b[k]))
+        if ra == rb or _overlaps(spans[ra], spans[rb]):
+            continue
+        ma, mb = sums[ra], sums[rb]
+        if ma @ mb / (np.linalg.norm(ma) * np.linalg.norm(mb)) < cfg.merge_similarity:
+            continue
+        root, child = min(ra, rb), max(ra, rb)
+        parent[child] = root
+        sums[root] = ma + mb
+        spans[root] = np.concatenate([spans[ra], spans[rb]])
+    return {int(labels[k]): int(labels[find(k)]) for k in range(len(labels))}
+
+
+def remap_ids(ids: np.ndarray, mapping: Dict[int, int]) -> np.ndarray:
+    """Apply an id mapping to an array; ids missing from ``mapping`` are kept."""
+    ids = np.asarray(ids)
+    if not mapping:
+        return ids.copy()
+    keys = np.array(sorted(mapping), dtype=np.int64)
+    values = np.array([mapping[k] for k in keys.tolist()], dtype=np.int64)
+    pos = np.clip(np.searchsorted(keys, ids), 0, len(keys) - 1)
+    return np.where(keys[pos] == ids, values[pos], ids).astype(ids.dtype)
+
+
+def write_identity_store(
+    source: TrackStoreReader,
+    path: str | Path,
+    identities: np.ndarray,
+    metadata: dict | None = None,
+    chunk_size: int = 1 << 20,
+) -> None:
+    """Copy ``source`` with ``track_id`` replaced by per-row ``identities``.
+
+    The tracker's own IDs are kept in a ``raw_track_id`` column (carried over
+    unchanged when ``source`` already has one).
+    """
+    columns = dict(source.columns)
+    columns.setdefault("raw_track_id", ("<i4", ()))
+    with TrackStoreWriter(path, columns=columns, metadata=metadata, chunk_size=chunk_size) as writer:
+        for lo, chunk in zip(range(0, len(source), chunk_size), source.iter_chunks(chunk_size)):
+            chunk.setdefault("raw_track_id", chunk["track_id"])
+            chunk["track_id"] = identities[lo : lo + len(chunk["track_id"])]
+            writer.write_columns(**chunk)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .detection import DetectorConfig, make_detector
+from .orchestrator import ResourceLimits, _init_worker, partition_cpus
+from .tracking import TrackerConfig, bbox_iou_matrix, make_tracker
+from .types import Detection
+from .video_io import IngestConfig, iter_batches, iter_frames, make_ingest, open_video
+
+TrackColumns = Dict[str, np.ndarray]
+
+
+@dataclass
+class Segment:
+    warm_start: int  # first decoded frame; [warm_start, start) overlaps the previous segment
+    start: int  # first frame whose records this segment owns
+    stop: int | None  # None reads to the end of the video
+
+
+@dataclass
+class SegmentResult:
+    segment: Segment
+    columns: TrackColumns
+    frames: int
+    elapsed: float
+
+
+def plan_segments(frame_count: int, workers: int, overlap: int) -> List[Segment]:
+    """Split ``[0, frame_count)`` into ``workers`` ranges, each warmed up on ``overlap`` frames.
+
+    The last segment reads to the end of the stream because container frame
+    counts are only estimates.
+    """
+    workers = max(1, min(workers, frame_count))
+    bounds = np.linspace(0, frame_count, workers + 1).round().astype(int)
+    segments = [
+        Segment(warm_start=max(0, int(lo) - overlap), start=int(lo), stop=int(hi))
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    ]
+    segments[-1].stop = None
+    return segments
+
+
+def track_frames(frames: Iterable[Tuple[int, Sequence[Detection]]], tracker) -> TrackColumns:
+    """Run ``tracker`` over ``(frame_index, detections)`` pairs and collect its records as columns."""
+    track_ids: List[int] = []
+    frame_indices: List[int] = []
+    boxes: List[Tuple[float, float, float, float]] = []
+    scores: List[float] = []
+    for frame_idx, detections in frames:
+        for record in tracker.update(detections, frame_idx):
+            track_ids.append(record.track_id)
+            frame_indices.append(record.frame_index)
+            boxes.append(record.bbox)
+            scores.append(record.score)
+    return {
+        "track_id": np.asarray(track_ids, dtype=np.int32),
+        "frame_index": np.asarray(frame_indices, dtype=np.int32),
+        "bbox": np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+        "score": np.asarray(scores, dtype=np.float32),
+    }
+
+
+def track_segment(
+    video_path: str,
+    segment: Segment,
+    detector_config: DetectorConfig,
+    tracker_config: TrackerConfig,
+    batch_size: int = 1,
+    ingest_config: IngestConfig | None = None,
+) -> SegmentResult:
+    """Detect and track one frame range with a fresh detector and tracker."""
+    begin = time.perf_counter()
+    if detector_config.threads:
+        cv2.setNumThreads(detector_config.threads)
+    detector = make_detector(detector_config)
+    processed = 0
+    hw_accel = ingest_config is not None and ingest_config.hw_accel
+
+    def detect(cap):
+        nonlocal processed
+        ingest = make_ingest(cap, ingest_config, pool_size=max(batch_size, 1) + 1)
+        frames = iter_frames(cap, segment.warm_start, segment.stop, ingest)
+        for batch in iter_batches(frames, max(batch_size, 1)):
+            batch_detections = detector.detect_batch([frame for _, frame in batch])
+            processed += len(batch)
+            for (frame_idx, _), detections in zip(batch, batch_detections):
+                detections = ingest.map_detections(detections)
+                yield frame_idx, detections
+
+    with open_video(video_path, hw_accel=hw_accel) as cap:
+        columns = track_frames(detect(cap), make_tracker(tracker_config))
+    return SegmentResult(
+        segment=segment, columns=columns, frames=processed, elapsed=time.perf_counter() - begin
+    )
+
+
+def _select(columns: TrackColumns, mask: np.ndarray) -> TrackColumns:
+    return {name: arr[mask] for name, arr in columns.items()}
+
+
+def _link_overlap(
+    previous: TrackColumns, current: TrackColumns, lo: int, hi: int, iou_threshold: float
+) -> Dict[int, int]:
+    """Map local track ids of ``current`` to ids of ``previous`` using frames ``[lo, hi)``."""
+    prev = _select(previous, (previous["frame_index"] >= lo) & (previous["frame_index"] < hi))
+    cur = _select(current, (current["frame_index"] >= lo) & (current["frame_index"] < hi))
+    if len(prev["track_id"]) == 0 or len(cur["track_id"]) == 0:
+        return {}
+    prev_ids, prev_inv = np.unique(prev["track_id"], return_inverse=True)
+    cur_ids, cur_inv = np.unique(cur["track_id"], return_inverse=True)
+    votes = np.zeros((len(prev_ids), len(cur_ids)), dtype=np.int64)
+    for frame in np.intersect1d(prev["frame_index"], cur["frame_index"]):
+        p_rows = np.flatnonzero(prev["frame_index"] == frame)
+        c_rows = np.flatnonzero(cur["frame_index"] == frame)
+        iou = bbox_iou_matrix(
+            prev["bbox"][p_rows].astype(np.float64), cur["bbox"][c_rows].astype(np.float64)
+        )
+        rows, cols = linear_sum_assignment(-iou)
+        keep = iou[rows, cols] >= iou_threshold
+        np.add.at(votes, (prev_inv[p_rows[rows[keep]]], cur_inv[c_rows[cols[keep]]]), 1)
+    rows, cols = linear_sum_assignment(-votes)
+    keep = votes[rows, cols] > 0
+    return {int(cur_ids[c]): int(prev_ids[r]) for r, c in zip(rows[keep], cols[keep])}
+
+
+def stitch_segments(results: List[SegmentResult], iou_threshold: float = 0.5) -> TrackColumns:
+    """Merge per-segment tracks into one table with globally consistent ids.
+
+    Tracks are linked across a boundary by voting on matching boxes in the
+    overlap window, where both neighbouring segments saw the same frames.
+    Ids are then numbered 1, 2, ... in order of first appearance and rows
+    ordered by frame and id, as a serial tracker emits them. Once a segment's
+    tracker has picked up every track alive at its boundary within the
+    overlap, the result equals a serial run with ``min_hits=1`` row for row;
+    a track whose boundary link fails keeps its rows but continues under a
+    new id. With ``min_hits > 1`` a serial run
+    also spends ids on tracks never confirmed, so only the grouping of rows
+    into tracks is the same.
+    """
+    results = sorted(results, key=lambda r: r.segment.start)
+    next_id = 1
+    previous: TrackColumns | None = None
+    stitched: List[TrackColumns] = []
+    for result in results:
+        seg = result.segment
+        columns = result.columns
+        link: Dict[int, int] = {}
+        if previous is not None and seg.warm_start < seg.start:
+            link = _link_overlap(previous, columns, seg.warm_start, seg.start, iou_threshold)
+        local_ids = np.unique(columns["track_id"])
+        mapping = np.zeros(int(local_ids.max()) + 1 if len(local_ids) else 1, dtype=np.int64)
+        for local in local_ids.tolist():
+            if local in link:
+                mapping[local] = link[local]
+            else:
+                mapping[local] = next_id
+                next_id += 1
+        remapped = dict(columns)
+        remapped["track_id"] = mapping[columns["track_id"]].astype(np.int32)
+        previous = remapped
+        stitched.append(_select(remapped, remapped["frame_index"] >= seg.start))
+    if not stitched:
+        return {
+            "track_id": np.empty(0, dtype=np.int32),
+            "frame_index": np.empty(0, dtype=np.int32),
+            "bbox": np.empty((0, 4), dtype=np.float32),
+            "score": np.empty(0, dtype=np.float32),
+        }
+    merged = {name: np.concatenate([part[name] for part in stitched]) for name in stitched[0]}
+    # Rows are in frame order, so first occurrences give the serial creation order.
+    _, first, inverse = np.unique(merged["track_id"], return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(1, len(first) + 1)
+    merged["track_id"] = rank[inverse].astype(np.int32)
+    # A serial tracker emits each frame's tracks in creation (= id) order.
+    return _select(merged, np.lexsort((merged["track_id"], merged["frame_index"])))
+
+
+def track_video_sharded(
+    video_path: str,
+    frame_count: int,
+    detector_config: DetectorConfig,
+    tracker_config: TrackerConfig,
+    workers: int,
+    overlap: int,
+    batch_size: int = 1,
+    ingest_config: IngestConfig | None = None,
+) -> Tuple[TrackColumns, List[SegmentResult]]:
+    """Track a video in parallel time segments and stitch the ids back together.
+
+    Each worker is pinned to its own share of the CPUs and its OpenMP/BLAS
+    (and so torch) and ONNX Runtime thread pools are sized to it, so N
+    workers do not each start a pool as wide as the machine.
+    """
+    segments = plan_segments(frame_count, workers, overlap)
+    context = multiprocessing.get_context("spawn")
+    cpu_sets = partition_cpus(len(segments))
+    if detector_config.threads is None:
+        detector_config = replace(detector_config, threads=len(cpu_sets[0]))
+    queue = context.Queue()
+    for cpus in cpu_sets:
+        queue.put(cpus)
+    with ProcessPoolExecutor(
+        max_workers=len(segments),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(queue, ResourceLimits()),
+    ) as pool:
+        futures = [
+            pool.submit(
+                track_segment, video_path, seg, detector_config, tracker_config, batch_size, ingest_config
+            )
+            for seg in segments
+        ]
+        results = [future.result() for future in futures]
+    return stitch_segments(results), results
@@ -0,0 +1,165 @@
+"""Savitzky-Golay smoothing and kinematics for projected tracks.
+
+Raw pitch positions jitter with the bounding boxes and the homography, and
+finite differences turn that jitter into absurd speeds. Here each track is
+first densified (gaps of up to ``max_gap`` frames are filled linearly;
+longer gaps split the track into segments), then positions, velocities and
+accelerations are the value and first/second derivative of a local
+polynomial fit (Savitzky-Golay).
+
+Everything runs on the whole table at once. Segment interiors are one
+weighted sum of shifted views of the concatenated columns. The first and last
+``window // 2`` samples of each segment use the off-centre fits of their
+segment's first or last window, gathered as ``(segments, window)`` blocks.
+Segments shorter than the window are fitted whole, grouped by length.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .instrumentation import METRICS
+
+KINEMATIC_FIELDS = ("velocity_x", "velocity_y", "acceleration_x", "acceleration_y")
+
+
+@dataclass
+class SmoothingConfig:
+    fps: float = 25.0
+    window: int = 15  # frames in each local fit (odd); 0.6 s at 25 fps
+    order: int = 2  # polynomial order; 2 keeps accelerations meaningful
+    max_gap: int = 12  # missing frames filled by interpolation; longer gaps split a track
+
+
+def fill_gaps(
+    track_id: np.ndarray, frame_index: np.ndarray, columns: Dict[str, np.ndarray], max_gap: int
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    """Sort rows by track and frame and insert the frames missing from short gaps.
+
+    Float columns are interpolated linearly into inserted rows; other
+    columns repeat the row before the gap. Duplicate ``(track, frame)`` rows
+    keep the first. Returns ``(track_id, frame_index, columns, interpolated)``.
+    """
+    track_id = np.asarray(track_id, dtype=np.int64)
+    frame_index = np.asarray(frame_index, dtype=np.int64)
+    order = np.lexsort((frame_index, track_id))
+    tid, frames = track_id[order], frame_index[order]
+    unique = np.r_[True, (tid[1:] != tid[:-1]) | (frames[1:] != frames[:-1])][: len(tid)]
+    order, tid, frames = order[unique], tid[unique], frames[unique]
+    gap = np.r_[np.diff(frames), 1]
+    same_track = np.r_[tid[1:] == tid[:-1], False]
+    inserted = np.where(same_track & (gap > 1) & (gap <= max_gap + 1), gap - 1, 0)
+    source = np.repeat(np.arange(len(order)), inserted + 1)
+    step = np.arange(len(source)) - np.repeat(np.cumsum(inserted + 1) - (inserted + 1), inserted + 1)
+    nxt = np.minimum(source + 1, max(len(order) - 1, 0))
+    weight = step / np.where(step > 0, gap[source], 1)
+    filled = {}
+    for name, values in columns.items():
+        values = np.asarray(values)[order]
+        if np.issubdtype(values.dtype, np.floating):
+            w = weight.reshape(-1, *([1] * (values.ndim - 1)))
+            filled[name] = values[source] * (1.0 - w) + values[nxt] * w
+        else:
+            filled[name] = values[source]
+    return tid[source], frames[source] + step, filled, step > 0
+
+
+def savgol_coeffs(window: int, order: int, deriv: int, delta: float) -> np.ndarray:
+    """``(window, window)`` Savitzky-Golay weights; row ``p`` evaluates the fit at position ``p``.
+
+    Row ``p`` dotted with a window of samples gives the ``deriv``-th
+    derivative (per unit of ``delta``) of the least-squares polynomial of
+    ``order`` through them, evaluated at sample ``p``.
+    """
+    t = np.arange(window, dtype=np.float64)
+    out = np.zeros((window, window))
+    if deriv > order:
+        return out
+    for pos in range(window):
+        basis = np.vander(t - pos, order + 1, increasing=True)
+        out[pos] = np.linalg.pinv(basis)[deriv] * math.factorial(deriv) / delta**deriv
+    return out
+
+
+def savgol_segments(
+    values: np.ndarray, starts: np.ndarray, config: SmoothingConfig, derivs: Sequence[int] = (0, 1, 2)
+) -> List[np.ndarray]:
+    """Savitzky-Golay value / derivatives (per second) of each segment, one array per ``derivs`` entry.
+
+    ``values`` is ``(N,)`` or ``(N, D)``; segments are the contiguous runs
+    beginning at ``starts``, each sampled once per frame.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    delta = 1.0 / config.fps
+    window = config.window | 1
+    half = window // 2
+    order = min(config.order, window - 1)
+    starts = np.asarray(starts, dtype=np.intp)
+    lengths = np.diff(np.r_[starts, n])
+    coeffs = [savgol_coeffs(window, order, d, delta) for d in derivs]
+
+    # Interior: every derivative accumulates from the same shifted views.
+    edge = half if n else 0
+    head, tail = np.repeat(values[:1], edge, axis=0), np.repeat(values[-1:], edge, axis=0)
+    padded = np.concatenate([head, values, tail])
+    outs = [np.zeros_like(values) for _ in derivs]
+    for k in range(window):
+        shifted = padded[k : k + n]
+        for out, c in zip(outs, coeffs):
+            if c[half, k]:
+                out += c[half, k] * shifted
+
+    full = lengths >= window
+    offsets = np.arange(window)
+    if full.any():
+        head_rows = starts[full][:, None] + offsets
+        tail_rows = (starts[full] + lengths[full] - window)[:, None] + offsets
+        first, last = values[head_rows], values[tail_rows]
+        for out, c in zip(outs, coeffs):
+            out[head_rows[:, :half]] = np.einsum("pw,sw...->sp...", c[:half], first)
+            out[tail_rows[:, half + 1 :]] = np.einsum("pw,sw...->sp...", c[half + 1 :], last)
+    for length in np.unique(lengths[~full]).tolist():
+        rows = starts[lengths == length][:, None] + np.arange(length)
+        for out, d in zip(outs, derivs):
+            fit = savgol_coeffs(length, min(order, length - 1), d, delta)
+            out[rows] = np.einsum("pw,sw...->sp...", fit, values[rows])
+    return outs
+
+
+@METRICS.timed("smoothing")
+def smooth_tracks(
+    track_id: np.ndarray,
+    frame_index: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    config: SmoothingConfig | None = None,
+) -> Dict[str, np.ndarray]:
+    """Gap-filled, smoothed columns with :data:`KINEMATIC_FIELDS` (m/s, m/s^2) added.
+
+    ``columns`` must contain ``pitch_x`` and ``pitch_y``; other columns are
+    carried through (interpolated into filled rows). Rows come back sorted
+    by track and frame, with an ``interpolated`` flag on inserted ones.
+    """
+    cfg = config or SmoothingConfig()
+    tid, frames, filled, interpolated = fill_gaps(track_id, frame_index, columns, cfg.max_gap)
+    xy = np.column_stack([filled["pitch_x"], filled["pitch_y"]])
+    starts = track_segments(tid, frames)
+    position, velocity, acceleration = savgol_segments(xy, starts, cfg)
+    out = {"track_id": tid, "frame_index": frames, **filled}
+    out["pitch_x"], out["pitch_y"] = position[:, 0], position[:, 1]
+    out["velocity_x"], out["velocity_y"] = velocity[:, 0], velocity[:, 1]
+    out["acceleration_x"], out["acceleration_y"] = acceleration[:, 0], acceleration[:, 1]
+    out["interpolated"] = interpolated.astype(np.uint8)
+    return out
+
+
+def track_segments(track_id: np.ndarray, frame_index: np.ndarray) -> np.ndarray:
+    """Starts of runs of consecutive frames of one track in rows sorted by track and frame."""
+    tid = np.asarray(track_id)
+    frames = np.asarray(frame_index)
+    if not len(tid):
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, (tid[1:] != tid[:-1]) | (np.diff(frames) != 1)])
@@ -0,0 +1,256 @@
+"""Persistent "who was where, when" index over projected tracks.
+
+The index is a track store holding the valid projected rows sorted by frame
+(with ``row``, the row in the source), plus three memory-mapped offset
+tables next to it:
+
+* frames: the row range of every frame, so a frame window is one slice;
+* tracks: a track-major permutation with the row range of every track;
+* cells: a permutation sorted by ``cell_size`` grid cell over the pitch, so
+  an area query over the whole match only touches the cells it overlaps.
+
+A frame holds a couple of dozen rows, so queries filter the gathered rows
+exactly with vectorized arithmetic instead of descending a tree. Opening an
+index maps its files and reads nothing else.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import METRICS
+from .track_store import BBOX_FIELDS, ColumnSpec, TrackStoreReader, TrackStoreWriter
+
+INDEX_FILES = ("frame_offsets", "track_ids", "track_offsets", "track_rows", "cell_offsets", "cell_rows")
+
+
+@dataclass
+class IndexConfig:
+    cell_size: float = 5.0  # metres per side of a grid cell
+    pitch_length: float = 105.0
+    pitch_width: float = 68.0
+    margin: float = 5.0  # the grid extends this far past the lines; outer cells also hold anything beyond
+
+
+def _grid_shape(cfg: IndexConfig) -> Tuple[int, int]:
+    nx = int(np.ceil((cfg.pitch_length + 2 * cfg.margin) / cfg.cell_size))
+    ny = int(np.ceil((cfg.pitch_width + 2 * cfg.margin) / cfg.cell_size))
+    return nx, ny
+
+
+def _cell_xy(x: np.ndarray, y: np.ndarray, cfg: IndexConfig) -> Tuple[np.ndarray, np.ndarray]:
+    nx, ny = _grid_shape(cfg)
+    cx = np.clip(np.floor((np.asarray(x) + cfg.margin) / cfg.cell_size), 0, nx - 1).astype(np.int64)
+    cy = np.clip(np.floor((np.asarray(y) + cfg.margin) / cfg.cell_size), 0, ny - 1).astype(np.int64)
+    return cx, cy
+
+
+def _offsets(keys: np.ndarray, size: int) -> np.ndarray:
+    """``(size + 1,)`` start offsets of every key in ``0..size-1`` within sorted ``keys``."""
+    return np.r_[0, np.cumsum(np.bincount(keys, minlength=size))].astype(np.int64)
+
+
+def _gather(starts: np.ndarray, stops: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenated ``arange(start, stop)`` of every range, and the range each index came from."""
+    lengths = np.maximum(np.asarray(stops) - np.asarray(starts), 0)
+    first = np.cumsum(lengths) - lengths
+    index = np.arange(lengths.sum()) + np.repeat(np.asarray(starts) - first, lengths)
+    return index, np.repeat(np.arange(len(lengths)), lengths)
+
+
+@METRICS.timed("spatial_index")
+def build_spatial_index(
+    columns: Mapping[str, np.ndarray],
+    path: str | Path,
+    layout: Dict[str, ColumnSpec],
+    config: IndexConfig | None = None,
+    metadata: dict | None = None,
+) -> None:
+    """Write an index of projected track ``columns`` (``layout`` gives their store specs).
+
+    Rows with ``valid == 0`` are left out; ``valid`` itself is not stored.
+    """
+    cfg = config or IndexConfig()
+    rows = np.arange(len(columns["track_id"]))
+    if "valid" in columns:
+        rows = rows[np.asarray(columns["valid"]) != 0]
+    frame_index = np.asarray(columns["frame_index"], dtype=np.int64)[rows]
+    track_id = np.asarray(columns["track_id"], dtype=np.int64)[rows]
+    order = np.lexsort((track_id, frame_index))
+    rows, frame_index, track_id = rows[order], frame_index[order], track_id[order]
+
+    first_frame = int(frame_index[0]) if len(rows) else 0
+    last_frame = int(frame_index[-1]) if len(rows) else -1
+    frame_offsets = _offsets(frame_index - first_frame, last_frame - first_frame + 1)
+    track_ids, track_key = np.unique(track_id, return_inverse=True)
+    track_rows = np.argsort(track_key, kind="stable")
+    cx, cy = _cell_xy(np.asarray(columns["pitch_x"])[rows], np.asarray(columns["pitch_y"])[rows], cfg)
+    nx, ny = _grid_shape(cfg)
+    cell = cx * ny + cy
+    cell_rows = np.argsort(cell, kind="stable")
+
+    layout = {name: spec for name, spec in layout.items() if name != "valid"}
+    metadata = {
+        **(metadata or {}),
+        "spatial_index": {
+            "cell_size": cfg.cell_size,
+            "pitch_length": cfg.pitch_length,
+            "pitch_width": cfg.pitch_width,
+            "margin": cfg.margin,
+            "first_frame": first_frame,
+        },
+    }
+    path = Path(path)
+    with TrackStoreWriter(path, columns={**layout, "row": ("<i8", ())}, metadata=metadata) as writer:
+        writer.write_columns(**{name: np.asarray(columns[name])[rows] for name in layout}, row=rows)
+    arrays = {
+        "frame_offsets": frame_offsets,
+        "track_ids": track_ids,
+        "track_offsets": _offsets(track_key, len(track_ids)),
+        "track_rows": track_rows,
+        "cell_offsets": _offsets(cell, nx * ny),
+        "cell_rows": cell_rows,
+    }
+    for name in INDEX_FILES:
+        np.save(path / f"{name}.npy", arrays[name])
+
+
+class SpatialIndex:
+    """Range, radius and k-nearest queries over an index from :func:`build_spatial_index`.
+
+    Every query returns a DataFrame of the matching rows (``bbox`` split into
+    ``bbox_x1`` .. ``bbox_y2``), ordered by frame; ``row`` is the row in the
+    projected store the index was built from.
+    """
+
+    def __init__(self, path: str | Path):
+        self.store = TrackStoreReader(path)
+        meta = self.store.metadata.get("spatial_index")
+        if meta is None:
+            raise ValueError(f"{path} is a track store but not a spatial index")
+        self.config = IndexConfig(
+            cell_size=meta["cell_size"],
+            pitch_length=meta["pitch_length"],
+            pitch_width=meta["pitch_width"],
+            margin=meta["margin"],
+        )
+        self.first_frame = int(meta["first_frame"])
+        for name in INDEX_FILES:
+            setattr(self, name, np.load(Path(path) / f"{name}.npy", mmap_mode="r"))
+        self.pitch_x = self.store.column("pitch_x")
+        self.pitch_y = self.store.column("pitch_y")
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _frame_ranges(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        slot = np.asarray(frames, dtype=np.int64) - self.first_frame
+        inside = (slot >= 0) & (slot < len(self.frame_offsets) - 1)
+        slot = np.where(inside, slot, 0)
+        starts = np.where(inside, self.frame_offsets[slot], 0)
+        return starts, np.where(inside, self.frame_offsets[slot + 1], 0)
+
+    def _window(self, start: int | None, stop: int | None) -> Tuple[int, int]:
+        """Row range of frames ``[start, stop)``; ``None`` leaves that side open."""
+        last = len(self.frame_offsets) - 1
+        lo = 0 if start is None else int(self.frame_offsets[np.clip(start - self.first_frame, 0, last)])
+        hi = len(self) if stop is None else int(self.frame_offsets[np.clip(stop - self.first_frame, 0, last)])
+        return lo, max(lo, hi)
+
+    def _result(self, rows: np.ndarray, **extra: np.ndarray) -> pd.DataFrame:
+        rows = np.asarray(rows, dtype=np.int64)
+        data = {}
+        for name in self.store.columns:
+            values = self.store.column(name)[rows]
+            if name == "bbox":
+                data.update({field: values[:, i] for i, field in enumerate(BBOX_FIELDS)})
+            else:
+                data[name] = values
+        return pd.DataFrame({**data, **extra})
+
+    def frames(self, start: int, stop: int) -> pd.DataFrame:
+        """Every row in frames ``[start, stop)``."""
+        lo, hi = self._window(start, stop)
+        return self._result(np.arange(lo, hi))
+
+    def track(self, track_id: int, start: int | None = None, stop: int | None = None) -> pd.DataFrame:
+        """Rows of one track, optionally limited to frames ``[start, stop)``."""
+        return self._result(self._track_rows(track_id, start, stop))
+
+    def _track_rows(self, track_id: int, start: int | None, stop: int | None) -> np.ndarray:
+        k = int(np.searchsorted(self.track_ids, track_id))
+        if k == len(self.track_ids) or self.track_ids[k] != track_id:
+            return np.empty(0, dtype=np.int64)
+        rows = np.asarray(self.track_rows[self.track_offsets[k] : self.track_offsets[k + 1]])
+        lo, hi = self._window(start, stop)
+        # Rows of a track are in frame order.
+        return rows[np.searchsorted(rows, lo) : np.searchsorted(rows, hi)]
+
+    def within_box(
+        self,
+        x_min: float,
+        x_max: float,
+        y_min: float,
+        y_max: float,
+        start: int | None = None,
+        stop: int | None = None,
+        track_id: int | None = None,
+    ) -> pd.DataFrame:
+        """Rows inside the rectangle, optionally limited to frames ``[start, stop)`` and one track.
+
+        The candidates come from whichever is smallest: the track's rows, the
+        frame window, or the grid cells overlapping the rectangle.
+        """
+        lo, hi = self._window(start, stop)
+        if track_id is not None:
+            rows = self._track_rows(track_id, start, stop)
+        else:
+            cx0, cy0 = _cell_xy(x_min, y_min, self.config)
+            cx1, cy1 = _cell_xy(x_max, y_max, self.config)
+            _, ny = _grid_shape(self.config)
+            columns = np.arange(int(cx0), int(cx1) + 1)
+            starts = self.cell_offsets[columns * ny + int(cy0)]
+            stops = self.cell_offsets[columns * ny + int(cy1) + 1]
+            if (stops - starts).sum() < hi - lo:
+                index, _ = _gather(starts, stops)
+                rows = np.sort(np.asarray(self.cell_rows)[index])
+                rows = rows[(rows >= lo) & (rows < hi)]
+            else:
+                rows = np.arange(lo, hi)
+        x, y = self.pitch_x[rows], self.pitch_y[rows]
+        return self._result(rows[(x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)])
+
+    def _candidates(self, frames, x, y) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Rows of every query frame, the query each belongs to, and its distance to the query point."""
+        frames = np.atleast_1d(np.asarray(frames, dtype=np.int64))
+        x = np.broadcast_to(np.asarray(x, dtype=np.float64), frames.shape)
+        y = np.broadcast_to(np.asarray(y, dtype=np.float64), frames.shape)
+        rows, query = _gather(*self._frame_ranges(frames))
+        distance = np.hypot(self.pitch_x[rows] - x[query], self.pitch_y[rows] - y[query])
+        return rows, query, distance
+
+    def within_radius(self, frames, x, y, radius: float) -> pd.DataFrame:
+        """Rows within ``radius`` metres of ``(x, y)`` in each of ``frames``.
+
+        ``x`` and ``y`` are scalars or one point per frame (e.g. the ball).
+        Adds ``query`` (index into ``frames``) and ``distance`` columns.
+        """
+        rows, query, distance = self._candidates(frames, x, y)
+        hit = distance <= radius
+        return self._result(rows[hit], query=query[hit], distance=distance[hit])
+
+    def nearest(self, frames, x, y, k: int = 1) -> pd.DataFrame:
+        """The ``k`` rows closest to ``(x, y)`` in each of ``frames``, nearest first.
+
+        Arguments and added columns are as for :meth:`within_radius`.
+        """
+        rows, query, distance = self._candidates(frames, x, y)
+        order = np.lexsort((distance, query))
+        rows, query, distance = rows[order], query[order], distance[order]
+        first = np.searchsorted(query, query, side="left")
+        keep = np.arange(len(query)) - first < k
+        return self._result(rows[keep], query=query[keep], distance=distance[keep])
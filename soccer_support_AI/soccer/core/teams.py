@@ -0,0 +1,234 @@
+"""Team and role labels from kit colours.
+
+Each track is looked at only a few times: :func:`sample_rows` picks up to
+``samples_per_track`` rows spread over its lifetime, so only the frames
+holding a sample need decoding. :func:`kit_features` turns all crops of a
+frame into mean Lab colours of the shirt and shorts in one batch. After the
+pass, :func:`classify_teams` clusters every sample of the match with k-means
+once and gives each track the majority vote of its samples.
+
+The two largest clusters (by tracks) are the two teams. Tracks in the other
+clusters are goalkeepers when they stay near a goal line (the goalkeeper
+belongs to the team whose players are on average closer to that goal),
+otherwise referees; without pitch coordinates their role is unknown.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping, Tuple
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from .events import NO_TEAM
+from .instrumentation import METRICS
+from .reid import _crop_stack
+from .track_store import TrackStoreReader, TrackStoreWriter
+
+ROLES = ("unknown", "player", "goalkeeper", "referee")
+TEAMS_FILE = "teams.csv"
+FEATURE_DIM = 6
+
+
+@dataclass
+class TeamConfig:
+    crop_size: Tuple[int, int] = (16, 32)  # (width, height) every crop is resized to
+    samples_per_track: int = 5  # crops looked at per track, spread over its lifetime
+    clusters: int = 5  # two outfield kits, two goalkeeper kits and the referees
+    attempts: int = 3  # k-means restarts
+    goal_distance: float = 20.0  # metres: non-team tracks this close to a goal line are goalkeepers
+    pitch_length: float = 105.0
+    seed: int = 0
+
+
+@dataclass
+class TeamLabels:
+    """Per-track labels, sorted by ``track_id``; ``role`` indexes :data:`ROLES`."""
+
+    track_id: np.ndarray
+    team: np.ndarray
+    role: np.ndarray
+
+    def lookup(self, track_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(team, role)`` of every row of ``track_ids``; unlabelled tracks get ``NO_TEAM`` / unknown."""
+        ids = np.asarray(track_ids, dtype=np.int64)
+        if not len(self.track_id):
+            return np.full(len(ids), NO_TEAM, dtype=np.int64), np.zeros(len(ids), dtype=np.uint8)
+        pos = np.minimum(np.searchsorted(self.track_id, ids), len(self.track_id) - 1)
+        known = self.track_id[pos] == ids
+        return np.where(known, self.team[pos], NO_TEAM), np.where(known, self.role[pos], 0).astype(np.uint8)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "track_id": self.track_id,
+                "team": self.team,
+                "role": np.asarray(ROLES, dtype=object)[self.role],
+            }
+        )
+
+
+def sample_rows(track_id: np.ndarray, frame_index: np.ndarray, samples: int) -> np.ndarray:
+    """Indices of up to ``samples`` rows per track, evenly spaced over its frames."""
+    track_id = np.asarray(track_id)
+    order = np.lexsort((np.asarray(frame_index), track_id))
+    starts = np.flatnonzero(np.r_[True, track_id[order][1:] != track_id[order][:-1]]) if len(order) else order
+    lengths = np.diff(np.r_[starts, len(order)])
+    k = np.minimum(lengths, samples)
+    j = np.arange(k.sum()) - np.repeat(np.cumsum(k) - k, k)
+    return order[np.repeat(starts, k) + j * np.repeat(lengths, k) // np.repeat(k, k)]
+
+
+@METRICS.timed("team_features")
+def kit_features(frame: np.ndarray, boxes: np.ndarray, config: TeamConfig | None = None) -> np.ndarray:
+    """``(N, 6)`` mean Lab colour of the shirt and shorts bands of each crop.
+
+    Green pitch and dark pixels are left out; a band with nothing left falls
+    back to all of its pixels.
+    """
+    cfg = config or TeamConfig()
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    n = len(boxes)
+    if n == 0:
+        return np.empty((0, FEATURE_DIM), dtype=np.float32)
+    stack = _crop_stack(frame, boxes, cfg.crop_size)
+    _, h, w, _ = stack.shape
+    flat = stack.reshape(n * h, w, 3)
+    hsv = cv2.cvtColor(flat, cv2.COLOR_BGR2HSV).reshape(n, h, w, 3)
+    lab = cv2.cvtColor(flat, cv2.COLOR_BGR2LAB).reshape(n, h, w, 3).astype(np.float32)
+    hue, sat, val = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    rows = np.arange(h) / h
+    # Band 0 is the shirt, band 1 the shorts; head and legs are skipped.
+    band = np.select([(rows >= 0.15) & (rows < 0.5), (rows >= 0.5) & (rows < 0.8)], [0, 1], -1)
+    in_band = np.broadcast_to((band >= 0)[None, :, None], (n, h, w))
+    kit = in_band & ~((hue >= 35) & (hue <= 85) & (sat >= 60)) & (val >= 30)
+    index = np.broadcast_to((np.arange(n)[:, None, None] * 2 + band[None, :, None]).clip(min=0), (n, h, w))
+
+    def band_means(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        cells = index[mask]
+        count = np.bincount(cells, minlength=2 * n)
+        sums = np.stack([np.bincount(cells, weights=lab[..., c][mask], minlength=2 * n) for c in range(3)], 1)
+        return sums / np.maximum(count, 1)[:, None], count
+
+    means, count = band_means(kit)
+    fallback, _ = band_means(in_band)
+    means = np.where((count > 0)[:, None], means, fallback)
+    return means.reshape(n, FEATURE_DIM).astype(np.float32)
+
+
+def cluster_kits(features: np.ndarray, config: TeamConfig | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """k-means over all kit samples of a match; returns ``(labels, centres)``."""
+    cfg = config or TeamConfig()
+    data = np.ascontiguousarray(features, dtype=np.float32).reshape(-1, FEATURE_DIM)
+    k = min(cfg.clusters, len(data))
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, FEATURE_DIM), dtype=np.float32)
+    cv2.setRNGSeed(cfg.seed)
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 100, 0.1)
+    _, labels, centres = cv2.kmeans(data, k, None, criteria, cfg.attempts, cv2.KMEANS_PP_CENTERS)
+    return labels.reshape(-1).astype(np.int64), centres
+
+
+def vote_tracks(track_id: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Majority label per track (ties go to the lower label); returns ``(tracks, label)`` sorted by track."""
+    pairs = np.column_stack([track_id, labels]).astype(np.int64)
+    pairs, counts = np.unique(pairs, axis=0, return_counts=True)
+    order = np.lexsort((pairs[:, 1], -counts, pairs[:, 0]))
+    pairs = pairs[order]
+    first = np.r_[True, pairs[1:, 0] != pairs[:-1, 0]] if len(pairs) else np.zeros(0, dtype=bool)
+    return pairs[first, 0], pairs[first, 1]
+
+
+def assign_roles(
+    tracks: np.ndarray,
+    clusters: np.ndarray,
+    columns: Mapping[str, np.ndarray] | None = None,
+    config: TeamConfig | None = None,
+) -> TeamLabels:
+    """Teams from the two largest clusters; goalkeepers and referees from pitch positions.
+
+    ``columns`` are the match's track rows (``track_id``, ``frame_index``,
+    ``pitch_x``); without them non-team tracks keep the unknown role.
+    """
+    cfg = config or TeamConfig()
+    tracks = np.asarray(tracks, dtype=np.int64)
+    clusters = np.asarray(clusters, dtype=np.int64)
+    sizes = np.bincount(clusters, minlength=1)
+    cluster_team = np.full(len(sizes), NO_TEAM, dtype=np.int64)
+    ranked = np.argsort(-sizes, kind="stable")[:2]
+    cluster_team[ranked] = np.arange(len(ranked))
+    team = cluster_team[clusters]
+    role = np.where(team != NO_TEAM, ROLES.index("player"), ROLES.index("unknown")).astype(np.uint8)
+    labels = TeamLabels(tracks, team, role)
+    if columns is None or "pitch_x" not in columns or not len(tracks):
+        return labels
+
+    track_id = np.asarray(columns["track_id"], dtype=np.int64)
+    x = np.asarray(columns["pitch_x"], dtype=np.float64)
+    row_team, _ = labels.lookup(track_id)
+    frames, frame_row = np.unique(np.asarray(columns["frame_index"]), return_inverse=True)
+    # Mean x of each team's players in every frame.
+    team_x = np.full((len(frames), 2), np.nan)
+    for t in range(2):
+        rows = row_team == t
+        count = np.bincount(frame_row[rows], minlength=len(frames))
+        total = np.bincount(frame_row[rows], weights=x[rows], minlength=len(frames))
+        team_x[count > 0, t] = total[count > 0] / count[count > 0]
+
+    other = (row_team == NO_TEAM) & np.isin(track_id, tracks)
+    slot = np.searchsorted(tracks, track_id[other])
+    n = len(tracks)
+    mean_x = np.bincount(slot, weights=x[other], minlength=n) / np.maximum(np.bincount(slot, minlength=n), 1)
+    same_frames = team_x[frame_row[other]]
+    seen = np.isfinite(same_frames)
+    rival_x = np.stack(
+        [
+            np.bincount(slot[seen[:, t]], weights=same_frames[seen[:, t], t], minlength=n)
+            / np.maximum(np.bincount(slot[seen[:, t]], minlength=n), 1)
+            for t in range(2)
+        ],
+        axis=1,
+    )
+    both_seen = np.all([np.bincount(slot[seen[:, t]], minlength=n) > 0 for t in range(2)], axis=0)
+    goal = np.where(mean_x <= cfg.goal_distance, 0.0, cfg.pitch_length)
+    near_goal = (mean_x <= cfg.goal_distance) | (mean_x >= cfg.pitch_length - cfg.goal_distance)
+    is_other = team == NO_TEAM
+    keeper = is_other & near_goal & both_seen
+    defending = np.argmin(np.abs(rival_x - goal[:, None]), axis=1)
+    labels.team = np.where(keeper, defending, team)
+    labels.role = np.select(
+        [keeper, is_other], [ROLES.index("goalkeeper"), ROLES.index("referee")], ROLES.index("player")
+    ).astype(np.uint8)
+    return labels
+
+
+@METRICS.timed("teams")
+def classify_teams(
+    sample_track_id: np.ndarray,
+    features: np.ndarray,
+    columns: Mapping[str, np.ndarray] | None = None,
+    config: TeamConfig | None = None,
+) -> TeamLabels:
+    """Cluster the kit samples of a match once and label every sampled track."""
+    cfg = config or TeamConfig()
+    labels, _ = cluster_kits(features, cfg)
+    tracks, clusters = vote_tracks(sample_track_id, labels)
+    return assign_roles(tracks, clusters, columns, cfg)
+
+
+def write_team_store(
+    source: TrackStoreReader,
+    path: str | Path,
+    labels: TeamLabels,
+    metadata: dict | None = None,
+    chunk_size: int = 1 << 20,
+) -> None:
+    """Copy ``source`` with ``team`` and ``role`` columns, plus ``teams.csv`` with the per-track labels."""
+    columns = {**source.columns, "team": ("<i4", ()), "role": ("u1", ())}
+    with TrackStoreWriter(path, columns=columns, metadata=metadata, chunk_size=chunk_size) as writer:
+        for chunk in source.iter_chunks(chunk_size):
+            chunk["team"], chunk["role"] = labels.lookup(chunk["track_id"])
+            writer.write_columns(**chunk)
+    labels.to_frame().to_csv(Path(path) / TEAMS_FILE, index=False)
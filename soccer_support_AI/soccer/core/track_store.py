@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Generator, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .types import TrackRecord
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
+
+STORE_FORMAT = "soccer-track-store"
+STORE_VERSION = 1
+META_FILE = "meta.json"
+
+ColumnSpec = Tuple[str, Tuple[int, ...]]
+
+TRACK_COLUMNS: Dict[str, ColumnSpec] = {
+    "track_id": ("<i4", ()),
+    "frame_index": ("<i4", ()),
+    "bbox": ("<f4", (4,)),
+    "score": ("<f4", ()),
+}
+PROJECTED_COLUMNS: Dict[str, ColumnSpec] = {
+    **TRACK_COLUMNS,
+    "pitch_x": ("<f4", ()),
+    "pitch_y": ("<f4", ()),
+    "valid": ("u1", ()),  # 0 where the projection fell off the pitch or beyond the horizon
+}
+KINEMATIC_COLUMNS: Dict[str, ColumnSpec] = {
+    **PROJECTED_COLUMNS,
+    "velocity_x": ("<f4", ()),
+    "velocity_y": ("<f4", ()),
+    "acceleration_x": ("<f4", ()),
+    "acceleration_y": ("<f4", ()),
+    "interpolated": ("u1", ()),
+}
+BBOX_FIELDS = ("bbox_x1", "bbox_y1", "bbox_x2", "bbox_y2")
+
+
+def is_track_store(path: str | Path) -> bool:
+    return (Path(path) / META_FILE).is_file()
+
+
+class TrackStoreWriter:
+    """Append-only columnar writer that flushes fixed-size chunks to disk.
+
+    Each column is a raw little-endian binary file next to ``meta.json``, so a
+    store can be memory-mapped by :class:`TrackStoreReader` and memory use while
+    writing is bounded by ``chunk_size`` rows. With ``resume``, an existing
+    store is reopened and appended to after its last flushed chunk.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        columns: Dict[str, ColumnSpec] | None = None,
+        metadata: dict | None = None,
+        chunk_size: int = 65536,
+        resume: bool = False,
+    ):
+        self.path = Path(path)
+        self.columns = dict(columns or TRACK_COLUMNS)
+        self.metadata = dict(metadata or {})
+        self.chunk_size = chunk_size
+        self.num_rows = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        if resume and is_track_store(self.path):
+            existing = TrackStoreReader(self.path)
+            if existing.columns != self.columns:
+                raise ValueError(f"Cannot resume {path}: column layout differs")
+            self.num_rows = existing.num_rows
+            self.metadata = {**existing.metadata, **self.metadata}
+            self._files = {}
+            for name, (dtype, shape) in self.columns.items():
+                handle = (self.path / f"{name}.bin").open("r+b")
+                # Drop bytes past the last chunk recorded in meta.json (an interrupted flush).
+                handle.truncate(self.num_rows * np.dtype(dtype).itemsize * int(np.prod(shape)))
+                handle.seek(0, 2)
+                self._files[name] = handle
+        else:
+            self._files = {name: (self.path / f"{name}.bin").open("wb") for name in self.columns}
+        self._pending: Dict[str, List[np.ndarray]] = {name: [] for name in self.columns}
+        self._pending_rows = 0
+        self._write_meta()
+
+    def __enter__(self) -> "TrackStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write_records(self, records: Iterable[TrackRecord]) -> None:
+        records = list(records)
+        if not records:
+            return
+        self.write_columns(
+            track_id=[rec.track_id for rec in records],
+            frame_index=[rec.frame_index for rec in records],
+            bbox=[rec.bbox for rec in records],
+            score=[rec.score for rec in records],
+        )
+
+    def write_columns(self, **arrays: np.ndarray) -> None:
+        """Buffer already-columnar rows; every store column must be given."""
+        missing = set(self.columns) - set(arrays)
+        if missing:
+            raise ValueError(f"Missing columns: {sorted(missing)}")
+        rows = None
+        for name, (dtype, shape) in self.columns.items():
+            arr = np.asarray(arrays[name], dtype=dtype).reshape((-1, *shape))
+            if rows is None:
+                rows = len(arr)
+            elif len(arr) != rows:
+                raise ValueError(f"Column '{name}' has {len(arr)} rows, expected {rows}")
+            self._pending[name].append(arr)
+        self._pending_rows += rows or 0
+        if self._pending_rows >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending_rows:
+            return
+        for name, chunks in self._pending.items():
+            self._files[name].write(np.concatenate(chunks).tobytes())
+            self._files[name].flush()
+        self.num_rows += self._pending_rows
+        self._pending = {name: [] for name in self.columns}
+        self._pending_rows = 0
+        self._write_meta()
+
+    def close(self) -> None:
+        self.flush()
+        for handle in self._files.values():
+            handle.close()
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        meta = {
+            "format": STORE_FORMAT,
+            "version": STORE_VERSION,
+            "num_rows": self.num_rows,
+            "columns": {
+                name: {"dtype": dtype, "shape": list(shape)}
+                for name, (dtype, shape) in self.columns.items()
+            },
+            "metadata": self.metadata,
+        }
+        # Replace atomically so a crash never leaves a truncated meta.json behind.
+        tmp = self.path / f"{META_FILE}.tmp"
+        tmp.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        tmp.replace(self.path / META_FILE)
+
+
+class TrackStoreReader:
+    """Memory-mapped view over a store written by :class:`TrackStoreWriter`."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        meta = json.loads((self.path / META_FILE).read_text(encoding="utf-8"))
+        if meta.get("format") != STORE_FORMAT:
+            raise ValueError(f"Not a track store: {path}")
+        self.num_rows = int(meta["num_rows"])
+        self.metadata = meta.get("metadata", {})
+        self.columns: Dict[str, ColumnSpec] = {
+            name: (spec["dtype"], tuple(spec["shape"])) for name, spec in meta["columns"].items()
+        }
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self.columns:
+            raise KeyError(f"Track store has no column '{name}'")
+        if name not in self._arrays:
+            dtype, shape = self.columns[name]
+            shape = (self.num_rows, *shape)
+            if self.num_rows == 0:
+                self._arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                self._arrays[name] = np.memmap(
+                    self.path / f"{name}.bin", dtype=dtype, mode="r", shape=shape
+                )
+        return self._arrays[name]
+
+    def iter_chunks(
+        self, chunk_size: int = 1 << 20, columns: Sequence[str] | None = None
+    ) -> Generator[Dict[str, np.ndarray], None, None]:
+        names = list(columns or self.columns)
+        arrays = {name: self.column(name) for name in names}
+        for start in range(0, self.num_rows, chunk_size):
+            stop = min(start + chunk_size, self.num_rows)
+            yield {name: np.asarray(arr[start:stop]) for name, arr in arrays.items()}
+
+    def iter_records(self, chunk_size: int = 1 << 16) -> Generator[List[TrackRecord], None, None]:
+        """Yield lists of :class:`TrackRecord` holding at most ``chunk_size`` rows."""
+        for chunk in self.iter_chunks(chunk_size, columns=list(TRACK_COLUMNS)):
+            yield [
+                TrackRecord(track_id=tid, frame_index=fidx, bbox=tuple(bbox), score=score)
+                for tid, fidx, bbox, score in zip(
+                    chunk["track_id"].tolist(),
+                    chunk["frame_index"].tolist(),
+                    chunk["bbox"].tolist(),
+                    chunk["score"].tolist(),
+                )
+            ]
+
+    def to_dataframe(self, columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """Load columns into a DataFrame; ``bbox`` is split into ``bbox_x1`` .. ``bbox_y2``."""
+        import pandas as pd
+        data = {}
+        for name in columns or self.columns:
+            arr = self.column(name)
+            if name == "bbox":
+                for i, field in enumerate(BBOX_FIELDS):
+                    data[field] = np.asarray(arr[:, i])
+            else:
+                data[name] = np.asarray(arr)
+        return pd.DataFrame(data)
@@ -6,6 +6,7 @@ from typing import Dict, List, Sequence, Tuple
 import numpy as np
 from scipy.optimize import linear_sum_assignment
 
+from .instrumentation import METRICS
 from .types import Detection, TrackRecord
 
 
@@ -34,96 +35,425 @@ class TrackState:
         )
 
 
+def bbox_iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between ``(T, 4)`` and ``(D, 4)`` xyxy box arrays."""
+    ax1, ay1, ax2, ay2 = boxes_a.T[:, :, None]
+    bx1, by1, bx2, by2 = boxes_b.T
+    inter_area = np.minimum(ax2, bx2) - np.maximum(ax1, bx1)
+    np.maximum(inter_area, 0.0, out=inter_area)
+    inter_h = np.minimum(ay2, by2) - np.maximum(ay1, by1)
+    np.maximum(inter_h, 0.0, out=inter_h)
+    inter_area *= inter_h
+    union = (ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - inter_area
+    np.maximum(union, 1e-6, out=union)
+    return np.divide(inter_area, union, out=inter_area)
+
+
+def detections_to_arrays(detections: Sequence[Detection]) -> Tuple[np.ndarray, np.ndarray]:
+    boxes = np.array([det.bbox for det in detections], dtype=np.float64).reshape(-1, 4)
+    scores = np.array([det.score for det in detections], dtype=np.float64)
+    return boxes, scores
+
+
+def frame_gap(last_update: int | None, frame_index: int) -> int:
+    """Source frames elapsed since the previous update (at least 1)."""
+    if last_update is None:
+        return 1
+    return max(frame_index - last_update, 1)
+
+
+def gated_assignment(cost: np.ndarray, iou_threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Hungarian matching on a ``1 - IoU`` cost matrix, keeping pairs above the threshold.
+
+    Returns ``(rows, cols)`` sorted by row.
+    """
+    if cost.size == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    rows, cols = linear_sum_assignment(cost)
+    keep = 1.0 - cost[rows, cols] >= iou_threshold
+    return rows[keep], cols[keep]
+
+
 class IOUTracker:
-    """Lightweight tracker that links detections by maximizing IoU overlap."""
+    """Lightweight tracker that links detections by maximizing IoU overlap.
+
+    Track state is kept in parallel arrays (one row per live track, in creation
+    order) so association is a single broadcast over all tracks and detections.
+    Frame indices may skip (e.g. dropped live frames): track ages advance by
+    the gap, so ``max_age`` is always measured in source frames.
+    """
 
     def __init__(self, config: TrackerConfig | None = None):
         self.config = config or TrackerConfig()
-        self.tracks: Dict[int, TrackState] = {}
         self.next_id = 1
+        self._ids = np.empty(0, dtype=np.int64)
+        self._boxes = np.empty((0, 4), dtype=np.float64)
+        self._scores = np.empty(0, dtype=np.float64)
+        self._last_frame = np.empty(0, dtype=np.int64)
+        self._hits = np.empty(0, dtype=np.int64)
+        self._ages = np.empty(0, dtype=np.int64)
+        self._last_update: int | None = None
 
-    def _bbox_iou(self, box_a, box_b) -> float:
-        ax1, ay1, ax2, ay2 = box_a
-        bx1, by1, bx2, by2 = box_b
-        inter_x1 = max(ax1, bx1)
-        inter_y1 = max(ay1, by1)
-        inter_x2 = min(ax2, bx2)
-        inter_y2 = min(ay2, by2)
-        inter_w = max(0.0, inter_x2 - inter_x1)
-        inter_h = max(0.0, inter_y2 - inter_y1)
-        inter_area = inter_w * inter_h
-        if inter_area == 0:
-            return 0.0
-        area_a = (ax2 - ax1) * (ay2 - ay1)
-        area_b = (bx2 - bx1) * (by2 - by1)
-        return inter_area / max(area_a + area_b - inter_area, 1e-6)
-
-    def _build_cost_matrix(self, detections: Sequence[Detection]):
-        track_boxes = [track.bbox for track in self.tracks.values()]
-        det_boxes = [det.bbox for det in detections]
-        if not track_boxes or not det_boxes:
-            return np.zeros((len(track_boxes), len(det_boxes)), dtype=float)
-        cost = np.zeros((len(track_boxes), len(det_boxes)), dtype=float)
-        for i, t_box in enumerate(track_boxes):
-            for j, d_box in enumerate(det_boxes):
-                iou = self._bbox_iou(t_box, d_box)
-                cost[i, j] = 1.0 - iou
-        return cost
-
-    def _match(self, detections: Sequence[Detection]):
-        if not self.tracks or not detections:
-            return [], set(range(len(self.tracks))), set(range(len(detections)))
-        cost = self._build_cost_matrix(detections)
-        row_ind, col_ind = linear_sum_assignment(cost)
-        matches = []
-        unmatched_tracks = set(range(len(self.tracks)))
-        unmatched_detections = set(range(len(detections)))
-        track_items = list(self.tracks.items())
-        for row, col in zip(row_ind, col_ind):
-            track_id, track = track_items[row]
-            iou = 1.0 - cost[row, col]
-            if iou < self.config.iou_threshold:
-                continue
-            matches.append((track_id, col))
-            unmatched_tracks.discard(row)
-            unmatched_detections.discard(col)
-        return matches, unmatched_tracks, unmatched_detections
+    @property
+    def tracks(self) -> Dict[int, TrackState]:
+        """Snapshot of live tracks keyed by id."""
+        return {
+            int(track_id): TrackState(
+                track_id=int(track_id),
+                bbox=tuple(map(float, bbox)),
+                score=float(score),
+                last_frame=int(last_frame),
+                hits=int(hits),
+                age=int(age),
+            )
+            for track_id, bbox, score, last_frame, hits, age in zip(
+                self._ids, self._boxes, self._scores, self._last_frame, self._hits, self._ages
+            )
+        }
 
+    def _build_cost_matrix(self, det_boxes: np.ndarray) -> np.ndarray:
+        return 1.0 - bbox_iou_matrix(self._boxes, det_boxes)
+
+    def _match(self, det_boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return matched ``(track_rows, det_cols)`` sorted by track row."""
+        if len(self._ids) == 0 or len(det_boxes) == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        return gated_assignment(self._build_cost_matrix(det_boxes), self.config.iou_threshold)
+
+    @METRICS.timed("association")
     def update(self, detections: Sequence[Detection], frame_index: int) -> List[TrackRecord]:
-        records: List[TrackRecord] = []
-        matches, unmatched_tracks, unmatched_detections = self._match(detections)
+        gap = frame_gap(self._last_update, frame_index)
+        self._last_update = frame_index
+        det_boxes, det_scores = detections_to_arrays(detections)
+        matched_rows, matched_cols = self._match(det_boxes)
 
         # Update matched tracks
-        track_items = list(self.tracks.items())
-        for track_id, det_idx in matches:
+        self._boxes[matched_rows] = det_boxes[matched_cols]
+        self._scores[matched_rows] = det_scores[matched_cols]
+        self._last_frame[matched_rows] = frame_index
+        self._hits[matched_rows] += 1
+        self._ages[matched_rows] = 0
+        records: List[TrackRecord] = []
+        hits: List[int] = []
+        for row, det_idx in zip(matched_rows.tolist(), matched_cols.tolist()):
             detection = detections[det_idx]
-            track = self.tracks[track_id]
-            track.bbox = detection.bbox
-            track.score = detection.score
-            track.last_frame = frame_index
-            track.hits += 1
-            track.age = 0
-            records.append(track.to_record(frame_index))
+            records.append(
+                TrackRecord(
+                    track_id=int(self._ids[row]),
+                    frame_index=frame_index,
+                    bbox=detection.bbox,
+                    score=detection.score,
+                )
+            )
+            hits.append(int(self._hits[row]))
 
         # Age unmatched tracks and remove stale ones
-        for idx in unmatched_tracks:
-            track_id, track = track_items[idx]
-            track.age += 1
-            if track.age > self.config.max_age:
-                del self.tracks[track_id]
+        unmatched = np.ones(len(self._ids), dtype=bool)
+        unmatched[matched_rows] = False
+        self._ages[unmatched] += gap
+        alive = self._ages <= self.config.max_age
+        if not alive.all():
+            self._ids = self._ids[alive]
+            self._boxes = self._boxes[alive]
+            self._scores = self._scores[alive]
+            self._last_frame = self._last_frame[alive]
+            self._hits = self._hits[alive]
+            self._ages = self._ages[alive]
 
         # Spawn new tracks
-        for det_idx in unmatched_detections:
-            detection = detections[det_idx]
-            track_id = self.next_id
-            self.next_id += 1
-            self.tracks[track_id] = TrackState(
-                track_id=track_id,
-                bbox=detection.bbox,
-                score=detection.score,
-                last_frame=frame_index,
+        new_cols = np.ones(len(detections), dtype=bool)
+        new_cols[matched_cols] = False
+        new_cols = np.flatnonzero(new_cols)
+        if new_cols.size:
+            new_ids = np.arange(self.next_id, self.next_id + new_cols.size, dtype=np.int64)
+            self.next_id += int(new_cols.size)
+            self._ids = np.concatenate([self._ids, new_ids])
+            self._boxes = np.concatenate([self._boxes, det_boxes[new_cols]])
+            self._scores = np.concatenate([self._scores, det_scores[new_cols]])
+            self._last_frame = np.concatenate(
+                [self._last_frame, np.full(new_cols.size, frame_index, dtype=np.int64)]
             )
-            records.append(self.tracks[track_id].to_record(frame_index))
+            self._hits = np.concatenate([self._hits, np.ones(new_cols.size, dtype=np.int64)])
+            self._ages = np.concatenate([self._ages, np.zeros(new_cols.size, dtype=np.int64)])
+            for track_id, det_idx in zip(new_ids.tolist(), new_cols.tolist()):
+                detection = detections[det_idx]
+                records.append(
+                    TrackRecord(
+                        track_id=track_id,
+                        frame_index=frame_index,
+                        bbox=detection.bbox,
+                        score=detection.score,
+                    )
+                )
+                hits.append(1)
 
+        METRICS.gauge("active_tracks", len(self._ids))
         min_hits = self.config.min_hits
-        return [r for r in records if self.tracks[r.track_id].hits >= min_hits]
+        return [r for r, h in zip(records, hits) if h >= min_hits]
+
+
+@dataclass
+class ByteTrackerConfig(TrackerConfig):
+    iou_threshold: float = 0.2  # minimum IoU of any match
+    low_iou_threshold: float = 0.5  # minimum IoU to continue a track on a low-confidence detection
+    high_threshold: float = 0.5
+    low_threshold: float = 0.1
+    new_track_threshold: float = 0.6  # minimum score to spawn a track
+    std_position: float = 1.0 / 20  # Kalman noise, relative to box height
+    std_velocity: float = 1.0 / 160
+
+
+def _state_transition(steps: int) -> np.ndarray:
+    """Right-multiplied constant-velocity map of a :class:`ByteTracker` state row over ``steps`` frames."""
+    s = float(steps)
+    F = np.eye(11)
+    F[4:8, :4] = s * np.eye(4)  # box += s * velocity
+    F[8:, 8:] = [[1.0, 0.0, 0.0], [2 * s, 1.0, 0.0], [s * s, s, 1.0]]  # [pp, pv, vv] -> A P A^T
+    return F
+
+
+class ByteTracker:
+    """Constant-velocity Kalman tracker with ByteTrack association.
+
+    Every track's predicted box is matched against the high-confidence
+    detections; tracks that were seen on the previous update may also
+    continue on a low-confidence detection they overlap by at least
+    ``low_iou_threshold``. Both kinds of candidate pairs go into a single
+    gated assignment, so a frame costs one solve rather than two. Kalman
+    predict/update run on all tracks at once with state
+    ``[cx, cy, w, h, vcx, vcy, vw, vh]``.
+
+    With diagonal noise scaled by the box height, each box coordinate and its
+    velocity form an independent 2x2 system, and all four coordinates share
+    the same covariance. A track is therefore one contiguous row of
+    ``_state`` (``(N, 11)``): box ``[cx, cy, w, h]``, velocity, then
+    ``[pos var, cross term, vel var]``. Predict is one product with an 11x11
+    transition plus the process noise, and the update gathers and scatters
+    only the matched rows.
+    """
+
+    # Box conversions as right-multiplied matrices: xyxy <-> [cx, cy, w, h].
+    _TO_CXCYWH = np.array([[0.5, 0, -1, 0], [0, 0.5, 0, -1], [0.5, 0, 1, 0], [0, 0.5, 0, 1]])
+    _TO_XYXY = np.array([[1, 0, 1, 0], [0, 1, 0, 1], [-0.5, 0, 0.5, 0], [0, -0.5, 0, 0.5]])
+    _MIN_SIZE = np.array([-np.inf, -np.inf, 1.0, 1.0])
+    # A new track's state row from its xyxy box: position from the box, zero velocity and covariance.
+    _SPAWN = np.hstack([_TO_CXCYWH, np.zeros((4, 7))])
+    # The Kalman update as products: each coordinate's position and velocity gain is ``[pp, pv] / S``,
+    # applied to the innovation, while the covariance loses ``[gain_p * pp, gain_p * pv, gain_v * pv]``.
+    _GAIN = np.zeros((11, 11))
+    _GAIN[8, [0, 1, 2, 3, 8, 9]] = 1.0
+    _GAIN[9, [4, 5, 6, 7, 10]] = 1.0
+    _RESIDUAL_BOX = np.hstack([_TO_CXCYWH, _TO_CXCYWH, np.zeros((4, 3))])
+    _RESIDUAL_STATE = np.zeros((11, 11))
+    _RESIDUAL_STATE[:4, :8] = -np.hstack([np.eye(4), np.eye(4)])
+    _RESIDUAL_STATE[[8, 9, 9], [8, 9, 10]] = -1.0
+
+    def __init__(self, config: ByteTrackerConfig | None = None):
+        self.config = config or ByteTrackerConfig()
+        self.next_id = 1
+        self._ids = np.empty(0, dtype=np.int64)
+        self._state = np.empty((0, 11), dtype=np.float64)
+        self._hits = np.empty(0, dtype=np.int64)
+        self._ages = np.empty(0, dtype=np.int64)
+        self._last_update: int | None = None
+        cfg = self.config
+        # Process noise per frame, per unit of squared box height.
+        self._noise = np.zeros(11)
+        self._noise[8:] = [cfg.std_position**2, 0.0, cfg.std_velocity**2]
+        self._initial = np.zeros(11)
+        self._initial[8:] = [(2.0 * cfg.std_position) ** 2, 0.0, (10.0 * cfg.std_velocity) ** 2]
+        self._step = _state_transition(1)
+        # Largest ``1 - IoU`` cost a detection may match at, by [fresh, stale] track and by detection
+        # level [below ``low_threshold``, weak, high-confidence]: a weak detection only continues a track
+        # seen on the previous update, on a close overlap.
+        self._score_levels = np.array([cfg.low_threshold, cfg.high_threshold])
+        self._max_cost = np.array([[-1.0, 1.0 - cfg.low_iou_threshold, np.inf], [-1.0, -1.0, np.inf]])
+
+    def predicted_boxes(self) -> np.ndarray:
+        """Current xyxy estimate for every live track."""
+        return np.maximum(self._state[:, :4], self._MIN_SIZE) @ self._TO_XYXY
+
+    def _predict(self, steps: int = 1) -> None:
+        """Advance every track by ``steps`` frames; process noise grows linearly with the gap."""
+        if steps == 1:
+            self._state = self._state @ self._step
+            noise = self._noise
+        else:
+            self._state = self._state @ _state_transition(steps)
+            noise = steps * self._noise
+        self._state += np.square(self._state[:, 3:4]) * noise
+
+    def _correct(self, rows: np.ndarray, boxes: np.ndarray) -> None:
+        """Kalman update of the tracks at ``rows`` with their matched xyxy ``boxes``."""
+        state = self._state.take(rows, axis=0)
+        gain = state @ self._GAIN
+        gain /= state[:, 8:9] + np.square(state[:, 3:4] * self.config.std_position)
+        state += gain * (boxes @ self._RESIDUAL_BOX + state @ self._RESIDUAL_STATE)
+        self._state[rows] = state
+
+    def _spawn(self, boxes: np.ndarray) -> np.ndarray:
+        n = len(boxes)
+        ids = np.arange(self.next_id, self.next_id + n, dtype=np.int64)
+        if n == 0:
+            return ids
+        self.next_id += n
+        state = boxes @ self._SPAWN
+        state += np.square(state[:, 3:4]) * self._initial
+        self._ids = np.concatenate([self._ids, ids])
+        self._state = np.concatenate([self._state, state])
+        self._hits = np.concatenate([self._hits, np.ones(n, dtype=np.int64)])
+        self._ages = np.concatenate([self._ages, np.zeros(n, dtype=np.int64)])
+        return ids
+
+    @METRICS.timed("association")
+    def update(self, detections: Sequence[Detection], frame_index: int) -> List[TrackRecord]:
+        cfg = self.config
+        gap = frame_gap(self._last_update, frame_index)
+        self._last_update = frame_index
+        det_boxes, det_scores = detections_to_arrays(detections)
+        self._predict(gap)
+        cost = 1.0 - bbox_iou_matrix(self.predicted_boxes(), det_boxes)
+        max_cost = self._max_cost.take(np.searchsorted(self._score_levels, det_scores, side="right"), axis=1)
+        np.putmask(cost, cost > max_cost.take(np.minimum(self._ages, 1), axis=0), 1.0)
+        matched_rows, matched_cols = gated_assignment(cost, cfg.iou_threshold)
+        if matched_rows.size:
+            self._correct(matched_rows, det_boxes[matched_cols])
+            self._hits[matched_rows] += 1
+        self._ages += gap
+        self._ages[matched_rows] = 0
+
+        records = [
+            TrackRecord(track_id, frame_index, detections[det_idx].bbox, detections[det_idx].score)
+            for track_id, det_idx in zip(self._ids[matched_rows].tolist(), matched_cols.tolist())
+        ]
+        if cfg.min_hits > 1:
+            # A track spawned this frame has a single hit, so only continued tracks can qualify.
+            records = [r for r, h in zip(records, self._hits[matched_rows].tolist()) if h >= cfg.min_hits]
+
+        alive = self._ages <= cfg.max_age
+        if not alive.all():
+            self._ids = self._ids[alive]
+            self._state = self._state[alive]
+            self._hits = self._hits[alive]
+            self._ages = self._ages[alive]
+
+        spawn = det_scores >= max(cfg.high_threshold, cfg.new_track_threshold)
+        spawn[matched_cols] = False
+        spawn = spawn.nonzero()[0]
+        if spawn.size:
+            new_ids = self._spawn(det_boxes[spawn])
+            if cfg.min_hits <= 1:
+                for track_id, det_idx in zip(new_ids.tolist(), spawn.tolist()):
+                    detection = detections[det_idx]
+                    records.append(TrackRecord(track_id, frame_index, detection.bbox, detection.score))
+
+        METRICS.gauge("active_tracks", len(self._ids))
+        return records
+
+
+BALL_TRACK_ID = 0  # player track ids start at 1
+
+
+@dataclass
+class BallTrackerConfig:
+    min_score: float = 0.1  # detections below this are ignored
+    init_score: float = 0.4  # a lost track restarts only on a detection this confident
+    max_age: int = 75  # frames to coast through an occlusion before the track is dropped
+    reacquire_after: int = 10  # while coasting this long, a confident detection outside the gate restarts
+    gate: float = 13.8  # squared Mahalanobis distance (chi-square, 2 dof, 99.9%)
+    std_acceleration: float = 3.0  # px / frame^2; a kicked ball changes speed abruptly
+    std_measurement: float = 2.0  # px
+
+
+class BallTracker:
+    """Single-object constant-velocity Kalman tracker for the ball.
+
+    Each frame the detection inside the Mahalanobis gate of the prediction
+    is taken, nearest first. Unmatched frames only predict, and the position
+    covariance (and with it the gate) grows with every frame coasted. So a
+    ball hidden behind players for up to ``max_age`` frames is picked up
+    again where it re-emerges rather than at the most confident detection
+    anywhere in the frame. Records carry :data:`BALL_TRACK_ID`, so the output
+    is a regular track store that ``warp_to_pitch.py`` can project.
+    """
+
+    def __init__(self, config: BallTrackerConfig | None = None):
+        self.config = config or BallTrackerConfig()
+        self._mean: np.ndarray | None = None  # [x, y, vx, vy]
+        self._cov = np.zeros((4, 4))
+        self._misses = 0
+        self._last_update: int | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._mean is not None
+
+    @property
+    def position(self) -> Tuple[float, float] | None:
+        """Current (possibly predicted) ball centre."""
+        return None if self._mean is None else (float(self._mean[0]), float(self._mean[1]))
+
+    def _predict(self, steps: int) -> None:
+        F = np.eye(4) + steps * np.eye(4, k=2)
+        q = self.config.std_acceleration**2
+        # Discrete white-noise acceleration over ``steps`` frames.
+        t = float(steps)
+        Q1 = q * np.array([[t**4 / 4, t**3 / 2], [t**3 / 2, t**2]])
+        Q = np.zeros((4, 4))
+        Q[np.ix_([0, 2], [0, 2])] = Q1
+        Q[np.ix_([1, 3], [1, 3])] = Q1
+        self._mean = F @ self._mean
+        self._cov = F @ self._cov @ F.T + Q
+
+    def _start(self, centre: np.ndarray) -> None:
+        self._mean = np.array([centre[0], centre[1], 0.0, 0.0])
+        self._cov = np.diag([1.0, 1.0, 100.0, 100.0]) * self.config.std_measurement**2
+        self._misses = 0
+
+    def _correct(self, centre: np.ndarray, S: np.ndarray) -> None:
+        gain = np.linalg.solve(S, self._cov[:2, :]).T  # (4, 2)
+        self._mean = self._mean + gain @ (centre - self._mean[:2])
+        self._cov = self._cov - gain @ self._cov[:2, :]
+        self._misses = 0
+
+    @METRICS.timed("ball_association")
+    def update(self, detections: Sequence[Detection], frame_index: int) -> TrackRecord | None:
+        """Advance to ``frame_index``; returns the ball's detection, or None when it is not seen."""
+        cfg = self.config
+        gap = frame_gap(self._last_update, frame_index)
+        self._last_update = frame_index
+        boxes, scores = detections_to_arrays(detections)
+        keep = np.flatnonzero(scores >= cfg.min_score)
+        centres = (boxes[keep, :2] + boxes[keep, 2:]) / 2
+
+        chosen = None
+        if self._mean is not None:
+            self._predict(gap)
+            S = self._cov[:2, :2] + np.eye(2) * cfg.std_measurement**2
+            innovation = centres - self._mean[:2]
+            distance = np.einsum("ni,ij,nj->n", innovation, np.linalg.inv(S), innovation)
+            if distance.size and distance.min() <= cfg.gate:
+                chosen = int(np.argmin(distance))
+                self._correct(centres[chosen], S)
+            else:
+                self._misses += gap
+                if self._misses > cfg.max_age:
+                    self._mean = None
+        if chosen is None and (self._mean is None or self._misses >= cfg.reacquire_after):
+            confident = np.flatnonzero(scores[keep] >= cfg.init_score)
+            if confident.size:
+                chosen = int(confident[np.argmax(scores[keep][confident])])
+                self._start(centres[chosen])
+        if chosen is None:
+            return None
+        detection = detections[int(keep[chosen])]
+        return TrackRecord(BALL_TRACK_ID, frame_index, detection.bbox, detection.score)
+
+
+def make_tracker(config: TrackerConfig | None = None):
+    """Build the tracker matching a config: ByteTracker for ByteTrackerConfig, else IOUTracker."""
+    if isinstance(config, ByteTrackerConfig):
+        return ByteTracker(config)
+    return IOUTracker(config)
@@ -0,0 +1,318 @@
+"""VAEP action values from action tables (see :mod:`soccer.core.events`).
+
+An action's value is the change it causes in the probability that the acting
+team scores, minus the change in the probability that it concedes, within the
+next ``horizon`` actions. Both probabilities are predicted from the game
+state: the current action and the ``window - 1`` before it, all seen from the
+acting team attacking towards increasing x.
+
+Features are built for every action of every game at once: the k-th
+previous action is a gather at ``max(i - k, first action of the game)``, so a
+season of action tables costs a handful of array operations per feature. The
+probability models are a NumPy/SciPy logistic regression (no extra
+dependency) or scikit-learn's histogram gradient boosting.
+"""
+from __future__ import annotations
+
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .events import ACTION_TYPES, NO_TEAM
+from .instrumentation import METRICS
+from .metrics import segment_starts
+
+VAEP_MODELS = ("logistic", "gbt")
+
+
+@dataclass
+class VAEPConfig:
+    window: int = 3  # actions in the game state, the current one included
+    horizon: int = 10  # a goal within this many actions labels the state
+    model: str = "logistic"
+    l2: float = 1.0  # logistic regression ridge penalty
+    max_iter: int = 300
+    gbt_params: Dict[str, float] = field(
+        default_factory=lambda: {"max_iter": 200, "learning_rate": 0.1, "max_leaf_nodes": 31}
+    )
+    pitch_length: float = 105.0
+    pitch_width: float = 68.0
+    fps: float = 25.0
+
+
+def _game_layout(actions: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Row order sorting actions by game and action id, and each sorted row's game ``[start, end)``."""
+    game = pd.factorize(actions["game_id"])[0]
+    order = np.lexsort((actions["action_id"].to_numpy(), game))
+    starts = segment_starts(game[order])
+    ends = np.r_[starts[1:], len(order)]
+    lengths = ends - starts
+    return order, np.repeat(starts, lengths), np.repeat(ends, lengths)
+
+
+def _goal_geometry(x: np.ndarray, y: np.ndarray, cfg: VAEPConfig) -> Tuple[np.ndarray, np.ndarray]:
+    """Distance (m) and angle (rad) to the centre of the goal at x = pitch_length."""
+    dx = cfg.pitch_length - x
+    dy = np.abs(cfg.pitch_width / 2 - y)
+    return np.hypot(dx, dy), np.arctan2(dy, dx)
+
+
+def _goal_for(goal: np.ndarray, scorer_team: np.ndarray, team: np.ndarray) -> np.ndarray:
+    """Whether a goal (1, or -1 for an own goal) by ``scorer_team`` counts for ``team``."""
+    return (goal != 0) & ((goal == 1) == (scorer_team == team))
+
+
+def vaep_features(actions: pd.DataFrame, config: VAEPConfig | None = None) -> pd.DataFrame:
+    """Game-state features for every action, index-aligned with ``actions``."""
+    cfg = config or VAEPConfig()
+    order, game_start, _ = _game_layout(actions)
+    n = len(order)
+    rows = np.arange(n)
+    type_code = pd.Categorical(actions["type"], categories=ACTION_TYPES).codes[order]
+    result = actions["result"].to_numpy(dtype=np.float64)[order]
+    team = actions["team"].to_numpy()[order]
+    goal = actions["goal"].to_numpy()[order]
+    frame_start = actions["frame_start"].to_numpy(dtype=np.float64)[order]
+    frame_end = actions["frame_end"].to_numpy(dtype=np.float64)[order]
+    coords = {
+        name: actions[name].to_numpy(dtype=np.float64)[order]
+        for name in ("start_x", "start_y", "end_x", "end_y")
+    }
+    # Every action of the state is mirrored into the current action's attacking direction.
+    mirror = actions["direction"].to_numpy()[order] < 0
+
+    features: Dict[str, np.ndarray] = {}
+    for k in range(cfg.window):
+        prev = np.maximum(rows - k, game_start)
+        for code, name in enumerate(ACTION_TYPES):
+            features[f"type_{name}_a{k}"] = (type_code[prev] == code).astype(np.float64)
+        features[f"result_a{k}"] = result[prev]
+        xy = {}
+        for name, values in coords.items():
+            extent = cfg.pitch_length if name.endswith("_x") else cfg.pitch_width
+            xy[name] = np.where(mirror, extent - values[prev], values[prev])
+            features[f"{name}_a{k}"] = xy[name]
+        dx = xy["end_x"] - xy["start_x"]
+        dy = xy["end_y"] - xy["start_y"]
+        features[f"dx_a{k}"] = dx
+        features[f"dy_a{k}"] = dy
+        features[f"movement_a{k}"] = np.hypot(dx, dy)
+        for end in ("start", "end"):
+            distance, angle = _goal_geometry(xy[f"{end}_x"], xy[f"{end}_y"], cfg)
+            features[f"{end}_dist_to_goal_a{k}"] = distance
+            features[f"{end}_angle_to_goal_a{k}"] = angle
+        features[f"duration_a{k}"] = (frame_end[prev] - frame_start[prev]) / cfg.fps
+        if k > 0:
+            features[f"same_team_a{k}"] = (team[prev] == team).astype(np.float64)
+            features[f"time_delta_a{k}"] = (frame_start - frame_start[prev]) / cfg.fps
+
+    # Score before each action, from the acting team's side.
+    scored = (goal != 0).astype(np.int64)
+    total = np.cumsum(scored) - scored
+    total -= total[game_start]
+    goals_for = np.zeros(n)
+    for t in np.unique(team[goal != 0]).tolist():
+        counts = _goal_for(goal, team, t).astype(np.int64)
+        before = np.cumsum(counts) - counts
+        before -= before[game_start]
+        goals_for[team == t] = before[team == t]
+    features["goalscore_team"] = goals_for
+    features["goalscore_opponent"] = total - goals_for
+    features["goalscore_diff"] = 2 * goals_for - total
+
+    out = np.empty((n, len(features)), dtype=np.float64)
+    out[order] = np.column_stack(list(features.values()))
+    return pd.DataFrame(out, columns=list(features), index=actions.index)
+
+
+def vaep_labels(actions: pd.DataFrame, config: VAEPConfig | None = None) -> pd.DataFrame:
+    """``scores`` / ``concedes``: the acting team scores / concedes within ``horizon`` actions."""
+    cfg = config or VAEPConfig()
+    order, _, game_end = _game_layout(actions)
+    n = len(order)
+    team = actions["team"].to_numpy()[order]
+    goal = actions["goal"].to_numpy()[order]
+    rows = np.arange(n)
+    scores = np.zeros(n, dtype=bool)
+    concedes = np.zeros(n, dtype=bool)
+    for k in range(cfg.horizon):
+        ahead = np.minimum(rows + k, game_end - 1)
+        valid = (rows + k < game_end) & (goal[ahead] != 0)
+        counts = _goal_for(goal[ahead], team[ahead], team)
+        scores |= valid & counts
+        concedes |= valid & ~counts
+    labels = np.empty((n, 2), dtype=bool)
+    labels[order] = np.column_stack([scores, concedes])
+    return pd.DataFrame(labels, columns=["scores", "concedes"], index=actions.index)
+
+
+class LogisticModel:
+    """L2-regularised logistic regression on standardised features, fitted with L-BFGS."""
+
+    def __init__(self, l2: float = 1.0, max_iter: int = 300):
+        self.l2 = l2
+        self.max_iter = max_iter
+        self.mean: np.ndarray | None = None
+        self.scale: np.ndarray | None = None
+        self.coef: np.ndarray | None = None
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "LogisticModel":
+        from scipy.optimize import minimize
+        from scipy.special import expit
+
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.mean = X.mean(axis=0)
+        self.scale = np.where(X.std(axis=0) > 0, X.std(axis=0), 1.0)
+        Z = np.column_stack([(X - self.mean) / self.scale, np.ones(len(X))])
+        penalty = np.r_[np.full(Z.shape[1] - 1, self.l2), 0.0]
+
+        def loss(w: np.ndarray) -> Tuple[float, np.ndarray]:
+            z = Z @ w
+            p = expit(z)
+            # log(1 + e^z) - y z, computed stably.
+            value = np.sum(np.logaddexp(0.0, z) - y * z) + 0.5 * np.sum(penalty * w * w)
+            return value, Z.T @ (p - y) + penalty * w
+
+        w0 = np.zeros(Z.shape[1])
+        w0[-1] = np.log((y.mean() + 1e-6) / (1 - y.mean() + 1e-6))
+        res = minimize(loss, w0, jac=True, method="L-BFGS-B", options={"maxiter": self.max_iter})
+        self.coef = res.x
+        return self
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Positive-class probability for each row."""
+        from scipy.special import expit
+
+        Z = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        return expit(Z @ self.coef[:-1] + self.coef[-1])
+
+
+class _GradientBoostingModel:
+    def __init__(self, **params):
+        try:
+            from sklearn.ensemble import HistGradientBoostingClassifier
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ImportError(
+                "scikit-learn is missing. Install scikit-learn for the gbt VAEP model or use 'logistic'."
+            ) from exc
+        self.model = HistGradientBoostingClassifier(**params)
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "_GradientBoostingModel":
+        self.model.fit(X, y)
+        return self
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        classes = list(self.model.classes_)
+        if True not in classes:
+            return np.zeros(len(X))
+        return self.model.predict_proba(X)[:, classes.index(True)]
+
+
+def _make_model(cfg: VAEPConfig):
+    if cfg.model == "logistic":
+        return LogisticModel(l2=cfg.l2, max_iter=cfg.max_iter)
+    if cfg.model == "gbt":
+        return _GradientBoostingModel(**cfg.gbt_params)
+    raise ValueError(f"Unknown VAEP model '{cfg.model}'. Choose from {VAEP_MODELS}.")
+
+
+class VAEPModel:
+    """Scoring and conceding probability models over :func:`vaep_features`."""
+
+    def __init__(self, config: VAEPConfig | None = None):
+        self.config = config or VAEPConfig()
+        self.feature_names: List[str] = []
+        self.models: Dict[str, object] = {}
+
+    @METRICS.timed("vaep_fit")
+    def fit(self, actions: pd.DataFrame) -> "VAEPModel":
+        _check_teams(actions)
+        features = vaep_features(actions, self.config)
+        labels = vaep_labels(actions, self.config)
+        self.feature_names = list(features.columns)
+        X = features.to_numpy()
+        self.models = {
+            name: _make_model(self.config).fit(X, labels[name].to_numpy()) for name in labels.columns
+        }
+        return self
+
+    def predict(self, actions: pd.DataFrame) -> pd.DataFrame:
+        """``p_scores`` / ``p_concedes`` per action."""
+        if not self.models:
+            raise RuntimeError("VAEP model is not fitted")
+        X = vaep_features(actions, self.config)[self.feature_names].to_numpy()
+        return pd.DataFrame(
+            {f"p_{name}": model.predict_proba(X) for name, model in self.models.items()},
+            index=actions.index,
+        )
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            pickle.dump({"config": self.config, "features": self.feature_names, "models": self.models}, f)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "VAEPModel":
+        with Path(path).open("rb") as f:
+            data = pickle.load(f)
+        model = cls(data["config"])
+        model.feature_names = data["features"]
+        model.models = data["models"]
+        return model
+
+
+def _check_teams(actions: pd.DataFrame) -> None:
+    if len(actions) and (actions["team"].to_numpy() == NO_TEAM).all():
+        raise ValueError("VAEP needs team labels; pass --teams when extracting events")
+
+
+@METRICS.timed("vaep")
+def value_actions(actions: pd.DataFrame, model: VAEPModel) -> pd.DataFrame:
+    """Offensive, defensive and total VAEP value of every action, index-aligned with ``actions``.
+
+    The previous state's probabilities are swapped when the ball changed
+    teams, and reset to zero at the start of a game and after a goal.
+    """
+    _check_teams(actions)
+    probs = model.predict(actions)
+    order, game_start, _ = _game_layout(actions)
+    p_scores = probs["p_scores"].to_numpy()[order]
+    p_concedes = probs["p_concedes"].to_numpy()[order]
+    team = actions["team"].to_numpy()[order]
+    goal = actions["goal"].to_numpy()[order]
+    rows = np.arange(len(order))
+    prev = np.maximum(rows - 1, 0)
+    same_team = team[prev] == team
+    prev_scores = np.where(same_team, p_scores[prev], p_concedes[prev])
+    prev_concedes = np.where(same_team, p_concedes[prev], p_scores[prev])
+    reset = (rows == game_start) | (goal[prev] != 0)
+    prev_scores[reset] = 0.0
+    prev_concedes[reset] = 0.0
+    offensive = p_scores - prev_scores
+    defensive = -(p_concedes - prev_concedes)
+    values = np.empty((len(order), 3))
+    values[order] = np.column_stack([offensive, defensive, offensive + defensive])
+    out = pd.DataFrame(
+        values, columns=["offensive_value", "defensive_value", "vaep_value"], index=actions.index
+    )
+    out.insert(0, "p_concedes", probs["p_concedes"])
+    out.insert(0, "p_scores", probs["p_scores"])
+    return out
+
+
+def player_ratings(
+    actions: pd.DataFrame, values: pd.DataFrame, by: Sequence[str] = ("game_id", "track_id")
+) -> pd.DataFrame:
+    """Summed values and action counts per ``by`` group, highest total VAEP first."""
+    columns = ["offensive_value", "defensive_value", "vaep_value"]
+    frame = pd.concat([actions[list(by)], values[columns]], axis=1)
+    grouped = frame.groupby(list(by), sort=False, observed=True)
+    ratings = grouped.sum()
+    ratings.insert(0, "actions", grouped.size())
+    return ratings.sort_values("vaep_value", ascending=False).reset_index()
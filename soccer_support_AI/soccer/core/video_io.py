@@ -1,17 +1,175 @@
 from __future__ import annotations
 
 import contextlib
-from typing import Generator, Iterable, Tuple
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Generator, Iterable, List, Sequence, Tuple
 
 import cv2
+import numpy as np
+
+from .instrumentation import METRICS
+from .types import Detection
 
 
 Frame = Tuple[int, any]
 
+_END_OF_STREAM = object()
+
+
+@dataclass
+class IngestConfig:
+    roi: Tuple[int, int, int, int] | None = None  # x1, y1, x2, y2 crop in source pixels
+    target_width: int | None = None  # downscale the (cropped) frame to this width
+    mask_path: str | None = None  # source-resolution image; black pixels are blanked
+    hw_accel: bool = False  # ask the FFMPEG backend for hardware decoding
+
+
+def parse_roi(value: str) -> Tuple[int, int, int, int]:
+    """Parse ``"x1,y1,x2,y2"``."""
+    parts = [int(v) for v in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError(f"ROI must be x1,y1,x2,y2, got {value!r}")
+    return tuple(parts)
+
+
+class FramePool:
+    """Fixed ring of preallocated frame buffers handed out round-robin.
+
+    A buffer is reused ``size`` acquisitions later, so ``size`` must exceed
+    the number of frames a consumer holds at once (prefetch queue + batch).
+    A consumer that cannot bound that (e.g. a decoder racing ahead of a live
+    consumer) marks its frames with :meth:`hold`; held buffers are skipped
+    until :meth:`release`.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], size: int, dtype=np.uint8):
+        self.buffers = [np.empty(shape, dtype=dtype) for _ in range(max(size, 1))]
+        self._next = 0
+        self._held: set = set()
+
+    def acquire(self) -> np.ndarray:
+        for _ in range(len(self.buffers)):
+            k = self._next
+            self._next = (k + 1) % len(self.buffers)
+            if k not in self._held:
+                return self.buffers[k]
+        raise RuntimeError(f"All {len(self.buffers)} pooled frame buffers are held; release frames first")
+
+    def _slot(self, frame: np.ndarray) -> int | None:
+        for k, buf in enumerate(self.buffers):
+            if np.may_share_memory(frame, buf):
+                return k
+        return None
+
+    def hold(self, frame: np.ndarray) -> None:
+        """Keep the buffer behind ``frame`` (or a view of it) from being handed out again."""
+        k = self._slot(frame)
+        if k is not None:
+            self._held.add(k)
+
+    def release(self, frame: np.ndarray) -> None:
+        k = self._slot(frame)
+        if k is not None:
+            self._held.discard(k)
+
+
+class FrameIngest:
+    """Decode into pooled buffers, crop to the pitch ROI, downscale and mask.
+
+    Detections made on the ingested frames are mapped back to source pixel
+    coordinates with :meth:`to_source`, so tracks stay compatible with
+    homographies calibrated on full-resolution frames.
+    """
+
+    def __init__(self, config: IngestConfig, source_size: Tuple[int, int], pool_size: int = 4):
+        self.config = config
+        self.source_size = (int(source_size[0]), int(source_size[1]))
+        width, height = self.source_size
+        if width <= 0 or height <= 0:
+            raise ValueError("The source does not report its frame size")
+        x1, y1, x2, y2 = config.roi or (0, 0, width, height)
+        x1, y1 = max(int(x1), 0), max(int(y1), 0)
+        x2, y2 = min(int(x2), width), min(int(y2), height)
+        if x2 <= x1 or y2 <= y1:
+            raise ValueError(f"ROI {config.roi} is empty for a {width}x{height} frame")
+        self.crop = (slice(y1, y2), slice(x1, x2))
+        self.offset = np.array([x1, y1, x1, y1], dtype=np.float64)
+        crop_w, crop_h = x2 - x1, y2 - y1
+        if config.target_width and config.target_width < crop_w:
+            self.scale = config.target_width / crop_w
+            self.output_size = (config.target_width, max(int(round(crop_h * self.scale)), 1))
+        else:
+            self.scale = 1.0
+            self.output_size = (crop_w, crop_h)
+        resize = self.scale != 1.0
+        # Resizing copies out of the raw frame, so a single raw buffer suffices.
+        self._raw = FramePool((height, width, 3), 1 if resize else pool_size)
+        self._out = FramePool((self.output_size[1], self.output_size[0], 3), pool_size) if resize else None
+        self._frames = self._out if resize else self._raw  # the pool backing returned frames
+        self.identity = not resize and not self.offset.any()  # boxes need no mapping back
+        self.mask = self._load_mask(config.mask_path) if config.mask_path else None
+
+    def _load_mask(self, path: str) -> np.ndarray:
+        mask = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if mask is None:
+            raise FileNotFoundError(f"Cannot read ROI mask: {path}")
+        mask = mask[self.crop]
+        if mask.shape[::-1] != self.output_size:
+            mask = cv2.resize(mask, self.output_size, interpolation=cv2.INTER_NEAREST)
+        return np.where(mask > 0, 255, 0).astype(np.uint8)
+
+    def read(self, cap: cv2.VideoCapture) -> np.ndarray | None:
+        success, raw = cap.read(self._raw.acquire())
+        if not success:
+            return None
+        frame = raw[self.crop]
+        if self._out is not None:
+            frame = cv2.resize(frame, self.output_size, dst=self._out.acquire(), interpolation=cv2.INTER_AREA)
+        if self.mask is not None:
+            cv2.bitwise_and(frame, frame, dst=frame, mask=self.mask)
+        return frame
+
+    def hold(self, frame: np.ndarray) -> None:
+        """Stop later :meth:`read` calls from overwriting ``frame`` until :meth:`release`."""
+        self._frames.hold(frame)
+
+    def release(self, frame: np.ndarray) -> None:
+        self._frames.release(frame)
+
+    def to_source(self, boxes: np.ndarray) -> np.ndarray:
+        """Map ``(N, 4)`` xyxy boxes from ingested to source pixel coordinates."""
+        return np.asarray(boxes, dtype=np.float64).reshape(-1, 4) / self.scale + self.offset
+
+    def map_detections(self, detections: Sequence[Detection]) -> List[Detection]:
+        if not detections or self.identity:
+            return list(detections)
+        boxes = self.to_source([det.bbox for det in detections])
+        return [
+            Detection(tuple(box), det.score, det.class_id)
+            for box, det in zip(boxes.tolist(), detections)
+        ]
+
+
+def make_ingest(cap: cv2.VideoCapture, config: IngestConfig | None, pool_size: int = 4) -> FrameIngest:
+    """Build a :class:`FrameIngest` sized to ``cap``.
+
+    Without a ROI, target width or mask the ingest is an identity crop and
+    scale, so frames are still decoded into its preallocated buffers.
+    """
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    return FrameIngest(config or IngestConfig(), size, pool_size)
+
 
 @contextlib.contextmanager
-def open_video(path: str) -> Iterable[cv2.VideoCapture]:
-    cap = cv2.VideoCapture(path)
+def open_video(path: str, hw_accel: bool = False) -> Iterable[cv2.VideoCapture]:
+    if hw_accel:
+        cap = cv2.VideoCapture(
+            path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        )
+    else:
+        cap = cv2.VideoCapture(path)
     if not cap.isOpened():
         raise FileNotFoundError(f"Cannot open video: {path}")
     try:
@@ -20,11 +178,119 @@ def open_video(path: str) -> Iterable[cv2.VideoCapture]:
         cap.release()
 
 
-def iter_frames(cap: cv2.VideoCapture) -> Generator[Tuple[int, any], None, None]:
-    frame_idx = 0
-    while True:
-        success, frame = cap.read()
+def iter_frames(
+    cap: cv2.VideoCapture, start: int = 0, stop: int | None = None, ingest: FrameIngest | None = None
+) -> Generator[Tuple[int, any], None, None]:
+    """Yield ``(frame_index, frame)`` pairs, optionally seeking to ``start`` first.
+
+    With ``ingest``, frames are cropped/downscaled views into its buffer pool.
+    """
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    frame_idx = start
+    while stop is None or frame_idx < stop:
+        with METRICS.timer("decode"):
+            if ingest is None:
+                success, frame = cap.read()
+            else:
+                frame = ingest.read(cap)
+                success = frame is not None
         if not success:
             break
+        METRICS.incr("frames_decoded")
+        yield frame_idx, frame
+        frame_idx += 1
+
+
+def iter_frames_at(cap: cv2.VideoCapture, frames: Sequence[int]) -> Generator[Tuple[int, any], None, None]:
+    """Yield ``(frame_index, frame)`` for the sorted ``frames`` only.
+
+    Frames in between are grabbed without being retrieved, which skips the
+    colour conversion and copy of every frame that is not needed.
+    """
+    frames = np.unique(np.asarray(frames, dtype=np.int64))
+    if not len(frames):
+        return
+    frame_idx = int(frames[0])
+    if frame_idx:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+    for target in frames.tolist():
+        while frame_idx < target:
+            if not cap.grab():
+                return
+            frame_idx += 1
+        with METRICS.timer("decode"):
+            success, frame = cap.read()
+        if not success:
+            return
+        METRICS.incr("frames_decoded")
         yield frame_idx, frame
         frame_idx += 1
+
+
+def iter_frames_prefetch(
+    cap: cv2.VideoCapture,
+    prefetch: int = 8,
+    start: int = 0,
+    stop: int | None = None,
+    ingest: FrameIngest | None = None,
+) -> Generator[Tuple[int, any], None, None]:
+    """Decode frames on a background thread and yield them in order.
+
+    At most ``prefetch`` decoded frames are buffered so memory stays bounded
+    while inference runs on the consumer side.
+    """
+    if prefetch <= 0:
+        yield from iter_frames(cap, start, stop, ingest)
+        return
+
+    buffer: queue.Queue = queue.Queue(maxsize=prefetch)
+    done = threading.Event()
+    errors: List[BaseException] = []
+
+    def _put(item) -> bool:
+        while not done.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode() -> None:
+        try:
+            for item in iter_frames(cap, start, stop, ingest):
+                if not _put(item):
+                    return
+        except BaseException as exc:  # pragma: no cover - surfaced to consumer
+            errors.append(exc)
+        finally:
+            _put(_END_OF_STREAM)
+
+    worker = threading.Thread(target=_decode, name="frame-decoder", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = buffer.get()
+            METRICS.gauge("decode_queue_depth", buffer.qsize())
+            if item is _END_OF_STREAM:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        done.set()
+        worker.join()
+
+
+def iter_batches(
+    frames: Iterable[Tuple[int, any]], batch_size: int
+) -> Generator[List[Tuple[int, any]], None, None]:
+    batch: List[Tuple[int, any]] = []
+    for item in frames:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
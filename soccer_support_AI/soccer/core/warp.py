@@ -1,22 +1,106 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
 
 import numpy as np
 
-from .homography import project_points
+from .homography import HomographySequence, project_points_by_frame
+from .instrumentation import METRICS
 from .types import TrackRecord
 
+ANCHORS = ("foot", "centroid")
 
-def project_track_records(records: Iterable[TrackRecord], H: np.ndarray) -> List[dict]:
+
+@dataclass
+class ProjectionConfig:
+    anchor: str = "foot"  # bbox bottom-centre (where a player stands on the pitch) or centroid
+    pitch_length: float = 105.0
+    pitch_width: float = 68.0
+    margin: float = 5.0  # metres beyond the touch/goal lines still accepted as on the pitch
+    min_scale: float = 1e-3  # signed homogeneous w at or below this is at/behind the horizon
+    image_size: Tuple[int, int] = (1280, 720)  # (width, height); its bottom-centre pixel is on the pitch
+
+
+def ground_reference(image_size: Tuple[int, int]) -> Tuple[float, float]:
+    """Bottom-centre pixel of the frame, which a broadcast view always shows on the pitch."""
+    w, h = image_size
+    return w / 2.0, h - 1.0
+
+
+def anchor_points(bbox: np.ndarray, anchor: str = "foot") -> np.ndarray:
+    """``(N, 2)`` image points of ``(N, 4)`` bboxes: bottom-centre for ``foot``, else the centroid."""
+    if anchor not in ANCHORS:
+        raise ValueError(f"Unknown anchor '{anchor}'; expected one of {ANCHORS}")
+    bbox = np.asarray(bbox, dtype=np.float64).reshape(-1, 4)
+    y = bbox[:, 3] if anchor == "foot" else (bbox[:, 1] + bbox[:, 3]) / 2.0
+    return np.column_stack([(bbox[:, 0] + bbox[:, 2]) / 2.0, y])
+
+
+def valid_projections(
+    pitch: np.ndarray, scale: np.ndarray, config: ProjectionConfig | None = None
+) -> np.ndarray:
+    """Mask of projections in front of the horizon and within ``margin`` of the pitch.
+
+    ``scale`` is the signed ``w`` from :func:`project_points_by_frame` with a
+    ground ``reference``, so the horizon may lie anywhere in the frame.
+    """
+    cfg = config or ProjectionConfig()
+    x, y = pitch[:, 0], pitch[:, 1]
+    return (
+        (scale > cfg.min_scale)
+        & (x >= -cfg.margin)
+        & (x <= cfg.pitch_length + cfg.margin)
+        & (y >= -cfg.margin)
+        & (y <= cfg.pitch_width + cfg.margin)
+    )
+
+
+@METRICS.timed("projection")
+def project_track_arrays(
+    frame_index: np.ndarray,
+    bbox: np.ndarray,
+    H: np.ndarray | HomographySequence,
+    config: ProjectionConfig | None = None,
+    return_valid: bool = False,
+) -> np.ndarray | Tuple[np.ndarray, np.ndarray]:
+    """Project ``(N, 4)`` bboxes to ``(N, 2)`` pitch coordinates in one pass.
+
+    ``H`` is either a single 3x3 matrix or a :class:`HomographySequence`, in
+    which case each row uses the homography of its own frame. With
+    ``return_valid`` a mask from :func:`valid_projections` is returned too.
+    """
+    cfg = config or ProjectionConfig()
+    if not isinstance(H, HomographySequence):
+        H = HomographySequence.static(H)
+    pitch, scale = project_points_by_frame(
+        H,
+        frame_index,
+        anchor_points(bbox, cfg.anchor),
+        return_scale=True,
+        reference=ground_reference(cfg.image_size),
+    )
+    if return_valid:
+        return pitch, valid_projections(pitch, scale, cfg)
+    return pitch
+
+
+def project_track_records(
+    records: Iterable[TrackRecord], H: np.ndarray | HomographySequence, config: ProjectionConfig | None = None
+) -> List[dict]:
     records = list(records)
     if not records:
         return []
-    centroids = [rec.centroid for rec in records]
-    projected = project_points(H, centroids)
+    projected, valid = project_track_arrays(
+        np.array([rec.frame_index for rec in records]),
+        np.array([rec.bbox for rec in records]),
+        H,
+        config,
+        return_valid=True,
+    )
     payload = []
-    for rec, (px, py) in zip(records, projected):
+    for rec, (px, py), ok in zip(records, projected.tolist(), valid.tolist()):
         data = rec.to_dict()
-        data.update({"pitch": [float(px), float(py)]})
+        data.update({"pitch": [px, py], "valid": ok})
         payload.append(data)
     return payload
@@ -0,0 +1,127 @@
+"""Learn an expected threat (xT) grid from action tables.
+
+Actions from ``extract_events.py`` are mirrored into their team's attacking
+direction and binned on an ``nx`` x ``ny`` grid. Per cell the counts give
+the shot probability ``s``, the goal probability of a shot ``g`` and, as a
+sparse matrix, the probability ``M[c, c']`` that the next action from ``c``
+is a successful move (carry or pass) to ``c'``. xT is the fixed point of
+
+    xT = s * g + M @ xT
+
+found by repeated sparse matrix-vector products. Unsuccessful moves keep
+the row sums of ``M`` below one, so the iteration converges; each step costs
+one pass over the observed transitions, not over all cell pairs.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .events import ACTION_TYPES
+from .instrumentation import METRICS
+
+
+@dataclass
+class XTConfig:
+    nx: int = 16  # cells along the pitch length
+    ny: int = 12  # cells across the width
+    pitch_length: float = 105.0
+    pitch_width: float = 68.0
+    max_iter: int = 1000
+    tol: float = 1e-8  # stop once no cell changes by more than this
+
+
+@dataclass
+class XTCounts:
+    """Per-cell action counts; cells are numbered ``y_bin * nx + x_bin``."""
+
+    moves: np.ndarray  # (cells,) carries and passes started in the cell
+    shots: np.ndarray  # (cells,)
+    goals: np.ndarray  # (cells,) shots from the cell that were scored
+    transitions: sparse.csr_matrix  # (cells, cells) successful moves by start and end cell
+
+
+@dataclass
+class XTResult:
+    grid: np.ndarray  # (ny, nx), indexed like ExpectedThreatTable.grid
+    iterations: int
+    residual: float  # largest change in the last iteration
+
+
+def action_cells(actions: pd.DataFrame, config: XTConfig | None = None):
+    """``(start_cell, end_cell)`` of every action in its team's attacking direction."""
+    cfg = config or XTConfig()
+    mirror = actions["direction"].to_numpy() < 0
+
+    def cell(x_name: str, y_name: str) -> np.ndarray:
+        x = actions[x_name].to_numpy(dtype=np.float64)
+        y = actions[y_name].to_numpy(dtype=np.float64)
+        x = np.where(mirror, cfg.pitch_length - x, x)
+        y = np.where(mirror, cfg.pitch_width - y, y)
+        # Same binning as ExpectedThreatTable.values_at
+        x_bin = (np.clip(x / cfg.pitch_length, 0.0, 0.999) * cfg.nx).astype(np.intp)
+        y_bin = (np.clip(y / cfg.pitch_width, 0.0, 0.999) * cfg.ny).astype(np.intp)
+        return y_bin * cfg.nx + x_bin
+
+    return cell("start_x", "start_y"), cell("end_x", "end_y")
+
+
+def xt_counts(actions: pd.DataFrame, config: XTConfig | None = None) -> XTCounts:
+    """Move, shot, goal and transition counts of an action table (:data:`ACTION_COLUMNS`)."""
+    cfg = config or XTConfig()
+    cells = cfg.nx * cfg.ny
+    start, end = action_cells(actions, cfg)
+    kind = pd.Categorical(actions["type"], categories=ACTION_TYPES).codes
+    shot = kind == ACTION_TYPES.index("shot")
+    move = (kind == ACTION_TYPES.index("carry")) | (kind == ACTION_TYPES.index("pass"))
+    success = move & (actions["result"].to_numpy() == 1)
+    scored = shot & (actions["goal"].to_numpy() == 1)
+    transitions = sparse.coo_matrix(
+        (np.ones(int(success.sum())), (start[success], end[success])), shape=(cells, cells)
+    ).tocsr()  # duplicate (start, end) pairs are summed
+    return XTCounts(
+        moves=np.bincount(start[move], minlength=cells).astype(np.float64),
+        shots=np.bincount(start[shot], minlength=cells).astype(np.float64),
+        goals=np.bincount(start[scored], minlength=cells).astype(np.float64),
+        transitions=transitions,
+    )
+
+
+@METRICS.timed("xt_fit")
+def solve_xt(counts: XTCounts, config: XTConfig | None = None) -> XTResult:
+    """Iterate ``xT = s * g + M @ xT`` from zero until it stops changing."""
+    cfg = config or XTConfig()
+    total = counts.moves + counts.shots
+    scale = 1.0 / np.maximum(total, 1.0)
+    # s * g simplifies to goals / all actions started in the cell.
+    reward = counts.goals * scale
+    M = sparse.diags(scale) @ counts.transitions
+    xt = np.zeros_like(reward)
+    residual = 0.0
+    iterations = 0
+    for iterations in range(1, cfg.max_iter + 1):
+        updated = reward + M @ xt
+        residual = float(np.abs(updated - xt).max()) if len(xt) else 0.0
+        xt = updated
+        if residual <= cfg.tol:
+            break
+    return XTResult(xt.reshape(cfg.ny, cfg.nx), iterations, residual)
+
+
+def fit_xt(actions: pd.DataFrame, config: XTConfig | None = None) -> XTResult:
+    """Learn an xT grid from one or many concatenated action tables."""
+    cfg = config or XTConfig()
+    return solve_xt(xt_counts(actions, cfg), cfg)
+
+
+def save_xt_table(grid: np.ndarray, path: str | Path) -> None:
+    """Write ``grid`` as the ``x_bin,y_bin,value`` CSV read by :class:`ExpectedThreatTable`."""
+    ny, nx = grid.shape
+    y_bin, x_bin = np.divmod(np.arange(nx * ny), nx)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"x_bin": x_bin, "y_bin": y_bin, "value": grid.ravel()}).to_csv(path, index=False)
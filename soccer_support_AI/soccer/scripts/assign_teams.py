@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Label every track with a team and a role (player, goalkeeper, referee) from kit colours.
+
+Only a few crops per track are looked at: the frames holding them are
+decoded and every other frame is skipped without being retrieved. The
+output is a copy of the track store with ``team`` and ``role`` columns,
+plus ``teams.csv`` (``track_id,team,role``) for ``extract_events.py --teams``.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from tqdm import tqdm
+
+from soccer.core.metrics import segment_starts
+from soccer.core.teams import (
+    FEATURE_DIM,
+    ROLES,
+    TeamConfig,
+    classify_teams,
+    kit_features,
+    sample_rows,
+    write_team_store,
+)
+from soccer.core.track_store import TrackStoreReader
+from soccer.core.video_io import iter_frames_at, open_video
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = TeamConfig()
+    parser = argparse.ArgumentParser(description="Assign teams and roles to tracks from kit colours")
+    parser.add_argument("--input", required=True, help="Video the tracks were computed on")
+    parser.add_argument(
+        "--tracks",
+        required=True,
+        help="Track store; a projected one (warp_to_pitch.py) also lets goalkeepers be told from referees",
+    )
+    parser.add_argument("--out", required=True, help="Output track store with team and role columns")
+    parser.add_argument(
+        "--samples", type=int, default=defaults.samples_per_track, help="Crops looked at per track"
+    )
+    parser.add_argument(
+        "--clusters", type=int, default=defaults.clusters, help="Kit colour clusters (teams, keepers, refs)"
+    )
+    parser.add_argument(
+        "--goal-distance",
+        type=float,
+        default=defaults.goal_distance,
+        help="Metres from a goal line within which non-team tracks are goalkeepers",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = TeamConfig(
+        samples_per_track=args.samples, clusters=args.clusters, goal_distance=args.goal_distance
+    )
+    reader = TrackStoreReader(args.tracks)
+    track_id = np.asarray(reader.column("track_id"))
+    frame_index = np.asarray(reader.column("frame_index"))
+    bbox = reader.column("bbox")
+    picked = sample_rows(track_id, frame_index, config.samples_per_track)
+    picked = picked[np.argsort(frame_index[picked], kind="stable")]
+    starts = segment_starts(frame_index[picked])
+    stops = np.r_[starts[1:], len(picked)]
+    frames = frame_index[picked][starts]
+
+    features = np.zeros((len(picked), FEATURE_DIM), dtype=np.float32)
+    sampled = np.zeros(len(picked), dtype=bool)
+    start = time.perf_counter()
+    with open_video(args.input) as cap:
+        # Frames come back in order, one per sampled frame, until the video ends.
+        stream = iter_frames_at(cap, frames)
+        for k, (_, frame) in enumerate(tqdm(stream, total=len(frames), desc="teams")):
+            rows = slice(starts[k], stops[k])
+            features[rows] = kit_features(frame, np.asarray(bbox[picked[rows]]), config)
+            sampled[rows] = True
+
+    columns = None
+    if "pitch_x" in reader.columns:
+        keep = np.asarray(reader.column("valid")) != 0 if "valid" in reader.columns else slice(None)
+        columns = {
+            "track_id": track_id[keep],
+            "frame_index": frame_index[keep],
+            "pitch_x": np.asarray(reader.column("pitch_x"))[keep],
+        }
+    labels = classify_teams(track_id[picked][sampled], features[sampled], columns, config)
+    elapsed = time.perf_counter() - start
+
+    metadata = {**reader.metadata, "teams": {"samples": args.samples, "clusters": args.clusters}}
+    write_team_store(reader, args.out, labels, metadata)
+    roles = np.bincount(labels.role, minlength=len(ROLES))
+    print(
+        f"{len(labels.track_id)} tracks from {int(sampled.sum())} crops in {len(frames)} frames "
+        f"({elapsed:.1f}s): " + ", ".join(f"{count} {role}" for role, count in zip(ROLES, roles) if count)
+    )
+    print(f"Track store saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
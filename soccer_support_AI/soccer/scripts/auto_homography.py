@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Estimate a per-frame homography sequence from the pitch markings of a video."""
+from __future__ import annotations
+
+import argparse
+import time
+
+from soccer.core.calibration import STATUSES, CalibrationConfig, calibrate_video
+from soccer.core.homography import load_homography, save_homography_sequence
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = CalibrationConfig()
+    parser = argparse.ArgumentParser(description="Automatic pitch calibration from line markings")
+    parser.add_argument("--input", required=True, help="Path to input video")
+    parser.add_argument(
+        "--out", required=True, help="Homography sequence (.npz or .yaml) for warp_to_pitch.py"
+    )
+    parser.add_argument("--stride", type=int, default=1, help="Calibrate every N-th frame")
+    parser.add_argument("--start", type=int, default=0, help="First frame to calibrate")
+    parser.add_argument("--max-frames", type=int, default=None, help="Stop after this many frames")
+    parser.add_argument(
+        "--seed-H",
+        action="append",
+        default=[],
+        help="Homography YAML (e.g. from run_homography.py) tried as an extra starting pose; repeatable",
+    )
+    parser.add_argument("--work-width", type=int, default=defaults.work_width, help="Calibration image width")
+    parser.add_argument(
+        "--reuse-error",
+        type=float,
+        default=defaults.reuse_error,
+        help="Keep the previous homography while its reprojection error (px) stays below this",
+    )
+    parser.add_argument(
+        "--max-error", type=float, default=defaults.max_error, help="Reject solves above this error (px)"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = CalibrationConfig(
+        work_width=args.work_width, reuse_error=args.reuse_error, max_error=args.max_error
+    )
+    stop = None if args.max_frames is None else args.start + args.max_frames
+    seeds = [load_homography(path) for path in args.seed_H]
+    start = time.perf_counter()
+    calibrator = calibrate_video(
+        args.input, config, stride=args.stride, start=args.start, stop=stop, seeds=seeds
+    )
+    elapsed = time.perf_counter() - start
+    seq = calibrator.to_sequence()
+    save_homography_sequence(seq, args.out)
+    frames = sum(calibrator.counts.values())
+    print(" ".join(f"{status}={calibrator.counts[status]}" for status in STATUSES))
+    print(f"{frames} frames in {elapsed:.1f}s ({frames / elapsed:.1f} calibrations/s)")
+    shots = len(set(seq.shot_ids.tolist()))
+    print(f"{len(seq.frame_indices)} keyframes over {shots} shots saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark automatic calibration with temporal reuse against a per-frame re-solve.
+
+Frames come from :func:`iter_broadcast_frames`, a panning and zooming
+broadcast camera with one hard cut, so the true homography of every frame is
+known. Accuracy is the mean pitch distance (metres) between true and estimated
+projections of a grid over the lower part of the image. The per-frame solve is
+slow, so it only runs on the first ``--resolve-frames`` frames.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from soccer.benchmarks.synthetic import iter_broadcast_frames
+from soccer.core.calibration import STATUSES, AutoCalibrator, CalibrationConfig
+
+
+def pitch_error(estimate: np.ndarray, truth: np.ndarray, image_size: Tuple[int, int]) -> float:
+    """Mean distance (m) between the two projections of on-pitch grid points."""
+    w, h = image_size
+    xs, ys = np.meshgrid(np.linspace(0, w - 1, 20), np.linspace(0.3 * h, h - 1, 10))
+    grid = np.column_stack([xs.ravel(), ys.ravel(), np.ones(xs.size)])
+
+    def project(H: np.ndarray) -> np.ndarray:
+        q = grid @ H.T
+        return q[:, :2] / q[:, 2:3]
+
+    true_xy, est_xy = project(truth), project(estimate)
+    on_pitch = (true_xy[:, 0] >= 0) & (true_xy[:, 0] <= 105) & (true_xy[:, 1] >= 0) & (true_xy[:, 1] <= 68)
+    return float(np.linalg.norm(est_xy[on_pitch] - true_xy[on_pitch], axis=1).mean())
+
+
+def run(frames: List[Tuple[np.ndarray, np.ndarray]], config: CalibrationConfig, reuse: bool) -> dict:
+    height, width = frames[0][0].shape[:2]
+    calibrator = AutoCalibrator((width, height), config)
+    errors, elapsed = [], 0.0
+    for frame_index, (frame, truth) in enumerate(frames):
+        if not reuse:
+            calibrator.reset()
+        start = time.perf_counter()
+        result = calibrator.update(frame_index, frame)
+        elapsed += time.perf_counter() - start
+        if result.H is not None:
+            errors.append(pitch_error(result.H, truth, (width, height)))
+    return {
+        "rate": len(frames) / elapsed,
+        "error_m": float(np.mean(errors)) if errors else float("nan"),
+        "p95_error_m": float(np.percentile(errors, 95)) if errors else float("nan"),
+        "counts": calibrator.counts,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark automatic calibration on synthetic frames")
+    parser.add_argument("--frames", type=int, default=300, help="Synthetic frames (one cut half way)")
+    parser.add_argument("--resolve-frames", type=int, default=20, help="Frames for the per-frame re-solve")
+    parser.add_argument("--width", type=int, default=1280, help="Frame width")
+    parser.add_argument("--height", type=int, default=720, help="Frame height")
+    parser.add_argument(
+        "--work-width", type=int, default=CalibrationConfig.work_width, help="Calibration image width"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    frames = list(iter_broadcast_frames(args.frames, args.width, args.height, seed=args.seed))
+    config = CalibrationConfig(work_width=args.work_width)
+    reuse = run(frames, config, reuse=True)
+    resolve = run(frames[: args.resolve_frames], config, reuse=False)
+    print(f"frames              {args.frames} at {args.width}x{args.height} (work width {args.work_width})")
+    for name, r in (("temporal reuse", reuse), ("per-frame solve", resolve)):
+        counts = " ".join(f"{status}={r['counts'][status]}" for status in STATUSES)
+        print(
+            f"{name:<19} {r['rate']:8.1f} calibrations/s   error {r['error_m']:.3f} m "
+            f"(p95 {r['p95_error_m']:.3f} m)   {counts}"
+        )
+    print(f"speedup             {reuse['rate'] / resolve['rate']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Compare detector backends for speed and agreement on the same clip.
+
+Each ``--backend`` spec is ``backend:model[:int8]``, e.g.
+``ultralytics:yolov8n.pt onnx:yolov8n.onnx onnx:yolov8n.onnx:int8``. The first
+spec is the reference. The others report precision and recall against its
+detections (IoU >= ``--match-iou``), plus startup time and throughput.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from soccer.core.detection import DetectorConfig, make_detector
+from soccer.core.tracking import bbox_iou_matrix, detections_to_arrays
+from soccer.core.types import Detection
+from soccer.core.video_io import iter_batches, iter_frames, open_video
+
+
+def parse_spec(spec: str, args: argparse.Namespace) -> DetectorConfig:
+    parts = spec.split(":")
+    if len(parts) < 2 or len(parts) > 3 or (len(parts) == 3 and parts[2] != "int8"):
+        raise SystemExit(f"Backend spec must be backend:model[:int8], got {spec!r}")
+    return DetectorConfig(
+        model_name=parts[1],
+        backend=parts[0],
+        int8=len(parts) == 3,
+        conf=args.confidence,
+        device=args.device,
+        threads=args.threads,
+    )
+
+
+def load_frames(path: str, count: int) -> List[np.ndarray]:
+    with open_video(path) as cap:
+        return [frame.copy() for _, frame in iter_frames(cap, stop=count)]
+
+
+def run_backend(
+    config: DetectorConfig, frames: List[np.ndarray], batch_size: int, warmup: int
+) -> Dict[str, object]:
+    start = time.perf_counter()
+    detector = make_detector(config)
+    startup = time.perf_counter() - start
+    for _ in range(warmup):
+        detector.detect_batch(frames[:batch_size])
+    detections: List[List[Detection]] = []
+    elapsed = []
+    per_frame = []
+    for batch in iter_batches(frames, batch_size):
+        begin = time.perf_counter()
+        detections.extend(detector.detect_batch(batch))
+        elapsed.append(time.perf_counter() - begin)
+        per_frame.append(elapsed[-1] / len(batch))
+    return {
+        "startup_s": startup,
+        "fps": len(frames) / sum(elapsed),
+        "p50_ms": float(np.percentile(per_frame, 50) * 1e3),
+        "detections": detections,
+    }
+
+
+def agreement(
+    reference: List[List[Detection]], candidate: List[List[Detection]], match_iou: float
+) -> Dict[str, float]:
+    """Precision/recall of ``candidate`` against ``reference`` and the mean IoU of matches."""
+    matched = ref_total = cand_total = 0
+    ious: List[float] = []
+    for ref_dets, cand_dets in zip(reference, candidate):
+        ref_boxes, _ = detections_to_arrays(ref_dets)
+        cand_boxes, _ = detections_to_arrays(cand_dets)
+        ref_total += len(ref_boxes)
+        cand_total += len(cand_boxes)
+        if len(ref_boxes) == 0 or len(cand_boxes) == 0:
+            continue
+        iou = bbox_iou_matrix(ref_boxes, cand_boxes)
+        rows, cols = linear_sum_assignment(-iou)
+        good = iou[rows, cols] >= match_iou
+        matched += int(good.sum())
+        ious.extend(iou[rows[good], cols[good]].tolist())
+    return {
+        "precision": matched / max(cand_total, 1),
+        "recall": matched / max(ref_total, 1),
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark detector backends on one clip")
+    parser.add_argument("--input", required=True, help="Video clip")
+    parser.add_argument(
+        "--backend",
+        nargs="+",
+        required=True,
+        help="backend:model[:int8] specs; the first is the accuracy reference",
+    )
+    parser.add_argument("--frames", type=int, default=300, help="Frames to decode from the clip")
+    parser.add_argument("--batch-size", type=int, default=1, help="Frames per detect_batch call")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed warm-up batches per backend")
+    parser.add_argument("--confidence", type=float, default=0.3, help="Detection confidence threshold")
+    parser.add_argument("--device", default=None, help="Device passed to every backend")
+    parser.add_argument("--threads", type=int, default=None, help="Detector intra-op CPU threads")
+    parser.add_argument("--match-iou", type=float, default=0.5, help="IoU for a detection to count as matched")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    configs = [parse_spec(spec, args) for spec in args.backend]
+    frames = load_frames(args.input, args.frames)
+    if not frames:
+        raise SystemExit(f"No frames decoded from {args.input}")
+    print(f"{len(frames)} frames from {args.input}")
+    print(
+        f"{'backend':<36} {'startup s':>9} {'fps':>8} {'p50 ms':>8} "
+        f"{'precision':>9} {'recall':>7} {'mean IoU':>8}"
+    )
+    reference = None
+    for spec, config in zip(args.backend, configs):
+        result = run_backend(config, frames, max(args.batch_size, 1), args.warmup)
+        if reference is None:
+            reference = result["detections"]
+        scores = agreement(reference, result["detections"], args.match_iou)
+        print(
+            f"{spec:<36} {result['startup_s']:>9.2f} {result['fps']:>8.1f} {result['p50_ms']:>8.1f} "
+            f"{scores['precision']:>9.1%} {scores['recall']:>7.1%} {scores['mean_iou']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
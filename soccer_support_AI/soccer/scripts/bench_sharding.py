@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Measure sharded detect+track scaling on one video across worker counts.
+
+Efficiency is ``T(1) / (N * T(N))``; the single-worker run goes through the
+same sharded code path so model start-up cost is counted identically. It is
+always timed, even when ``--workers`` leaves out 1, so every speedup is
+relative to a measured serial run.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import cv2
+
+from soccer.core.detection import DetectorConfig
+from soccer.core.sharding import track_video_sharded
+from soccer.core.tracking import TrackerConfig
+from soccer.core.video_io import open_video
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark sharded tracking scaling")
+    parser.add_argument("--input", required=True, help="Path to input video (mp4)")
+    parser.add_argument("--detector", default="yolov8n.pt", help="Ultralytics YOLO weights")
+    parser.add_argument("--confidence", type=float, default=0.3, help="Detection confidence threshold")
+    parser.add_argument("--device", default="cpu", help="Torch device")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Worker counts (1 is always run as the baseline)",
+    )
+    parser.add_argument("--overlap", type=int, default=60, help="Overlap frames between segments")
+    parser.add_argument("--batch-size", type=int, default=1, help="Frames per detector predict call")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with open_video(args.input) as cap:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    detector_config = DetectorConfig(model_name=args.detector, conf=args.confidence, device=args.device)
+    tracker_config = TrackerConfig()
+
+    baseline = None
+    print(f"{'workers':>7} {'wall s':>9} {'fps':>9} {'speedup':>8} {'efficiency':>10} {'tracks':>7}")
+    # Sorted with 1 first, so the baseline is a real serial run.
+    for workers in sorted(set(args.workers) | {1}):
+        start = time.perf_counter()
+        columns, _ = track_video_sharded(
+            args.input,
+            frame_count,
+            detector_config,
+            tracker_config,
+            workers=workers,
+            overlap=args.overlap,
+            batch_size=args.batch_size,
+        )
+        wall = time.perf_counter() - start
+        if baseline is None:
+            baseline = wall
+        speedup = baseline / wall
+        tracks = len(set(columns["track_id"].tolist()))
+        print(
+            f"{workers:>7} {wall:>9.1f} {frame_count / wall:>9.2f} "
+            f"{speedup:>7.2f}x {speedup / workers:>10.0%} {tracks:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Measure interpreter startup and import time of the soccer package and CLI.
+
+Each case runs in a fresh interpreter ``--repeat`` times and reports the
+median wall time. ``-X importtime`` is then used once per case to list the
+slowest top-level imports.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+
+CASES: Dict[str, List[str]] = {
+    "python": ["-c", "pass"],
+    "import soccer.core": ["-c", "import soccer.core"],
+    "soccer.core eager (all names)": [
+        "-c",
+        "import soccer.core as c; [getattr(c, name) for name in c.__all__]",
+    ],
+    "from soccer.core import project_points": ["-c", "from soccer.core import project_points"],
+    "soccer --help": ["-m", "soccer", "--help"],
+    "soccer compute-xt --help": ["-m", "soccer", "compute-xt", "--help"],
+    "soccer homography --help": ["-m", "soccer", "homography", "--help"],
+    "soccer warp --help": ["-m", "soccer", "warp", "--help"],
+    "soccer detect-track --help": ["-m", "soccer", "detect-track", "--help"],
+}
+
+
+def run_once(args: List[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args], cwd=PACKAGE_ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return time.perf_counter() - start
+
+
+def slowest_imports(args: List[str], top: int) -> List[tuple]:
+    """``(cumulative_ms, module)`` of the slowest top-level imports for one run."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=PACKAGE_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)", line)
+        if match and not match.group(2):
+            rows.append((int(match.group(1)) / 1e3, match.group(3)))
+    return sorted(rows, reverse=True)[:top]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark package import and CLI startup time")
+    parser.add_argument("--repeat", type=int, default=7, help="Fresh interpreters per case")
+    parser.add_argument("--cases", nargs="+", default=None, help="Subset of case names to run")
+    parser.add_argument("--top", type=int, default=0, help="Also list this many slowest imports per case")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    names = args.cases or list(CASES)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise SystemExit(f"Unknown cases: {sorted(unknown)}; choose from {list(CASES)}")
+    print(f"{'case':<42} {'median ms':>10} {'min ms':>8}")
+    for name in names:
+        times = sorted(run_once(CASES[name]) for _ in range(max(args.repeat, 1)))
+        print(f"{name:<42} {times[len(times) // 2] * 1e3:>10.0f} {times[0] * 1e3:>8.0f}")
+        for cumulative, module in slowest_imports(CASES[name], args.top) if args.top else []:
+            print(f"    {cumulative:>8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
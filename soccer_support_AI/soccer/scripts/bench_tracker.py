@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Replay per-frame detections through IOUTracker and a reference implementation.
+
+The reference is the original dict-of-TrackState tracker with a Python double
+loop over IoU pairs; the benchmark checks that both emit identical records and
+reports per-frame latency for each.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from soccer.core.detection_cache import CachedDetections, is_complete_cache
+from soccer.core.tracking import IOUTracker, TrackerConfig, TrackState
+from soccer.core.types import Detection, TrackRecord
+
+
+class ReferenceIOUTracker:
+    """Original pure-Python IoU tracker, kept as a correctness baseline."""
+
+    def __init__(self, config: TrackerConfig):
+        self.config = config
+        self.tracks: Dict[int, TrackState] = {}
+        self.next_id = 1
+
+    @staticmethod
+    def _bbox_iou(box_a, box_b) -> float:
+        ax1, ay1, ax2, ay2 = box_a
+        bx1, by1, bx2, by2 = box_b
+        inter_w = max(0.0, min(ax2, bx2) - max(ax1, bx1))
+        inter_h = max(0.0, min(ay2, by2) - max(ay1, by1))
+        inter_area = inter_w * inter_h
+        if inter_area == 0:
+            return 0.0
+        area_a = (ax2 - ax1) * (ay2 - ay1)
+        area_b = (bx2 - bx1) * (by2 - by1)
+        return inter_area / max(area_a + area_b - inter_area, 1e-6)
+
+    def update(self, detections: Sequence[Detection], frame_index: int) -> List[TrackRecord]:
+        track_items = list(self.tracks.items())
+        matches = []
+        unmatched_tracks = set(range(len(track_items)))
+        unmatched_detections = set(range(len(detections)))
+        if track_items and detections:
+            cost = np.zeros((len(track_items), len(detections)), dtype=float)
+            for i, (_, track) in enumerate(track_items):
+                for j, det in enumerate(detections):
+                    cost[i, j] = 1.0 - self._bbox_iou(track.bbox, det.bbox)
+            for row, col in zip(*linear_sum_assignment(cost)):
+                if 1.0 - cost[row, col] < self.config.iou_threshold:
+                    continue
+                matches.append((track_items[row][0], col))
+                unmatched_tracks.discard(row)
+                unmatched_detections.discard(col)
+
+        records: List[TrackRecord] = []
+        for track_id, det_idx in matches:
+            track = self.tracks[track_id]
+            track.bbox = detections[det_idx].bbox
+            track.score = detections[det_idx].score
+            track.last_frame = frame_index
+            track.hits += 1
+            track.age = 0
+            records.append(track.to_record(frame_index))
+        for idx in unmatched_tracks:
+            track_id, track = track_items[idx]
+            track.age += 1
+            if track.age > self.config.max_age:
+                del self.tracks[track_id]
+        for det_idx in unmatched_detections:
+            detection = detections[det_idx]
+            track_id = self.next_id
+            self.next_id += 1
+            self.tracks[track_id] = TrackState(
+                track_id=track_id,
+                bbox=detection.bbox,
+                score=detection.score,
+                last_frame=frame_index,
+            )
+            records.append(self.tracks[track_id].to_record(frame_index))
+        return [r for r in records if self.tracks[r.track_id].hits >= self.config.min_hits]
+
+
+def synthesize_replay(
+    num_frames: int, num_players: int, seed: int = 0
+) -> List[List[Detection]]:
+    """Random-walk players with jitter, dropped detections and clutter."""
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([0, 200], [1800, 900], size=(num_players, 2))
+    vel = rng.normal(0.0, 3.0, size=(num_players, 2))
+    size = rng.uniform([25, 60], [40, 110], size=(num_players, 2))
+    frames: List[List[Detection]] = []
+    for _ in range(num_frames):
+        vel = 0.9 * vel + rng.normal(0.0, 1.0, size=vel.shape)
+        pos = np.clip(pos + vel, [0, 0], [1880, 1000])
+        visible = rng.random(num_players) > 0.05
+        jitter = rng.normal(0.0, 1.5, size=(num_players, 4))
+        boxes = np.hstack([pos, pos + size]) + jitter
+        detections = [
+            Detection(tuple(map(float, box)), float(rng.uniform(0.3, 1.0)), 0)
+            for box in boxes[visible]
+        ]
+        for _ in range(rng.poisson(1.0)):
+            x, y = rng.uniform([0, 0], [1880, 1000])
+            detections.append(Detection((float(x), float(y), float(x + 30), float(y + 70)), 0.35, 0))
+        rng.shuffle(detections)
+        frames.append(detections)
+    return frames
+
+
+def load_replay(path: str | Path) -> List[List[Detection]]:
+    if is_complete_cache(path):
+        return [detections for _, detections in CachedDetections(path).iter_frames()]
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [
+        [Detection(tuple(d["bbox"]), float(d["score"]), int(d["class_id"])) for d in frame]
+        for frame in data["frames"]
+    ]
+
+
+def save_replay(frames: List[List[Detection]], path: str | Path) -> None:
+    payload = {"frames": [[det.to_dict() for det in frame] for frame in frames]}
+    Path(path).write_text(json.dumps(payload), encoding="utf-8")
+
+
+def run_tracker(tracker, frames: List[List[Detection]]):
+    outputs = []
+    latencies = np.empty(len(frames), dtype=np.float64)
+    for frame_idx, detections in enumerate(frames):
+        start = time.perf_counter()
+        records = tracker.update(detections, frame_idx)
+        latencies[frame_idx] = time.perf_counter() - start
+        outputs.append([(r.track_id, r.frame_index, tuple(r.bbox), r.score) for r in records])
+    return outputs, latencies
+
+
+def _summary(name: str, latencies: np.ndarray) -> str:
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    fps = len(latencies) / latencies.sum()
+    return f"{name:<10} {fps:10.0f} fps   p50 {p50:8.1f} us   p99 {p99:8.1f} us"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark IOUTracker against the reference tracker")
+    parser.add_argument(
+        "--replay", default=None, help="Detection cache directory or JSON of per-frame detections"
+    )
+    parser.add_argument("--record", default=None, help="Save the synthetic replay to this JSON path")
+    parser.add_argument("--frames", type=int, default=5000, help="Synthetic frames to generate")
+    parser.add_argument("--players", type=int, default=25, help="Synthetic players per frame")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic replay seed")
+    parser.add_argument("--iou-threshold", type=float, default=0.3, help="Tracker IoU threshold")
+    parser.add_argument("--max-age", type=int, default=30, help="Frames before a lost track is dropped")
+    parser.add_argument("--min-hits", type=int, default=1, help="Frames required before track is emitted")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.replay:
+        frames = load_replay(args.replay)
+    else:
+        frames = synthesize_replay(args.frames, args.players, seed=args.seed)
+        if args.record:
+            save_replay(frames, args.record)
+    config = TrackerConfig(
+        iou_threshold=args.iou_threshold, max_age=args.max_age, min_hits=args.min_hits
+    )
+
+    ref_out, ref_lat = run_tracker(ReferenceIOUTracker(config), frames)
+    new_out, new_lat = run_tracker(IOUTracker(config), frames)
+
+    print(_summary("reference", ref_lat))
+    print(_summary("IOUTracker", new_lat))
+    print(f"speedup    {ref_lat.sum() / new_lat.sum():.2f}x")
+    mismatched = [i for i, (a, b) in enumerate(zip(ref_out, new_out)) if a != b]
+    if mismatched:
+        raise SystemExit(f"Outputs differ on {len(mismatched)} frames (first: {mismatched[0]})")
+    print(f"Outputs identical on {len(frames)} frames")
+
+
+if __name__ == "__main__":
+    main()
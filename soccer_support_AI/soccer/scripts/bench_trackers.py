@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Compare IOUTracker and ByteTracker on a replay with known identities.
+
+The synthetic replay has fast players, camera pans and partially occluded
+(low-confidence) detections. Every detection carries its ground-truth player
+id, so ID switches can be counted for each tracker along with per-frame
+latency. ``--cache`` replays saved detections from
+``run_detect_track.py --detection-cache`` instead; without ground truth only
+latency and the number of tracks are reported.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from soccer.core.detection_cache import CachedDetections
+from soccer.core.tracking import ByteTracker, ByteTrackerConfig, IOUTracker, TrackerConfig
+from soccer.core.types import Detection
+
+
+def synthesize_replay(
+    num_frames: int, num_players: int, seed: int = 0
+) -> Tuple[List[List[Detection]], List[List[int]]]:
+    """Return per-frame detections and the ground-truth player id of each (-1 for clutter)."""
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([0, 200], [1800, 900], size=(num_players, 2))
+    vel = rng.normal(0.0, 6.0, size=(num_players, 2))
+    size = rng.uniform([25, 60], [40, 110], size=(num_players, 2))
+    pan = np.zeros(2)
+    frames: List[List[Detection]] = []
+    truth: List[List[int]] = []
+    for _ in range(num_frames):
+        if rng.random() < 0.01:
+            pan = rng.normal(0.0, 12.0, size=2)
+        pan *= 0.97
+        vel = 0.95 * vel + rng.normal(0.0, 1.5, size=vel.shape)
+        pos = np.clip(pos + vel + pan, [0, 0], [1880, 1000])
+        boxes = np.hstack([pos, pos + size]) + rng.normal(0.0, 2.0, size=(num_players, 4))
+        scores = rng.uniform(0.55, 0.95, size=num_players)
+        occluded = rng.random(num_players) < 0.15
+        scores[occluded] = rng.uniform(0.12, 0.45, size=occluded.sum())
+        visible = rng.random(num_players) > 0.03
+        detections = []
+        ids = []
+        for pid in np.flatnonzero(visible):
+            detections.append(Detection(tuple(map(float, boxes[pid])), float(scores[pid]), 0))
+            ids.append(int(pid))
+        for _ in range(rng.poisson(1.5)):
+            x, y = rng.uniform([0, 0], [1880, 1000])
+            detections.append(
+                Detection((float(x), float(y), float(x + 30), float(y + 70)), float(rng.uniform(0.1, 0.4)), 0)
+            )
+            ids.append(-1)
+        frames.append(detections)
+        truth.append(ids)
+    return frames, truth
+
+
+def load_replay(path: str, max_frames: int | None = None) -> List[List[Detection]]:
+    """Per-frame detections of a detection cache, read up front so only tracking is timed."""
+    cache = CachedDetections(path)
+    frames = range(len(cache) if max_frames is None else min(max_frames, len(cache)))
+    return [cache.frame(frame_index) for frame_index in frames]
+
+
+def evaluate(
+    tracker,
+    frames: List[List[Detection]],
+    truth: Sequence[List[int]] | None = None,
+    gt_total: int = 0,
+) -> Dict[str, float]:
+    latencies = np.empty(len(frames), dtype=np.float64)
+    last_track: Dict[int, int] = {}
+    switches = 0
+    covered = 0
+    track_ids = set()
+    for frame_idx, detections in enumerate(frames):
+        start = time.perf_counter()
+        records = tracker.update(detections, frame_idx)
+        latencies[frame_idx] = time.perf_counter() - start
+        if truth is None:
+            track_ids.update(rec.track_id for rec in records)
+            continue
+        ids = truth[frame_idx]
+        owner = {det.bbox: pid for det, pid in zip(detections, ids)}
+        for rec in records:
+            track_ids.add(rec.track_id)
+            pid = owner.get(rec.bbox, -1)
+            if pid < 0:
+                continue
+            covered += 1
+            if pid in last_track and last_track[pid] != rec.track_id:
+                switches += 1
+            last_track[pid] = rec.track_id
+    return {
+        "fps": len(frames) / latencies.sum(),
+        "p50_us": float(np.percentile(latencies, 50) * 1e6),
+        "p99_us": float(np.percentile(latencies, 99) * 1e6),
+        "id_switches": switches if truth is not None else None,
+        "tracks": len(track_ids),
+        "coverage": covered / max(gt_total, 1) if truth is not None else None,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark tracker ID stability and latency")
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=None,
+        help="Frames to replay (default: 5000 synthetic, or the whole cache)",
+    )
+    parser.add_argument("--players", type=int, default=25, help="Players per frame")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--cache",
+        default=None,
+        help="Replay this detection cache (made with a low --confidence) instead of synthetic frames",
+    )
+    parser.add_argument(
+        "--iou-confidence",
+        type=float,
+        default=0.3,
+        help="Score filter for IOUTracker's input, as run_detect_track.py's default --confidence",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.cache:
+        frames, truth = load_replay(args.cache, args.frames), None
+        print(f"Replaying {len(frames)} frames from {args.cache}")
+    else:
+        frames, truth = synthesize_replay(args.frames or 5000, args.players, seed=args.seed)
+    # IOUTracker sees only what a conf=0.3 detector would emit, as in run_detect_track.py.
+    kept = [[det.score >= args.iou_confidence for det in dets] for dets in frames]
+    iou_frames = [[det for det, k in zip(dets, keep) if k] for dets, keep in zip(frames, kept)]
+    iou_truth = gt_total = None
+    if truth is not None:
+        iou_truth = [[pid for pid, k in zip(ids, keep) if k] for ids, keep in zip(truth, kept)]
+        gt_total = sum(sum(1 for pid in ids if pid >= 0) for ids in truth)
+    results = {
+        "IOUTracker": evaluate(IOUTracker(TrackerConfig()), iou_frames, iou_truth, gt_total or 0),
+        "ByteTracker": evaluate(ByteTracker(ByteTrackerConfig()), frames, truth, gt_total or 0),
+    }
+    print(f"{'tracker':<12} {'fps':>8} {'p50 us':>8} {'p99 us':>8} {'ID sw':>7} {'tracks':>7} {'coverage':>9}")
+    for name, r in results.items():
+        switches = "-" if r["id_switches"] is None else f"{r['id_switches']:d}"
+        coverage = "-" if r["coverage"] is None else f"{r['coverage']:.1%}"
+        print(
+            f"{name:<12} {r['fps']:>8.0f} {r['p50_us']:>8.1f} {r['p99_us']:>8.1f} "
+            f"{switches:>7} {r['tracks']:>7d} {coverage:>9}"
+        )
+    ratio = results["ByteTracker"]["p50_us"] / max(results["IOUTracker"]["p50_us"], 1e-9)
+    print(f"ByteTracker p50 cost: {ratio:.2f}x IOUTracker's")
+
+
+if __name__ == "__main__":
+    main()
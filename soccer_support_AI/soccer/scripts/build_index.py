@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Build a spatial query index ("who was where, when") from projected tracks.
+
+Open the result with ``soccer.core.spatial_index.SpatialIndex`` for range,
+radius and k-nearest queries.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from soccer.core.spatial_index import IndexConfig, build_spatial_index
+from soccer.core.track_store import BBOX_FIELDS, TrackStoreReader, is_track_store
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = IndexConfig()
+    parser = argparse.ArgumentParser(description="Build a spatial query index over projected tracks")
+    parser.add_argument(
+        "--tracks", required=True, help="Projected track store or CSV (from warp_to_pitch.py)"
+    )
+    parser.add_argument("--out", required=True, help="Output index directory")
+    parser.add_argument(
+        "--cell-size", type=float, default=defaults.cell_size, help="Grid cell size in metres"
+    )
+    parser.add_argument(
+        "--pitch-length", type=float, default=defaults.pitch_length, help="Pitch length in meters"
+    )
+    parser.add_argument(
+        "--pitch-width", type=float, default=defaults.pitch_width, help="Pitch width in meters"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if is_track_store(args.tracks):
+        reader = TrackStoreReader(args.tracks)
+        columns = {name: reader.column(name) for name in reader.columns}
+        layout, metadata = dict(reader.columns), dict(reader.metadata)
+    else:
+        frame = pd.read_csv(args.tracks)
+        columns = {name: frame[name].to_numpy() for name in frame.columns if name not in BBOX_FIELDS}
+        if set(BBOX_FIELDS).issubset(frame.columns):
+            columns["bbox"] = frame[list(BBOX_FIELDS)].to_numpy(dtype=np.float64)
+        layout = {
+            name: ("<f4" if np.issubdtype(values.dtype, np.floating) else "<i4", values.shape[1:])
+            for name, values in columns.items()
+        }
+        metadata = {}
+    missing = {"track_id", "frame_index", "pitch_x", "pitch_y"} - set(columns)
+    if missing:
+        raise ValueError(
+            f"{args.tracks} is missing columns {sorted(missing)}; project it with warp_to_pitch.py"
+        )
+    config = IndexConfig(
+        cell_size=args.cell_size, pitch_length=args.pitch_length, pitch_width=args.pitch_width
+    )
+    start = time.perf_counter()
+    build_spatial_index(columns, args.out, layout, config, metadata)
+    elapsed = time.perf_counter() - start
+    print(f"Indexed {len(columns['track_id']):,} samples in {elapsed:.2f}s")
+    print(f"Spatial index saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Value every action with a trained VAEP model and rate players."""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from soccer.core.events import read_actions
+from soccer.core.vaep import VAEPModel, player_ratings, value_actions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compute VAEP values and player ratings")
+    parser.add_argument("--actions", nargs="+", required=True, help="Action CSVs from extract_events.py")
+    parser.add_argument("--model", required=True, help="Model file from train_vaep.py")
+    parser.add_argument("--out", required=True, help="Output CSV with per-player ratings")
+    parser.add_argument("--values-out", default=None, help="Optional CSV with the value of every action")
+    parser.add_argument(
+        "--players",
+        default=None,
+        help="CSV with game_id,track_id,player_id columns; ratings are then summed per player across games",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    actions = pd.concat([read_actions(path) for path in args.actions], ignore_index=True)
+    model = VAEPModel.load(args.model)
+    start = time.perf_counter()
+    values = value_actions(actions, model)
+    by = ["game_id", "track_id"]
+    if args.players:
+        players = pd.read_csv(args.players)
+        # Game ids are read back from CSV, so compare them as strings.
+        actions["game_id"] = actions["game_id"].astype(str)
+        players["game_id"] = players["game_id"].astype(str)
+        actions = actions.merge(players[["game_id", "track_id", "player_id"]], on=by, how="left")
+        by = ["player_id"]
+    ratings = player_ratings(actions, values, by=by)
+    elapsed = time.perf_counter() - start
+    print(f"{len(actions):,} actions from {actions['game_id'].nunique()} games valued in {elapsed:.1f}s")
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    ratings.to_csv(out_path, index=False)
+    if args.values_out:
+        Path(args.values_out).parent.mkdir(parents=True, exist_ok=True)
+        keys = actions[["game_id", "action_id", "frame_start", "track_id", "team", "type"]]
+        pd.concat([keys, values], axis=1).to_csv(args.values_out, index=False)
+    print(ratings.head(10).to_string(index=False))
+    print(f"Ratings saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,30 +7,51 @@ from pathlib import Path
 import pandas as pd
 
 from soccer.core.metrics import ExpectedThreatTable, compute_xt
+from soccer.core.possession import on_ball_mask
+from soccer.core.track_store import TrackStoreReader, is_track_store
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Compute xT contributions from projected tracks")
-    parser.add_argument("--xy", required=True, help="CSV with projected pitch coordinates")
+    parser.add_argument("--xy", required=True, help="CSV or projected track store with pitch coordinates")
     parser.add_argument("--xt-table", required=True, help="CSV containing x_bin,y_bin,value columns")
     parser.add_argument("--out", required=True, help="Output CSV for per-track xT scores")
     parser.add_argument("--pitch-length", type=float, default=105.0, help="Pitch length in meters")
     parser.add_argument("--pitch-width", type=float, default=68.0, help="Pitch width in meters")
+    parser.add_argument(
+        "--interpolate", action="store_true", help="Bilinearly interpolate xT between grid cells"
+    )
+    parser.add_argument(
+        "--possession",
+        default=None,
+        help="Possession CSV from infer_possession.py; only on-ball movement is credited",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    samples = pd.read_csv(args.xy)
     required_cols = {"track_id", "frame_index", "pitch_x", "pitch_y"}
+    if is_track_store(args.xy):
+        reader = TrackStoreReader(args.xy)
+        samples = reader.to_dataframe([name for name in reader.columns if name in required_cols | {"valid"}])
+    else:
+        samples = pd.read_csv(args.xy)
     if not required_cols.issubset(samples.columns):
         raise ValueError(f"Input CSV missing columns: {required_cols}")
+    if "valid" in samples.columns:
+        # Off-pitch / beyond-horizon projections from warp_to_pitch.py
+        samples = samples[samples["valid"] != 0].reset_index(drop=True)
     xt_table = ExpectedThreatTable(
         csv_path=args.xt_table,
         pitch_length=args.pitch_length,
         pitch_width=args.pitch_width,
     )
-    result = compute_xt(samples, xt_table)
+    on_ball = None
+    if args.possession:
+        possession = pd.read_csv(args.possession)
+        on_ball = on_ball_mask(samples["frame_index"], samples["track_id"], possession)
+    result = compute_xt(samples, xt_table, interpolate=args.interpolate, on_ball=on_ball)
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     result.to_csv(out_path, index=False)
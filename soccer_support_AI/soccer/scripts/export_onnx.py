@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Export ultralytics YOLO weights to ONNX for the onnx detector backend."""
+from __future__ import annotations
+
+import argparse
+import shutil
+from pathlib import Path
+
+from soccer.core.detection import quantize_onnx_model
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export YOLO weights to ONNX (optionally INT8)")
+    parser.add_argument("--weights", default="yolov8n.pt", help="Ultralytics YOLO weights")
+    parser.add_argument("--out", default=None, help="Output .onnx path (default: next to the weights)")
+    parser.add_argument("--imgsz", type=int, default=640, help="Square input size baked into the model")
+    parser.add_argument(
+        "--dynamic", action="store_true", help="Dynamic batch/image axes (needed for --batch-size > 1)"
+    )
+    parser.add_argument("--int8", action="store_true", help="Also write dynamically quantized <out>.int8.onnx")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        from ultralytics import YOLO
+    except ImportError as exc:  # pragma: no cover - import guard
+        raise SystemExit("ultralytics is required to export weights; install requirements.txt") from exc
+
+    exported = Path(
+        YOLO(args.weights).export(format="onnx", imgsz=args.imgsz, dynamic=args.dynamic, simplify=True)
+    )
+    out_path = Path(args.out) if args.out else exported
+    if out_path != exported:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(exported), out_path)
+    print(f"ONNX model saved to {out_path}")
+    if args.int8:
+        print(f"INT8 model saved to {quantize_onnx_model(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
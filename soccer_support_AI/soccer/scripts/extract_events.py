@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Turn a possession table into an on-ball action table for VAEP."""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from soccer.core.events import EventConfig, extract_actions
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = EventConfig()
+    parser = argparse.ArgumentParser(description="Extract carries, passes and shots from possession")
+    parser.add_argument("--possession", required=True, help="Possession CSV from infer_possession.py")
+    parser.add_argument("--out", required=True, help="Output action CSV")
+    parser.add_argument(
+        "--teams", default=None, help="CSV with track_id,team columns (integer team labels)"
+    )
+    parser.add_argument(
+        "--right-team",
+        type=int,
+        default=defaults.right_team,
+        help="Team attacking towards x = pitch length at kick-off; the other team attacks towards x = 0",
+    )
+    parser.add_argument(
+        "--switch-ends",
+        type=int,
+        nargs="+",
+        default=[],
+        metavar="FRAME",
+        help="Frames where the teams change ends (the second half's kick-off, extra time)",
+    )
+    parser.add_argument("--game-id", default=None, help="Game identifier (default: possession file stem)")
+    parser.add_argument(
+        "--min-carry", type=float, default=defaults.min_carry, help="Shortest carry kept (metres)"
+    )
+    parser.add_argument(
+        "--shot-width",
+        type=float,
+        default=defaults.shot_width,
+        help="Balls leaving over the attacked goal line within this width (m) count as shots",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    possession = pd.read_csv(args.possession)
+    teams = None
+    if args.teams:
+        table = pd.read_csv(args.teams)
+        teams = dict(zip(table["track_id"].astype(int), table["team"].astype(int)))
+    config = EventConfig(
+        right_team=args.right_team,
+        switch_frames=tuple(args.switch_ends),
+        min_carry=args.min_carry,
+        shot_width=args.shot_width,
+    )
+    game_id = args.game_id or Path(args.possession).stem
+    actions = extract_actions(possession, teams, config, game_id=game_id)
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    actions.to_csv(out_path, index=False)
+    counts = actions["type"].value_counts()
+    summary = ", ".join(f"{counts[name]} {name}" for name in counts.index)
+    print(f"{len(actions)} actions ({summary}), {int((actions['goal'] != 0).sum())} goals")
+    print(f"Actions saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
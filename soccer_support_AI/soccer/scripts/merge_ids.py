@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Offline identity merge over a finished track store (after run_reid.py)."""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from soccer.core.reid import (
+    ReIDConfig,
+    load_tracklets,
+    merge_identities,
+    remap_ids,
+    save_tracklets,
+    write_identity_store,
+)
+from soccer.core.track_store import TrackStoreReader
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Merge identities that never share a frame and look alike")
+    parser.add_argument("--tracks", required=True, help="Track store written by run_reid.py")
+    parser.add_argument("--out", required=True, help="Output track store with merged identities")
+    parser.add_argument(
+        "--similarity",
+        type=float,
+        default=ReIDConfig.merge_similarity,
+        help="Cosine similarity of identity mean embeddings needed to merge",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    reader = TrackStoreReader(args.tracks)
+    tracklets = load_tracklets(args.tracks)
+    start = time.perf_counter()
+    mapping = merge_identities(tracklets, ReIDConfig(merge_similarity=args.similarity))
+    elapsed = time.perf_counter() - start
+    identities = remap_ids(np.asarray(reader.column("track_id")), mapping)
+    metadata = {**reader.metadata, "merge_similarity": args.similarity}
+    write_identity_store(reader, args.out, identities, metadata)
+    tracklets["identity"] = remap_ids(tracklets["identity"], mapping)
+    save_tracklets(args.out, tracklets)
+    merged = len(set(mapping.values()))
+    print(f"{len(mapping)} identities -> {merged} after merging in {elapsed * 1e3:.0f} ms")
+    print(f"Track store saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Track-only entry point: replay cached detections through the tracker.
+
+Pairs with ``run_detect_track.py --detection-cache`` so tracker parameters can
+be swept without running the detector again.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import cv2
+
+from soccer.core.detection import DetectorConfig
+from soccer.core.detection_cache import CachedDetections, detection_cache_path
+from soccer.core.track_store import TrackStoreWriter
+from soccer.core.tracking import ByteTrackerConfig, TrackerConfig, make_tracker
+from soccer.core.video_io import IngestConfig, open_video, parse_roi
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run tracking on cached detections")
+    parser.add_argument("--cache", default=None, help="Detection cache directory to replay")
+    parser.add_argument(
+        "--input",
+        default=None,
+        help="Video whose cache to look up in --detection-cache (also read for metadata the cache lacks)",
+    )
+    parser.add_argument("--detection-cache", default=None, help="Root directory of detection caches")
+    parser.add_argument("--detector", default="yolov8n.pt", help="Detector weights used for the cache")
+    parser.add_argument("--confidence", type=float, default=0.3, help="Detection confidence used for the cache")
+    parser.add_argument(
+        "--backend", choices=["ultralytics", "onnx"], default="ultralytics", help="Backend used for the cache"
+    )
+    parser.add_argument("--int8", action="store_true", help="The cache was made with INT8 onnx weights")
+    parser.add_argument("--input-size", type=int, default=640, help="Detector input resolution of the cache")
+    parser.add_argument("--nms-iou", type=float, default=0.7, help="Detector NMS IoU threshold of the cache")
+    parser.add_argument("--roi", type=parse_roi, default=None, help="Pitch crop x1,y1,x2,y2 of the cache")
+    parser.add_argument("--roi-mask", default=None, help="ROI mask image the cache was made with")
+    parser.add_argument("--target-width", type=int, default=None, help="Downscale width of the cache")
+    parser.add_argument(
+        "--out",
+        required=True,
+        help="Output track store directory (a path ending in .json writes the legacy JSON format)",
+    )
+    parser.add_argument("--tracker", choices=["iou", "bytetrack"], default="iou", help="Tracker type")
+    parser.add_argument("--iou-threshold", type=float, default=None, help="Tracker IoU threshold")
+    parser.add_argument("--max-age", type=int, default=30, help="Frames before a lost track is dropped")
+    parser.add_argument("--min-hits", type=int, default=1, help="Frames required before track is emitted")
+    return parser.parse_args()
+
+
+def read_video_metadata(path: str) -> dict:
+    with open_video(path) as cap:
+        return {
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+            "frame_width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "frame_height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        }
+
+
+def cached_video_metadata(detections: CachedDetections, video_path: str | None) -> dict:
+    """Video metadata stored with the cache, else read from ``video_path``."""
+    metadata = detections.metadata.get("video")
+    if isinstance(metadata, dict):
+        return metadata
+    # Older caches only recorded the video path under "video".
+    path = video_path or metadata
+    if not path or not Path(path).exists():
+        raise SystemExit("The detection cache does not record the video metadata; pass --input")
+    return read_video_metadata(path)
+
+
+def main() -> None:
+    args = parse_args()
+    if args.cache:
+        cache_path = Path(args.cache)
+    elif args.input and args.detection_cache:
+        # Same settings as run_detect_track.py, so the lookup finds the cache it wrote.
+        detector_config = DetectorConfig(
+            model_name=args.detector,
+            conf=args.confidence,
+            backend=args.backend,
+            int8=args.int8,
+            input_size=args.input_size,
+            iou=args.nms_iou,
+        )
+        ingest_config = IngestConfig(roi=args.roi, target_width=args.target_width, mask_path=args.roi_mask)
+        cache_path = detection_cache_path(args.detection_cache, args.input, detector_config, ingest_config)
+        if not cache_path.exists():
+            raise SystemExit(
+                f"No detection cache for these settings at {cache_path}; pass the detector and ingest "
+                "flags used with run_detect_track.py, or --cache"
+            )
+    else:
+        raise SystemExit("Pass --cache, or --input together with --detection-cache")
+    detections = CachedDetections(cache_path)
+
+    config_cls = ByteTrackerConfig if args.tracker == "bytetrack" else TrackerConfig
+    tracker_config = config_cls(max_age=args.max_age, min_hits=args.min_hits)
+    if args.iou_threshold is not None:
+        tracker_config.iou_threshold = args.iou_threshold
+    tracker = make_tracker(tracker_config)
+
+    out_path = Path(args.out)
+    legacy_json = out_path.suffix.lower() == ".json"
+    writer = None
+    if not legacy_json:
+        metadata = {"video": cached_video_metadata(detections, args.input), "detections": str(cache_path)}
+        writer = TrackStoreWriter(out_path, metadata=metadata)
+    records = []
+    start = time.perf_counter()
+    for frame_idx, frame_detections in detections.iter_frames():
+        tracks = tracker.update(frame_detections, frame_idx)
+        if writer is not None:
+            writer.write_records(tracks)
+        else:
+            records.extend(track.to_dict() for track in tracks)
+    elapsed = time.perf_counter() - start
+    fps = len(detections) / elapsed if elapsed > 0 else 0.0
+    print(f"Tracked {len(detections)} cached frames in {elapsed:.2f}s ({fps:.0f} fps)")
+
+    if writer is not None:
+        writer.close()
+        print(f"Track store with {writer.num_rows} records saved to {out_path}")
+        return
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps({"tracks": records}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
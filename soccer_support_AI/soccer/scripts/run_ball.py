@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Detect and track the ball; writes a track store that warp_to_pitch.py can project."""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import time
+from pathlib import Path
+
+import cv2
+from tqdm import tqdm
+
+from soccer.core.detection import DetectorConfig, TiledDetector, make_detector
+from soccer.core.track_store import TrackStoreWriter
+from soccer.core.tracking import BallTracker, BallTrackerConfig
+from soccer.core.video_io import (
+    IngestConfig,
+    iter_batches,
+    iter_frames_prefetch,
+    make_ingest,
+    open_video,
+    parse_roi,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ball detection and tracking on a broadcast video")
+    parser.add_argument("--input", required=True, help="Path to input video")
+    parser.add_argument("--out", required=True, help="Output track store directory")
+    parser.add_argument(
+        "--detector", default="yolov8n.pt", help="Detector weights (.pt, or .onnx with --backend onnx)"
+    )
+    parser.add_argument("--ball-class", default="sports ball", help="Detector class name of the ball")
+    parser.add_argument("--confidence", type=float, default=0.05, help="Detection confidence threshold")
+    parser.add_argument("--device", default=None, help="Device (cpu, cuda, cuda:0; openvino for onnx)")
+    parser.add_argument(
+        "--backend", choices=["ultralytics", "onnx"], default="ultralytics", help="Detector runtime"
+    )
+    parser.add_argument("--threads", type=int, default=None, help="Detector intra-op CPU threads")
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=640,
+        help="Detect on overlapping tiles of this size at native resolution (0 detects whole frames)",
+    )
+    parser.add_argument(
+        "--tile-overlap", type=float, default=0.2, help="Fraction of a tile shared with its neighbour"
+    )
+    parser.add_argument(
+        "--max-age", type=int, default=75, help="Frames the ball may stay hidden before it is lost"
+    )
+    parser.add_argument("--batch-size", type=int, default=1, help="Frames per detector call")
+    parser.add_argument("--prefetch", type=int, default=0, help="Frames decoded ahead on a background thread")
+    parser.add_argument("--roi", type=parse_roi, default=None, help="Pitch crop x1,y1,x2,y2 in source pixels")
+    return parser.parse_args()
+
+
+def read_video_metadata(path: str) -> dict:
+    with open_video(path) as cap:
+        return {
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+            "frame_width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "frame_height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        }
+
+
+def main() -> None:
+    args = parse_args()
+    detector_config = DetectorConfig(
+        model_name=args.detector,
+        conf=args.confidence,
+        device=args.device,
+        target_class=args.ball_class,
+        backend=args.backend,
+        threads=args.threads,
+    )
+    detector = make_detector(detector_config)
+    if args.tile_size > 0:
+        detector = TiledDetector(detector, tile_size=args.tile_size, overlap=args.tile_overlap)
+    tracker = BallTracker(BallTrackerConfig(min_score=args.confidence, max_age=args.max_age))
+    metadata = read_video_metadata(args.input)
+    out_path = Path(args.out)
+    writer = TrackStoreWriter(out_path, metadata={"video": metadata, "object": "ball"})
+
+    processed = 0
+    start = time.perf_counter()
+    progress = tqdm(total=metadata["frame_count"], desc="ball")
+    with open_video(args.input) as cap:
+        pool_size = max(args.prefetch, 0) + max(args.batch_size, 1) + 2
+        ingest = make_ingest(cap, IngestConfig(roi=args.roi), pool_size=pool_size)
+        frames_iter = iter_frames_prefetch(cap, prefetch=args.prefetch, ingest=ingest)
+        with contextlib.closing(frames_iter) as frames:
+            for batch in iter_batches(frames, max(args.batch_size, 1)):
+                batch_detections = detector.detect_batch([frame for _, frame in batch])
+                for (frame_idx, _), detections in zip(batch, batch_detections):
+                    detections = ingest.map_detections(detections)
+                    record = tracker.update(detections, frame_idx)
+                    if record is not None:
+                        writer.write_records([record])
+                    processed += 1
+                progress.update(len(batch))
+    progress.close()
+    writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"Processed {processed} frames in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.2f} fps)")
+    seen = writer.num_rows / max(processed, 1)
+    print(f"Ball seen in {writer.num_rows} frames ({seen:.0%}); track store saved to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
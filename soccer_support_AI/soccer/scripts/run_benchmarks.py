@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from soccer.benchmarks import PRESETS, compare_results, load_results, run_all, save_results
+from soccer.benchmarks.stages import STAGES, config_dict, with_overrides
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic data")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="default", help="Input scale")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=None, help="Stages to run")
+    parser.add_argument("--track-frames", type=int, default=None, help="Override tracker replay length")
+    parser.add_argument("--rows", type=int, default=None, help="Override projected sample count")
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Overwrite --baseline with these results"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.15, help="Allowed relative slowdown before failing"
+    )
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak-memory pass")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = with_overrides(PRESETS[args.preset], track_frames=args.track_frames, rows=args.rows)
+    results = run_all(config, stages=args.stages, measure_memory=not args.no_memory)
+    if args.out:
+        save_results(results, args.out, config=config_dict(config))
+        print(f"Benchmark results saved to {args.out}")
+    if not args.baseline:
+        return
+    if args.update_baseline or not Path(args.baseline).exists():
+        save_results(results, args.baseline, config=config_dict(config))
+        print(f"Baseline saved to {args.baseline}")
+        return
+    regressions = compare_results(results, load_results(args.baseline), tolerance=args.tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,63 +2,300 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
+import time
 from pathlib import Path
 
 import cv2
 from tqdm import tqdm
 
-from soccer.core.detection import DetectorConfig, YoloDetector
-from soccer.core.tracking import IOUTracker, TrackerConfig
-from soccer.core.video_io import iter_frames, open_video
+from soccer.core.detection import DetectorConfig, make_detector
+from soccer.core.detection_cache import (
+    CachedDetections,
+    DetectionCacheWriter,
+    detection_cache_path,
+    is_complete_cache,
+    resumable_frames,
+)
+from soccer.core.instrumentation import get_metrics, start_exporters
+from soccer.core.sharding import track_video_sharded
+from soccer.core.track_store import TrackStoreWriter
+from soccer.core.tracking import ByteTrackerConfig, TrackerConfig, make_tracker
+from soccer.core.types import TrackRecord
+from soccer.core.video_io import (
+    IngestConfig,
+    iter_batches,
+    iter_frames_prefetch,
+    make_ingest,
+    open_video,
+    parse_roi,
+)
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run detection + tracking on a broadcast video")
     parser.add_argument("--input", required=True, help="Path to input video (mp4)")
-    parser.add_argument("--out", required=True, help="Output JSON for track data")
+    parser.add_argument(
+        "--out",
+        required=True,
+        help="Output track store directory (a path ending in .json writes the legacy JSON format)",
+    )
     parser.add_argument("--detector", default="yolov8n.pt", help="Ultralytics YOLO weights")
     parser.add_argument("--confidence", type=float, default=0.3, help="Detection confidence threshold")
-    parser.add_argument("--device", default=None, help="Torch device (cpu, cuda, cuda:0, etc.)")
-    parser.add_argument("--iou-threshold", type=float, default=0.3, help="Tracker IoU threshold")
+    parser.add_argument(
+        "--device", default=None, help="Device (cpu, cuda, cuda:0; openvino for the onnx backend)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["ultralytics", "onnx"],
+        default="ultralytics",
+        help="Detector runtime; onnx takes an exported .onnx model via --detector",
+    )
+    parser.add_argument("--int8", action="store_true", help="onnx: use dynamically quantized INT8 weights")
+    parser.add_argument("--input-size", type=int, default=640, help="Square detector input resolution")
+    parser.add_argument("--nms-iou", type=float, default=0.7, help="Detector NMS IoU threshold")
+    parser.add_argument("--threads", type=int, default=None, help="Detector intra-op CPU threads")
+    parser.add_argument(
+        "--tracker",
+        choices=["iou", "bytetrack"],
+        default="iou",
+        help="IoU tracker, or Kalman + two-stage ByteTrack association (pair with a low --confidence)",
+    )
+    parser.add_argument("--iou-threshold", type=float, default=None, help="Tracker IoU threshold")
     parser.add_argument("--max-age", type=int, default=30, help="Frames before a lost track is dropped")
     parser.add_argument("--min-hits", type=int, default=1, help="Frames required before track is emitted")
+    parser.add_argument("--batch-size", type=int, default=1, help="Frames per detector predict call")
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        help="Frames decoded ahead on a background thread (0 decodes inline)",
+    )
+    parser.add_argument(
+        "--roi",
+        type=parse_roi,
+        default=None,
+        help="Pitch crop x1,y1,x2,y2 in source pixels; stands and scoreboard outside it are skipped",
+    )
+    parser.add_argument(
+        "--roi-mask", default=None, help="Source-resolution mask image; black pixels are blanked"
+    )
+    parser.add_argument(
+        "--target-width",
+        type=int,
+        default=None,
+        help="Downscale (cropped) frames to this width before detection",
+    )
+    parser.add_argument("--hw-decode", action="store_true", help="Request hardware video decoding")
+    parser.add_argument(
+        "--detection-cache",
+        default=None,
+        help="Directory of cached detections keyed by video and detector settings; "
+        "reused when present, written on serial runs otherwise",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes, each tracking its own time segment (1 runs serially)",
+    )
+    parser.add_argument(
+        "--overlap",
+        type=int,
+        default=None,
+        help="Frames shared by neighbouring segments for ID stitching (default: 2 x max-age)",
+    )
+    parser.add_argument(
+        "--metrics-jsonl", default=None, help="Append per-stage metrics snapshots to this JSON-lines file"
+    )
+    parser.add_argument(
+        "--metrics-interval", type=float, default=10.0, help="Seconds between JSON-lines snapshots"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus-text metrics on http://127.0.0.1:PORT/metrics",
+    )
     return parser.parse_args()
 
 
-def main() -> None:
-    args = parse_args()
-    detector = YoloDetector(
-        DetectorConfig(
-            model_name=args.detector,
-            conf=args.confidence,
-            device=args.device,
+def read_video_metadata(path: str) -> dict:
+    with open_video(path) as cap:
+        return {
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+            "frame_width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "frame_height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        }
+
+
+def run_sharded(args, detector_config, tracker_config, ingest_config, metadata, writer, records) -> int:
+    overlap = args.overlap if args.overlap is not None else 2 * tracker_config.max_age
+    start = time.perf_counter()
+    columns, results = track_video_sharded(
+        args.input,
+        metadata["frame_count"],
+        detector_config,
+        tracker_config,
+        workers=args.workers,
+        overlap=overlap,
+        batch_size=args.batch_size,
+        ingest_config=ingest_config,
+    )
+    wall = time.perf_counter() - start
+    if writer is not None:
+        writer.write_columns(**columns)
+    else:
+        for tid, fidx, bbox, score in zip(
+            columns["track_id"].tolist(),
+            columns["frame_index"].tolist(),
+            columns["bbox"].tolist(),
+            columns["score"].tolist(),
+        ):
+            records.append(
+                TrackRecord(track_id=tid, frame_index=fidx, bbox=tuple(bbox), score=score).to_dict()
+            )
+
+    busy = sum(r.elapsed for r in results)
+    decoded = sum(r.frames for r in results)
+    owned = decoded - sum(r.segment.start - r.segment.warm_start for r in results)
+    for i, result in enumerate(results):
+        seg = result.segment
+        stop = seg.stop if seg.stop is not None else "end"
+        print(
+            f"segment {i}: frames {seg.start}-{stop} "
+            f"({result.frames} decoded, {result.frames / max(result.elapsed, 1e-9):.2f} fps)"
         )
+    print(
+        f"{len(results)} workers: wall {wall:.1f}s, busy {busy:.1f}s, "
+        f"parallel efficiency {busy / max(len(results) * wall, 1e-9):.0%}, "
+        f"overlap overhead {1 - owned / max(decoded, 1):.1%}"
     )
-    tracker = IOUTracker(
-        TrackerConfig(
-            iou_threshold=args.iou_threshold,
-            max_age=args.max_age,
-            min_hits=args.min_hits,
+    return owned
+
+
+def iter_detections(args, detector_config, ingest_config, metadata, cache_path, cache_hit):
+    """Yield ``(frame_index, detections)`` from the cache or by running the detector."""
+    if cache_hit:
+        print(f"Replaying cached detections from {cache_path}")
+        yield from CachedDetections(cache_path).iter_frames()
+        return
+    cache = None
+    start = 0
+    if cache_path is not None:
+        start = resumable_frames(cache_path)
+        if start:
+            # An interrupted run flushed these frames; replay them and detect only the rest.
+            print(f"Resuming detection cache {cache_path} at frame {start}")
+            yield from CachedDetections(cache_path, allow_partial=True).iter_frames()
+        # The video metadata travels with the cache, so a replay writes a complete track store.
+        cache = DetectionCacheWriter(
+            cache_path,
+            metadata={"video": metadata, "video_path": args.input, "model": args.detector},
+            resume=start > 0,
         )
+    detector = make_detector(detector_config)
+    batch_size = max(args.batch_size, 1)
+    with open_video(args.input, hw_accel=ingest_config.hw_accel) as cap:
+        # Pooled buffers are recycled, so the pool covers the prefetch queue plus one batch.
+        ingest = make_ingest(cap, ingest_config, pool_size=max(args.prefetch, 0) + batch_size + 2)
+        frames_iter = iter_frames_prefetch(cap, start=start, prefetch=args.prefetch, ingest=ingest)
+        with contextlib.closing(frames_iter) as frames:
+            for batch in iter_batches(frames, batch_size):
+                batch_detections = detector.detect_batch([frame for _, frame in batch])
+                for (frame_idx, _), detections in zip(batch, batch_detections):
+                    detections = ingest.map_detections(detections)
+                    if cache is not None:
+                        cache.write_frame(frame_idx, detections)
+                    yield frame_idx, detections
+    if cache is not None:
+        cache.close()
+        print(f"Detections cached at {cache_path}")
+
+
+def start_metrics(args, metadata):
+    """Enable instrumentation when an exporter is requested; returns a cleanup callable."""
+    metrics = get_metrics()
+    metrics.realtime_fps = metadata["fps"] or None
+    if args.metrics_port is not None:
+        print(f"Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+    return start_exporters(metrics, args.metrics_jsonl, args.metrics_interval, args.metrics_port)
+
+
+def main() -> None:
+    args = parse_args()
+    detector_config = DetectorConfig(
+        model_name=args.detector,
+        conf=args.confidence,
+        device=args.device,
+        backend=args.backend,
+        int8=args.int8,
+        threads=args.threads,
+        input_size=args.input_size,
+        iou=args.nms_iou,
+    )
+    config_cls = ByteTrackerConfig if args.tracker == "bytetrack" else TrackerConfig
+    tracker_config = config_cls(max_age=args.max_age, min_hits=args.min_hits)
+    if args.iou_threshold is not None:
+        tracker_config.iou_threshold = args.iou_threshold
+    ingest_config = IngestConfig(
+        roi=args.roi, target_width=args.target_width, mask_path=args.roi_mask, hw_accel=args.hw_decode
     )
 
     out_path = Path(args.out)
+    legacy_json = out_path.suffix.lower() == ".json"
     records = []
-    metadata = {}
+    metadata = read_video_metadata(args.input)
+    writer = None if legacy_json else TrackStoreWriter(out_path, metadata={"video": metadata})
 
-    with open_video(args.input) as cap:
-        metadata = {
-            "fps": cap.get(cv2.CAP_PROP_FPS),
-            "frame_width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-            "frame_height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-            "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
-        }
-        for frame_idx, frame in tqdm(iter_frames(cap), total=metadata["frame_count"], desc="tracking"):
-            detections = detector.detect(frame)
-            tracks = tracker.update(detections, frame_idx)
-            for track in tracks:
-                records.append(track.to_dict())
+    cache_path = None
+    if args.detection_cache:
+        cache_path = detection_cache_path(args.detection_cache, args.input, detector_config, ingest_config)
+    cache_hit = cache_path is not None and is_complete_cache(cache_path)
+    metrics = get_metrics()
+    stop_metrics = start_metrics(args, metadata)
+
+    start = time.perf_counter()
+    if args.workers > 1 and not cache_hit:
+        if cache_path is not None:
+            print("Detection cache is only written by serial runs; skipping it")
+        processed = run_sharded(
+            args, detector_config, tracker_config, ingest_config, metadata, writer, records
+        )
+    else:
+        tracker = make_tracker(tracker_config)
+        processed = 0
+        progress = tqdm(total=metadata["frame_count"], desc="tracking")
+        with contextlib.closing(
+            iter_detections(args, detector_config, ingest_config, metadata, cache_path, cache_hit)
+        ) as stream:
+            for frame_idx, detections in stream:
+                tracks = tracker.update(detections, frame_idx)
+                if writer is not None:
+                    writer.write_records(tracks)
+                else:
+                    records.extend(track.to_dict() for track in tracks)
+                processed += 1
+                metrics.incr("frames_processed")
+                progress.update(1)
+        progress.close()
+    elapsed = time.perf_counter() - start
+    if args.workers > 1 and not cache_hit:
+        metrics.incr("frames_processed", processed)
+    if processed < metadata["frame_count"]:
+        # Frames the container advertises but the decoder never delivered.
+        metrics.incr("frames_dropped", metadata["frame_count"] - processed)
+    stop_metrics()
+
+    fps = processed / elapsed if elapsed > 0 else 0.0
+    print(f"Processed {processed} frames in {elapsed:.1f}s ({fps:.2f} fps)")
+
+    if writer is not None:
+        writer.close()
+        print(f"Track store with {writer.num_rows} records saved to {out_path}")
+        return
 
     payload = {
         "video": metadata,
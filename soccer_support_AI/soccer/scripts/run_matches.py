@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Run the detect/track -> homography -> warp -> xT pipeline over many matches.
+
+Stages whose command line and input contents are unchanged since their last
+successful run are skipped; see :mod:`soccer.core.orchestrator` for the
+manifest format.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from soccer.core.orchestrator import (
+    ResourceLimits,
+    format_summary,
+    load_manifest,
+    run_matches,
+    write_run_report,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Resumable multi-match pipeline runner")
+    parser.add_argument("manifest", help="YAML manifest listing work_dir, defaults and matches")
+    parser.add_argument("--workers", type=int, default=1, help="Matches processed in parallel")
+    parser.add_argument("--cpus-per-worker", type=int, default=None, help="CPU cores pinned to each worker")
+    parser.add_argument("--memory-mb", type=int, default=None, help="Address-space limit per worker (MiB)")
+    parser.add_argument("--matches", nargs="+", default=None, help="Only run these match ids")
+    parser.add_argument("--force", action="store_true", help="Rerun stages even when up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Report stale stages without running them")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    work_dir, matches = load_manifest(args.manifest)
+    if args.matches:
+        unknown = set(args.matches) - {m.match_id for m in matches}
+        if unknown:
+            raise SystemExit(f"Unknown match ids: {sorted(unknown)}")
+        matches = [m for m in matches if m.match_id in args.matches]
+
+    def report(results):
+        line = ", ".join(f"{r.stage}={r.status}" for r in results)
+        print(f"[{results[0].match_id}] {line}", flush=True)
+
+    start = time.perf_counter()
+    results = run_matches(
+        matches,
+        work_dir,
+        workers=args.workers,
+        limits=ResourceLimits(cpus_per_worker=args.cpus_per_worker, memory_mb=args.memory_mb),
+        force=args.force,
+        dry_run=args.dry_run,
+        on_match=report,
+    )
+    wall = time.perf_counter() - start
+    print(format_summary(results, wall))
+    if not args.dry_run:
+        print(f"Run report saved to {write_run_report(results, work_dir, wall, vars(args))}")
+    if any(r.status == "failed" for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
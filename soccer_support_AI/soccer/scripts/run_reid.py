@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Re-link track IDs broken by camera cuts using appearance embeddings.
+
+Reads the video alongside a finished track store, embeds the tracks of each
+frame in one batch and writes a store whose ``track_id`` is the recovered
+identity (the tracker's ID is kept as ``raw_track_id``). A per-track summary
+with mean embeddings is saved in the store for ``merge_ids.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from tqdm import tqdm
+
+from soccer.core.metrics import segment_starts
+from soccer.core.reid import (
+    EMBEDDER_BACKENDS,
+    ReIDConfig,
+    ReIDLinker,
+    make_embedder,
+    save_tracklets,
+    write_identity_store,
+)
+from soccer.core.track_store import TrackStoreReader
+from soccer.core.video_io import iter_frames, open_video
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = ReIDConfig()
+    parser = argparse.ArgumentParser(description="Recover player identities across camera cuts")
+    parser.add_argument("--input", required=True, help="Video the tracks were computed on")
+    parser.add_argument("--tracks", required=True, help="Track store from run_detect_track.py")
+    parser.add_argument("--out", required=True, help="Output track store with identities as track_id")
+    parser.add_argument(
+        "--embedder",
+        choices=sorted(EMBEDDER_BACKENDS),
+        default=defaults.embedder,
+        help="Kit colour histograms, or a Re-ID network given by --model",
+    )
+    parser.add_argument("--model", default=None, help="onnx: Re-ID model (e.g. an OSNet export)")
+    parser.add_argument("--device", default=None, help="onnx: cpu, openvino or cuda")
+    parser.add_argument("--threads", type=int, default=None, help="onnx: intra-op CPU threads")
+    parser.add_argument(
+        "--stride", type=int, default=defaults.stride, help="Embed each track every N frames"
+    )
+    parser.add_argument(
+        "--similarity", type=float, default=defaults.similarity, help="Cosine similarity to re-link"
+    )
+    parser.add_argument(
+        "--max-lost", type=int, default=defaults.max_lost, help="Frames a lost identity stays linkable"
+    )
+    parser.add_argument(
+        "--gallery-size", type=int, default=defaults.gallery_size, help="Embeddings kept per identity"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = ReIDConfig(
+        embedder=args.embedder,
+        model_path=args.model,
+        device=args.device,
+        threads=args.threads,
+        stride=args.stride,
+        similarity=args.similarity,
+        max_lost=args.max_lost,
+        gallery_size=args.gallery_size,
+    )
+    reader = TrackStoreReader(args.tracks)
+    frame_index = np.asarray(reader.column("frame_index"))
+    track_id = np.asarray(reader.column("track_id"))
+    bbox = reader.column("bbox")
+    order = np.argsort(frame_index, kind="stable")
+    starts = segment_starts(frame_index[order])
+    stops = np.r_[starts[1:], len(order)]
+    frames = frame_index[order][starts] if len(order) else np.empty(0, dtype=np.int64)
+    identities = track_id.astype(np.int64)
+
+    embedder = make_embedder(config)
+    linker = ReIDLinker(config)
+    start = time.perf_counter()
+    k = 0
+    with open_video(args.input) as cap:
+        first = int(frames[0]) if len(frames) else 0
+        stop = int(frames[-1]) + 1 if len(frames) else 0
+        for frame_idx, frame in tqdm(iter_frames(cap, first, stop), total=stop - first, desc="re-id"):
+            while k < len(frames) and frames[k] < frame_idx:
+                k += 1
+            if k == len(frames) or frames[k] != frame_idx:
+                continue
+            rows = order[starts[k] : stops[k]]
+            ids = track_id[rows]
+            need = linker.needs_embedding(frame_idx, ids)
+            embedded = embedder.embed(frame, np.asarray(bbox[rows[need]]))
+            embeddings = np.full((len(rows), embedded.shape[1]), np.nan, dtype=np.float32)
+            embeddings[need] = embedded
+            identities[rows] = linker.update(frame_idx, ids, embeddings)
+    elapsed = time.perf_counter() - start
+
+    metadata = {**reader.metadata, "reid": {"embedder": args.embedder, "similarity": args.similarity}}
+    write_identity_store(reader, args.out, identities, metadata)
+    tracklets = linker.tracklets()
+    save_tracklets(args.out, tracklets)
+    print(
+        f"{len(tracklets['track_id'])} tracks -> {len(np.unique(tracklets['identity']))} identities "
+        f"({linker.relinked} re-linked) in {elapsed:.1f}s ({len(frames) / max(elapsed, 1e-9):.1f} fps)"
+    )
+    print(f"Track store saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Smooth projected tracks and add velocities / accelerations (Savitzky-Golay)."""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from soccer.core.smoothing import SmoothingConfig, smooth_tracks
+from soccer.core.track_store import (
+    BBOX_FIELDS,
+    KINEMATIC_COLUMNS,
+    PROJECTED_COLUMNS,
+    ColumnSpec,
+    TrackStoreReader,
+    TrackStoreWriter,
+    is_track_store,
+)
+
+
+def load_tracks(path: str) -> Tuple[Dict[str, np.ndarray], Dict[str, ColumnSpec], dict]:
+    """All columns of a projected track store or CSV, with their store layout and metadata."""
+    if is_track_store(path):
+        reader = TrackStoreReader(path)
+        data = {name: np.asarray(reader.column(name)) for name in reader.columns}
+        layout, metadata = dict(reader.columns), dict(reader.metadata)
+    else:
+        frame = pd.read_csv(path)
+        data = {name: frame[name].to_numpy() for name in frame.columns if name not in BBOX_FIELDS}
+        if set(BBOX_FIELDS).issubset(frame.columns):
+            data["bbox"] = frame[list(BBOX_FIELDS)].to_numpy(dtype=np.float64)
+        layout = {
+            name: ("<f4" if np.issubdtype(values.dtype, np.floating) else "<i4", values.shape[1:])
+            for name, values in data.items()
+        }
+        metadata = {}
+    missing = {"track_id", "frame_index", "pitch_x", "pitch_y"} - set(data)
+    if missing:
+        raise ValueError(f"{path} is missing columns {sorted(missing)}; project it with warp_to_pitch.py")
+    if "valid" in data:
+        # Invalid projections are dropped and become gaps (interpolated when short).
+        keep = data["valid"] != 0
+        data = {name: values[keep] for name, values in data.items()}
+    added = {name: spec for name, spec in KINEMATIC_COLUMNS.items() if name not in PROJECTED_COLUMNS}
+    return data, {**layout, **added}, metadata
+
+
+def save_tracks(
+    path: str, columns: Dict[str, np.ndarray], layout: Dict[str, ColumnSpec], metadata: dict
+) -> None:
+    out_path = Path(path)
+    if out_path.suffix.lower() != ".csv":
+        with TrackStoreWriter(out_path, columns=layout, metadata=metadata) as writer:
+            writer.write_columns(**{name: columns[name] for name in layout})
+        return
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    flat = {}
+    for name, values in columns.items():
+        if name == "bbox":
+            flat.update({field: values[:, i] for i, field in enumerate(BBOX_FIELDS)})
+        else:
+            flat[name] = values
+    pd.DataFrame(flat).to_csv(out_path, index=False)
+
+
+def video_fps(metadata: dict) -> float | None:
+    """Frame rate recorded by run_detect_track.py and carried through warp_to_pitch.py, if any."""
+    video = metadata.get("video")
+    fps = video.get("fps") if isinstance(video, dict) else None
+    return float(fps) if fps and fps > 0 else None
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = SmoothingConfig()
+    parser = argparse.ArgumentParser(description="Smooth projected tracks and estimate velocities")
+    parser.add_argument("--tracks", required=True, help="Projected track store or CSV (from warp_to_pitch.py)")
+    parser.add_argument(
+        "--out",
+        required=True,
+        help="Output CSV path (any other suffix writes a track store directory)",
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=None,
+        help="Frame rate (default: the store's video metadata; required when it has none)",
+    )
+    parser.add_argument(
+        "--window", type=int, default=defaults.window, help="Frames in each local polynomial fit (odd)"
+    )
+    parser.add_argument("--order", type=int, default=defaults.order, help="Polynomial order of the fit")
+    parser.add_argument(
+        "--max-gap", type=int, default=defaults.max_gap, help="Interpolate missing frames up to this gap"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    data, layout, metadata = load_tracks(args.tracks)
+    fps = args.fps or video_fps(metadata)
+    if fps is None:
+        # Velocities scale with the frame rate, so a guessed one silently skews every speed.
+        raise SystemExit(f"{args.tracks} records no video frame rate; pass --fps")
+    config = SmoothingConfig(fps=fps, window=args.window, order=args.order, max_gap=args.max_gap)
+    columns = {name: values for name, values in data.items() if name not in ("track_id", "frame_index")}
+    start = time.perf_counter()
+    smoothed = smooth_tracks(data["track_id"], data["frame_index"], columns, config)
+    elapsed = time.perf_counter() - start
+    save_tracks(args.out, smoothed, layout, metadata)
+    print(
+        f"{len(data['track_id']):,} samples smoothed in {elapsed:.2f}s at {fps:g} fps; "
+        f"{int(smoothed['interpolated'].sum()):,} frames interpolated"
+    )
+    print(f"Smoothed tracks saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
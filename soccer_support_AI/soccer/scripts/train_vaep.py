@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Fit VAEP scoring and conceding probability models on action tables."""
+from __future__ import annotations
+
+import argparse
+import time
+
+import pandas as pd
+
+from soccer.core.events import read_actions
+from soccer.core.vaep import VAEP_MODELS, VAEPConfig, VAEPModel, vaep_labels
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = VAEPConfig()
+    parser = argparse.ArgumentParser(description="Train VAEP probability models")
+    parser.add_argument("--actions", nargs="+", required=True, help="Action CSVs from extract_events.py")
+    parser.add_argument("--out", required=True, help="Output model file (.pkl)")
+    parser.add_argument("--model", choices=VAEP_MODELS, default=defaults.model, help="Probability model")
+    parser.add_argument(
+        "--window", type=int, default=defaults.window, help="Actions in the game state (current included)"
+    )
+    parser.add_argument(
+        "--horizon", type=int, default=defaults.horizon, help="Label goals within this many actions"
+    )
+    parser.add_argument("--l2", type=float, default=defaults.l2, help="Logistic regression ridge penalty")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    actions = pd.concat([read_actions(path) for path in args.actions], ignore_index=True)
+    config = VAEPConfig(window=args.window, horizon=args.horizon, model=args.model, l2=args.l2)
+    start = time.perf_counter()
+    model = VAEPModel(config).fit(actions)
+    elapsed = time.perf_counter() - start
+    labels = vaep_labels(actions, config)
+    print(
+        f"{len(actions):,} actions from {actions['game_id'].nunique()} games in {elapsed:.1f}s; "
+        f"scoring states {labels['scores'].mean():.2%}, conceding states {labels['concedes'].mean():.2%}"
+    )
+    model.save(args.out)
+    print(f"VAEP model saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
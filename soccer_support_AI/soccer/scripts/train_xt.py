@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Learn an expected threat (xT) grid from action tables."""
+from __future__ import annotations
+
+import argparse
+import time
+
+import pandas as pd
+
+from soccer.core.events import read_actions
+from soccer.core.xt_training import XTConfig, fit_xt, save_xt_table
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = XTConfig()
+    parser = argparse.ArgumentParser(description="Learn an xT grid from carries, passes and shots")
+    parser.add_argument("--actions", nargs="+", required=True, help="Action CSVs from extract_events.py")
+    parser.add_argument("--out", required=True, help="Output CSV (x_bin,y_bin,value) for compute_xt.py")
+    parser.add_argument("--nx", type=int, default=defaults.nx, help="Cells along the pitch length")
+    parser.add_argument("--ny", type=int, default=defaults.ny, help="Cells across the pitch width")
+    parser.add_argument(
+        "--pitch-length", type=float, default=defaults.pitch_length, help="Pitch length in meters"
+    )
+    parser.add_argument(
+        "--pitch-width", type=float, default=defaults.pitch_width, help="Pitch width in meters"
+    )
+    parser.add_argument("--tol", type=float, default=defaults.tol, help="Convergence tolerance")
+    parser.add_argument("--max-iter", type=int, default=defaults.max_iter, help="Iteration limit")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    actions = pd.concat([read_actions(path) for path in args.actions], ignore_index=True)
+    config = XTConfig(
+        nx=args.nx,
+        ny=args.ny,
+        pitch_length=args.pitch_length,
+        pitch_width=args.pitch_width,
+        max_iter=args.max_iter,
+        tol=args.tol,
+    )
+    start = time.perf_counter()
+    result = fit_xt(actions, config)
+    elapsed = time.perf_counter() - start
+    status = "converged" if result.residual <= config.tol else f"stopped at residual {result.residual:.2e}"
+    print(
+        f"{len(actions):,} actions from {actions['game_id'].nunique()} games; {args.nx}x{args.ny} grid "
+        f"{status} after {result.iterations} iterations in {elapsed * 1000:.0f} ms; "
+        f"max xT {result.grid.max():.3f}"
+    )
+    save_xt_table(result.grid, args.out)
+    print(f"xT table saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,70 +2,149 @@
 from __future__ import annotations
 
 import argparse
-import csv
 import json
 from pathlib import Path
+from typing import Dict, Iterator, Tuple
 
-from soccer.core.homography import load_homography
-from soccer.core.types import TrackRecord
-from soccer.core.warp import project_track_records
+import numpy as np
+import pandas as pd
+
+from soccer.core.homography import load_homography_sequence
+from soccer.core.track_store import (
+    BBOX_FIELDS,
+    PROJECTED_COLUMNS,
+    TRACK_COLUMNS,
+    TrackStoreReader,
+    TrackStoreWriter,
+    is_track_store,
+)
+from soccer.core.warp import ANCHORS, ProjectionConfig, project_track_arrays
 
 
 def parse_args() -> argparse.Namespace:
+    defaults = ProjectionConfig()
     parser = argparse.ArgumentParser(description="Project image-space tracks onto pitch coordinates")
-    parser.add_argument("--tracks", required=True, help="JSON produced by run_detect_track.py")
-    parser.add_argument("--H", required=True, help="YAML homography file")
-    parser.add_argument("--out", required=True, help="Output CSV path")
+    parser.add_argument("--tracks", required=True, help="Track store or JSON produced by run_detect_track.py")
+    parser.add_argument(
+        "--H",
+        required=True,
+        help="Homography YAML, or a per-frame homography sequence (.yaml/.npz)",
+    )
+    parser.add_argument(
+        "--out",
+        required=True,
+        help="Output CSV path (any other suffix writes a projected track store directory)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="Records projected per chunk")
+    parser.add_argument(
+        "--anchor",
+        choices=ANCHORS,
+        default=defaults.anchor,
+        help="Bbox point projected: bottom-centre (players' feet) or centroid",
+    )
+    parser.add_argument(
+        "--margin",
+        type=float,
+        default=defaults.margin,
+        help="Metres outside the pitch still accepted; other projections get valid=0",
+    )
+    parser.add_argument(
+        "--pitch-length", type=float, default=defaults.pitch_length, help="Pitch length in meters"
+    )
+    parser.add_argument(
+        "--pitch-width", type=float, default=defaults.pitch_width, help="Pitch width in meters"
+    )
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        nargs=2,
+        metavar=("WIDTH", "HEIGHT"),
+        default=None,
+        help="Video frame size, whose bottom-centre pixel marks the ground side of the horizon "
+        f"(default: the tracks' video metadata, else {defaults.image_size[0]} {defaults.image_size[1]})",
+    )
     return parser.parse_args()
 
 
+def track_metadata(path: str) -> dict:
+    """Metadata of a track store, or ``{"video": ...}`` of a JSON track file."""
+    if is_track_store(path):
+        return dict(TrackStoreReader(path).metadata)
+    video = json.loads(Path(path).read_text(encoding="utf-8")).get("video")
+    return {"video": video} if video is not None else {}
+
+
+def video_size(metadata: dict) -> Tuple[int, int] | None:
+    """``(width, height)`` recorded by run_detect_track.py, if any."""
+    video = metadata.get("video")
+    if not isinstance(video, dict) or not video.get("frame_width") or not video.get("frame_height"):
+        return None
+    return int(video["frame_width"]), int(video["frame_height"])
+
+
+def iter_track_columns(path: str, chunk_size: int) -> Iterator[Dict[str, np.ndarray]]:
+    if is_track_store(path):
+        yield from TrackStoreReader(path).iter_chunks(chunk_size, columns=list(TRACK_COLUMNS))
+        return
+    entries = json.loads(Path(path).read_text(encoding="utf-8")).get("tracks", [])
+    yield {
+        "track_id": np.array([e["track_id"] for e in entries], dtype=np.int64),
+        "frame_index": np.array([e["frame_index"] for e in entries], dtype=np.int64),
+        "bbox": np.array([e["bbox"] for e in entries], dtype=np.float64).reshape(-1, 4),
+        "score": np.array([e["score"] for e in entries], dtype=np.float64),
+    }
+
+
 def main() -> None:
     args = parse_args()
-    track_data = json.loads(Path(args.tracks).read_text(encoding="utf-8"))
-    records = [
-        TrackRecord(
-            track_id=int(entry["track_id"]),
-            frame_index=int(entry["frame_index"]),
-            bbox=tuple(entry["bbox"]),
-            score=float(entry["score"]),
-        )
-        for entry in track_data.get("tracks", [])
-    ]
-    H = load_homography(args.H)
-    projected = project_track_records(records, H)
+    H = load_homography_sequence(args.H)
+    metadata = track_metadata(args.tracks)
+    image_size = tuple(args.image_size) if args.image_size else video_size(metadata)
+    config = ProjectionConfig(
+        anchor=args.anchor,
+        pitch_length=args.pitch_length,
+        pitch_width=args.pitch_width,
+        margin=args.margin,
+        image_size=image_size or ProjectionConfig.image_size,
+    )
+    rows = rejected = 0
+
+    def project(chunk: Dict[str, np.ndarray]):
+        nonlocal rows, rejected
+        pitch, valid = project_track_arrays(chunk["frame_index"], chunk["bbox"], H, config, return_valid=True)
+        rows += len(valid)
+        rejected += int(len(valid) - np.count_nonzero(valid))
+        return pitch, valid
 
     out_path = Path(args.out)
+    if out_path.suffix.lower() != ".csv":
+        with TrackStoreWriter(out_path, columns=PROJECTED_COLUMNS, metadata=metadata) as writer:
+            for chunk in iter_track_columns(args.tracks, args.chunk_size):
+                pitch, valid = project(chunk)
+                writer.write_columns(**chunk, pitch_x=pitch[:, 0], pitch_y=pitch[:, 1], valid=valid)
+        print(f"{rejected:,} of {rows:,} projections off the pitch or beyond the horizon (valid=0)")
+        print(f"Projected track store saved to {args.out}")
+        return
+
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    fieldnames = [
-        "track_id",
-        "frame_index",
-        "bbox_x1",
-        "bbox_y1",
-        "bbox_x2",
-        "bbox_y2",
-        "score",
-        "pitch_x",
-        "pitch_y",
-    ]
+    header = True
     with out_path.open("w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for item in projected:
-            x1, y1, x2, y2 = item["bbox"]
-            pitch_x, pitch_y = item["pitch"]
-            writer.writerow(
+        for chunk in iter_track_columns(args.tracks, args.chunk_size):
+            pitch, valid = project(chunk)
+            frame = pd.DataFrame(
                 {
-                    "track_id": item["track_id"],
-                    "frame_index": item["frame_index"],
-                    "bbox_x1": x1,
-                    "bbox_y1": y1,
-                    "bbox_x2": x2,
-                    "bbox_y2": y2,
-                    "score": item["score"],
-                    "pitch_x": pitch_x,
-                    "pitch_y": pitch_y,
+                    "track_id": chunk["track_id"],
+                    "frame_index": chunk["frame_index"],
+                    **{field: chunk["bbox"][:, i] for i, field in enumerate(BBOX_FIELDS)},
+                    "score": chunk["score"],
+                    "pitch_x": pitch[:, 0],
+                    "pitch_y": pitch[:, 1],
+                    "valid": valid.astype(np.uint8),
                 }
             )
+            frame.to_csv(csvfile, header=header, index=False)
+            header = False
+    print(f"{rejected:,} of {rows:,} projections off the pitch or beyond the horizon (valid=0)")
     print(f"Projected coordinates saved to {args.out}")
 
 
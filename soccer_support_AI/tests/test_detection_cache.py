@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from soccer.core.detection_cache import (
+    CachedDetections,
+    DetectionCacheWriter,
+    is_complete_cache,
+    resumable_frames,
+)
+from soccer.core.types import Detection
+
+
+def _frame(index):
+    """Two detections whose boxes encode the frame index."""
+    return [
+        Detection((float(index), 0.0, index + 10.0, 20.0), 0.5, 0),
+        Detection((float(index), 30.0, index + 10.0, 50.0), 0.75, 32),
+    ]
+
+
+def test_interrupted_cache_resumes_after_its_last_flushed_frame(tmp_path):
+    path = tmp_path / "detections"
+    writer = DetectionCacheWriter(path, metadata={"video": {"fps": 25.0}}, chunk_size=4)
+    for index in range(5):
+        writer.write_frame(index, _frame(index))
+    del writer  # interrupted: frame 4 was still buffered
+
+    assert not is_complete_cache(path)
+    assert resumable_frames(path) == 4
+    with pytest.raises(ValueError):
+        CachedDetections(path)
+    assert CachedDetections(path, allow_partial=True).num_frames == 4
+
+    with DetectionCacheWriter(path, metadata={"model": "yolov8n.pt"}, chunk_size=4, resume=True) as writer:
+        assert writer.num_frames == 4
+        for index in range(4, 7):
+            writer.write_frame(index, _frame(index))
+
+    assert is_complete_cache(path) and resumable_frames(path) == 0
+    cache = CachedDetections(path)
+    assert cache.metadata["video"] == {"fps": 25.0} and cache.metadata["model"] == "yolov8n.pt"
+    assert [index for index, _ in cache.iter_frames()] == list(range(7))
+    for index, detections in cache.iter_frames():
+        assert [det.bbox for det in detections] == [det.bbox for det in _frame(index)]
+        np.testing.assert_allclose([det.score for det in detections], [0.5, 0.75])
+        assert [det.class_id for det in detections] == [0, 32]
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from soccer.core.events import EventConfig, extract_actions, team_directions
+from soccer.core.possession import NO_OWNER
+
+
+def _possession(spells):
+    """Possession table from ``(track_id, [(x, y), ...])`` spells, one sample per frame."""
+    rows = [(owner, x, y) for owner, path in spells for x, y in path]
+    owner, x, y = map(np.array, zip(*rows))
+    return pd.DataFrame({"frame_index": np.arange(len(rows)), "track_id": owner, "ball_x": x, "ball_y": y})
+
+
+def _line(start, end, steps):
+    return list(zip(np.linspace(start[0], end[0], steps), np.linspace(start[1], end[1], steps)))
+
+
+def test_team_directions_flip_at_each_switch():
+    team = np.array([0, 1, 0, 1, 0])
+    frames = np.array([10, 10, 100, 100, 300])
+    np.testing.assert_array_equal(team_directions(team, 0), [1, -1, 1, -1, 1])
+    np.testing.assert_array_equal(team_directions(team, 0, frames, (100, 200)), [1, -1, -1, 1, 1])
+
+
+def test_second_half_goal_is_scored_at_the_other_end():
+    # Team 0 attacks x = 105 in the first half and x = 0 after the switch at frame 100.
+    first_half = [(1, _line((60, 34), (90, 34), 10)), (2, _line((90, 34), (95, 30), 90))]
+    second_half = [(1, _line((40, 34), (15, 34), 10)), (NO_OWNER, _line((10, 34), (-1, 34), 6))]
+    possession = _possession(first_half + second_half)
+    teams = {1: 0, 2: 0}
+    config = EventConfig(switch_frames=(100,))
+    actions = extract_actions(possession, teams, config)
+
+    last = actions.iloc[-1]
+    assert last["type"] == "shot" and last["goal"] == 1 and last["direction"] == -1
+    assert (actions.loc[actions["frame_start"] < 100, "direction"] == 1).all()
+
+    # Without the switch the same goal counts as an own goal from a clearance.
+    unswitched = extract_actions(possession, teams, EventConfig()).iloc[-1]
+    assert unswitched["type"] == "pass" and unswitched["goal"] == -1
+
+
+def test_spells_become_carries_and_passes():
+    spells = [
+        (1, _line((40, 34), (50, 34), 11)),  # carry, then a pass to a team-mate
+        (NO_OWNER, _line((51, 34), (54, 34), 4)),
+        (2, _line((55, 34), (55.5, 34), 3)),  # too short to be a carry; loses the ball to the other team
+        (NO_OWNER, _line((57, 34), (59, 34), 3)),
+        (3, _line((60, 34), (70, 34), 6)),  # last spell: its carry counts, nothing follows
+    ]
+    actions = extract_actions(_possession(spells), {1: 0, 2: 0, 3: 1})
+
+    assert list(actions["type"]) == ["carry", "pass", "pass", "carry"]
+    assert list(actions["track_id"]) == [1, 1, 2, 3]
+    assert list(actions["result"]) == [1, 1, 0, 1]
+    assert list(actions["direction"]) == [1, 1, 1, -1]
+    np.testing.assert_array_equal(actions["action_id"], np.arange(4))
+    carry, first_pass = actions.iloc[0], actions.iloc[1]
+    assert (carry["start_x"], carry["end_x"]) == (40, 50)
+    assert (first_pass["frame_start"], first_pass["frame_end"]) == (10, 15)
+    assert (first_pass["start_x"], first_pass["end_x"]) == (50, 55)
+    assert (actions["goal"] == 0).all()
@@ -0,0 +1,98 @@
+import time
+
+import numpy as np
+
+from soccer.core.calibration import camera_homography
+from soccer.core.live import LatestFrameReader, LiveFrame, LivePipeline
+from soccer.core.tracking import make_tracker
+from soccer.core.types import Detection
+from soccer.core.video_io import FrameIngest, IngestConfig
+
+
+class _CountingCapture:
+    """Decodes frames filled with their index, faster than the consumer reads them."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+
+    def read(self, buf=None):
+        if self.index >= self.frames:
+            return False, None
+        buf[...] = self.index % 256
+        self.index += 1
+        time.sleep(0.0002)
+        return True, buf
+
+    def set(self, *args):
+        pass
+
+
+def test_slow_consumer_frames_are_not_overwritten():
+    for target_width in (None, 160):
+        ingest = FrameIngest(IngestConfig(roi=(0, 0, 300, 200), target_width=target_width), (320, 240), 3)
+        processed = corrupted = 0
+        with LatestFrameReader(_CountingCapture(400), ingest=ingest) as reader:
+            while (item := reader.get(timeout=2.0)) is not None:
+                value = item.frame[0, 0, 0]
+                time.sleep(0.003)  # inference; the decoder keeps going
+                corrupted += int(not np.all(item.frame == value))
+                processed += 1
+                reader.release(item)
+        assert reader.dropped > 0
+        assert processed > 0 and corrupted == 0
+
+
+class _FixedDetector:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+    def detect_batch(self, frames):
+        return [[Detection(tuple(box), 0.9, 0) for box in self.boxes] for _ in frames]
+
+
+def test_live_projection_uses_the_source_frame_size():
+    # A camera tilted slightly up: in a 1920x1080 frame the horizon sits at y ~ 817, so the
+    # bottom-centre pixel of a 1280x720 frame would be sky.
+    size = (1920, 1080)
+    H_pitch_to_image = camera_homography(size, 0, -6, 40, position=(52.5, -5.0, 3.0))
+    horizon = H_pitch_to_image @ np.array([0.0, 1.0, 0.0])
+    assert 720 < horizon[1] / horizon[2] < 1080
+    feet = H_pitch_to_image @ np.array([52.5, 10.0, 1.0])
+    feet = feet[:2] / feet[2]
+    boxes = [(feet[0] - 10, feet[1] - 60, feet[0] + 10, feet[1]), (900.0, 0.0, 920.0, 40.0)]
+    pipeline = LivePipeline(_FixedDetector(boxes), make_tracker(), H=np.linalg.inv(H_pitch_to_image))
+    update = pipeline.process(LiveFrame(0, np.zeros((size[1], size[0], 3), np.uint8), time.perf_counter()))
+    assert pipeline.projection.image_size == size
+    by_box = {rec.bbox[1]: i for i, rec in enumerate(update.tracks)}
+    player, sky = by_box[boxes[0][1]], by_box[0.0]
+    assert update.valid[player] and not update.valid[sky]
+    np.testing.assert_allclose(update.pitch[player], [52.5, 10.0], atol=1e-6)
+    tracks = update.to_dict()["tracks"]
+    assert tracks[sky]["pitch"] is None and tracks[player]["pitch"] is not None
+
+
+class _StalledCapture:
+    """Delivers one frame, then stalls like a camera that stopped sending."""
+
+    def __init__(self, stall):
+        self.stall = stall
+        self.sent = False
+
+    def read(self, buf=None):
+        if self.sent:
+            time.sleep(self.stall)
+            return False, None
+        self.sent = True
+        return True, np.zeros((48, 64, 3), np.uint8)
+
+
+def test_run_returns_at_the_deadline_when_the_source_stalls():
+    pipeline = LivePipeline(_FixedDetector([(1.0, 1.0, 10.0, 20.0)]), make_tracker())
+    with LatestFrameReader(_StalledCapture(stall=1.0)) as reader:
+        started = time.perf_counter()
+        report = pipeline.run(reader, duration=0.3)
+        assert time.perf_counter() - started < 0.6
+        assert not reader.finished
+    assert report.processed == 1
+    assert reader.finished
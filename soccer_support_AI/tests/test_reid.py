@@ -0,0 +1,52 @@
+import numpy as np
+
+from soccer.core.reid import ReIDConfig, ReIDLinker, merge_identities, remap_ids
+
+
+def _unit(*values):
+    v = np.array(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+RED, BLUE, GREEN = _unit(1, 0, 0, 0.1), _unit(0, 1, 0, 0.1), _unit(0, 0, 1, 0.1)
+
+
+def test_new_tracks_after_a_cut_relink_to_lost_identities():
+    linker = ReIDLinker(ReIDConfig(stride=1))
+    for frame in range(10):
+        np.testing.assert_array_equal(linker.update(frame, [1, 2], np.stack([RED, BLUE])), [1, 2])
+    # A cut: every track is new. The two lost players come back; a third appearance is new.
+    after = linker.update(10, [3, 4, 5], np.stack([BLUE, RED + 0.01, GREEN]))
+    np.testing.assert_array_equal(after, [2, 1, 5])
+    assert linker.relinked == 2
+    # Tracks keep their identity once given, even when not embedded.
+    np.testing.assert_array_equal(linker.update(11, [3, 4], np.full((2, 4), np.nan)), [2, 1])
+    # Track 1 turning up next to its re-linked successor splits the successor off again.
+    np.testing.assert_array_equal(linker.update(12, [1, 4], np.stack([RED, RED])), [1, 4])
+    tracklets = linker.tracklets()
+    np.testing.assert_array_equal(tracklets["track_id"], [1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(tracklets["first_frame"], [0, 0, 10, 10, 10])
+    np.testing.assert_array_equal(tracklets["last_frame"], [12, 9, 11, 12, 10])
+
+
+def test_identical_kits_are_not_relinked():
+    linker = ReIDLinker()
+    linker.update(0, [1, 2], np.stack([RED, RED]))
+    # Both lost identities match equally well, so the margin test refuses to pick one.
+    np.testing.assert_array_equal(linker.update(1, [3], RED[None]), [3])
+    assert linker.relinked == 0
+
+
+def test_merge_joins_lookalike_identities_that_never_share_a_frame():
+    tracklets = {
+        "identity": np.array([1, 2, 3, 4, 5]),
+        "first_frame": np.array([0, 50, 200, 0, 300]),
+        "last_frame": np.array([100, 150, 300, 400, 310]),
+        "embedding": np.stack([RED, RED, RED, BLUE, np.zeros(4, np.float32)]),
+        "count": np.array([10, 10, 10, 10, 0]),
+    }
+    mapping = merge_identities(tracklets)
+    # 1 and 3 merge; 2 looks the same but overlaps 1 in time, so it may not join their cluster.
+    # 4 looks different, and 5 was never embedded.
+    assert mapping == {1: 1, 2: 2, 3: 1, 4: 4, 5: 5}
+    np.testing.assert_array_equal(remap_ids(np.array([3, 7, 2, 3]), mapping), [1, 7, 2, 1])
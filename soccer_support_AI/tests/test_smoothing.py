@@ -0,0 +1,84 @@
+import sys
+
+import numpy as np
+import pytest
+
+from soccer.core.calibration import camera_homography
+from soccer.core.homography import save_homography
+from soccer.core.smoothing import fill_gaps
+from soccer.core.track_store import TrackStoreReader, TrackStoreWriter
+from soccer.scripts import smooth_tracks, warp_to_pitch
+
+IMAGE_SIZE = (1280, 720)
+
+
+def _run(monkeypatch, module, *argv):
+    monkeypatch.setattr(sys, "argv", [module.__name__, *map(str, argv)])
+    module.main()
+
+
+def _player_store(path, fps, speed, metadata=True):
+    """One player running along the pitch at ``speed`` m/s, as image bboxes of a 1280x720 camera."""
+    H_pitch_to_image = camera_homography(IMAGE_SIZE, 0, 25, 50)
+    frames = np.arange(100)
+    pitch = np.column_stack([40.0 + speed * frames / fps, np.full(len(frames), 30.0)])
+    q = np.column_stack([pitch, np.ones(len(frames))]) @ H_pitch_to_image.T
+    feet = q[:, :2] / q[:, 2:3]
+    bbox = np.column_stack([feet[:, 0] - 10, feet[:, 1] - 60, feet[:, 0] + 10, feet[:, 1]])
+    video = {"fps": fps, "frame_width": IMAGE_SIZE[0], "frame_height": IMAGE_SIZE[1]}
+    with TrackStoreWriter(path, metadata={"video": video} if metadata else None) as writer:
+        writer.write_columns(
+            track_id=np.ones(len(frames)), frame_index=frames, bbox=bbox, score=np.ones(len(frames))
+        )
+    return np.linalg.inv(H_pitch_to_image)
+
+
+def test_projection_then_smoothing_uses_the_video_frame_rate(tmp_path, monkeypatch):
+    H = _player_store(tmp_path / "tracks", fps=50.0, speed=5.0)
+    save_homography(H, tmp_path / "H.yaml")
+    warp = ["--tracks", tmp_path / "tracks", "--H", tmp_path / "H.yaml"]
+    _run(monkeypatch, warp_to_pitch, *warp, "--out", tmp_path / "pitch")
+    assert TrackStoreReader(tmp_path / "pitch").metadata["video"]["fps"] == 50.0
+    _run(monkeypatch, smooth_tracks, "--tracks", tmp_path / "pitch", "--out", tmp_path / "smooth")
+    smoothed = TrackStoreReader(tmp_path / "smooth")
+    assert smoothed.metadata["video"]["fps"] == 50.0
+    np.testing.assert_allclose(smoothed.column("velocity_x"), 5.0, atol=1e-3)
+    np.testing.assert_allclose(smoothed.column("acceleration_x"), 0.0, atol=1e-2)
+
+
+def test_smoothing_without_a_frame_rate_stops(tmp_path, monkeypatch):
+    H = _player_store(tmp_path / "tracks", fps=50.0, speed=5.0, metadata=False)
+    save_homography(H, tmp_path / "H.yaml")
+    warp = ["--tracks", tmp_path / "tracks", "--H", tmp_path / "H.yaml"]
+    _run(monkeypatch, warp_to_pitch, *warp, "--out", tmp_path / "pitch.csv")
+    smooth = ["--tracks", tmp_path / "pitch.csv", "--out", tmp_path / "smooth.csv"]
+    with pytest.raises(SystemExit, match="--fps"):
+        _run(monkeypatch, smooth_tracks, *smooth)
+    _run(monkeypatch, smooth_tracks, *smooth, "--fps", 50)
+    assert (tmp_path / "smooth.csv").is_file()
+
+
+def test_fill_gaps_fills_short_gaps_within_a_track_only():
+    # Track 2: gaps of 3 (filled, = max_gap) and 4 missing frames (split); a duplicate of frame 0.
+    # Track 1 ends at frame 5 and must not be bridged to track 2's rows.
+    track_id = np.array([2, 2, 2, 2, 1, 1, 2])
+    frame_index = np.array([4, 0, 9, 0, 3, 5, 14])
+    x = np.array([4.0, 0.0, 9.0, -1.0, 30.0, 50.0, 14.0])
+    bbox = np.column_stack([x, x + 1.0])
+    team = np.array([7, 5, 9, 6, 1, 1, 9])
+    columns = {"x": x, "bbox": bbox, "team": team}
+    tid, frames, cols, interpolated = fill_gaps(track_id, frame_index, columns, max_gap=3)
+
+    np.testing.assert_array_equal(tid, [1, 1, 1, 2, 2, 2, 2, 2, 2, 2])
+    np.testing.assert_array_equal(frames, [3, 4, 5, 0, 1, 2, 3, 4, 9, 14])
+    np.testing.assert_array_equal(interpolated, [0, 1, 0, 0, 1, 1, 1, 0, 0, 0])
+    np.testing.assert_allclose(cols["x"], [30, 40, 50, 0, 1, 2, 3, 4, 9, 14])
+    np.testing.assert_allclose(cols["bbox"][:, 1], cols["x"] + 1.0)
+    # Non-float columns repeat the row before the gap; the first duplicate row wins.
+    np.testing.assert_array_equal(cols["team"], [1, 1, 1, 5, 5, 5, 5, 7, 9, 9])
+
+
+def test_fill_gaps_handles_empty_and_single_rows():
+    for n in (0, 1):
+        tid, frames, cols, interpolated = fill_gaps(np.ones(n), np.arange(n), {"x": np.zeros(n)}, 3)
+        assert len(tid) == len(frames) == len(cols["x"]) == len(interpolated) == n
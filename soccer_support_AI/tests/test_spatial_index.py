@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from soccer.benchmarks.synthetic import synthetic_track_columns
+from soccer.core.spatial_index import IndexConfig, SpatialIndex, build_spatial_index
+from soccer.core.track_store import PROJECTED_COLUMNS
+
+
+@pytest.fixture(scope="module")
+def match(tmp_path_factory):
+    """An index over 200 frames with gaps, invalid rows and players beyond the grid."""
+    rng = np.random.default_rng(3)
+    columns = synthetic_track_columns(6000, tracks=30, seed=3)
+    keep = rng.random(len(columns["track_id"])) > 0.2
+    columns = {name: values[keep] for name, values in columns.items()}
+    columns["frame_index"] = columns["frame_index"] + 100
+    columns["valid"] = (rng.random(len(columns["track_id"])) > 0.1).astype(np.uint8)
+    stray = rng.random(len(columns["track_id"])) < 0.02
+    columns["pitch_x"][stray] = rng.choice([-30.0, 140.0], stray.sum())
+    path = tmp_path_factory.mktemp("index") / "index"
+    build_spatial_index(columns, path, PROJECTED_COLUMNS, IndexConfig(cell_size=7.0))
+    return columns, SpatialIndex(path)
+
+
+def _brute(columns, mask):
+    return np.flatnonzero(mask & (columns["valid"] != 0))
+
+
+def _window(columns, start, stop):
+    frames = columns["frame_index"]
+    lo = start if start is not None else -np.inf
+    hi = stop if stop is not None else np.inf
+    return (frames >= lo) & (frames < hi)
+
+
+def _same_rows(result, expected):
+    np.testing.assert_array_equal(np.sort(result["row"].to_numpy()), expected)
+
+
+def test_frame_and_track_queries_match_a_scan(match):
+    columns, index = match
+    assert len(index) == columns["valid"].sum()
+    for start, stop in [(100, 101), (150, 180), (0, 1000), (299, 400), (40, 60)]:
+        _same_rows(index.frames(start, stop), _brute(columns, _window(columns, start, stop)))
+    for track_id, start, stop in [(1, None, None), (7, 120, 160), (30, 250, None), (99, None, None)]:
+        expected = _brute(columns, (columns["track_id"] == track_id) & _window(columns, start, stop))
+        result = index.track(track_id, start, stop)
+        np.testing.assert_array_equal(result["row"], expected)  # in frame order
+        assert (np.diff(result["frame_index"]) > 0).all()
+
+
+def test_box_queries_match_a_scan(match):
+    columns, index = match
+    x, y = columns["pitch_x"], columns["pitch_y"]
+    boxes = [(10, 30, 5, 20), (0, 105, 0, 68), (-50, 0, -50, 100), (99, 200, 30, 31), (52, 52.5, 30, 40)]
+    for x_min, x_max, y_min, y_max in boxes:
+        inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+        for start, stop, track_id in [(None, None, None), (110, 130, None), (None, 200, 4)]:
+            mask = inside & _window(columns, start, stop)
+            if track_id is not None:
+                mask &= columns["track_id"] == track_id
+            result = index.within_box(x_min, x_max, y_min, y_max, start, stop, track_id)
+            _same_rows(result, _brute(columns, mask))
+
+
+def test_radius_and_nearest_queries_match_a_scan(match):
+    columns, index = match
+    frames = np.array([100, 150, 150, 299, 5])  # the last frame is not in the index
+    qx = np.array([50.0, 10.0, 90.0, 52.5, 50.0])
+    qy = np.array([30.0, 60.0, 5.0, 34.0, 30.0])
+    within = index.within_radius(frames, qx, qy, radius=15.0)
+    nearest = index.nearest(frames, qx, qy, k=3)
+    for q, (frame, px, py) in enumerate(zip(frames, qx, qy)):
+        rows = _brute(columns, columns["frame_index"] == frame)
+        distance = np.hypot(columns["pitch_x"][rows] - px, columns["pitch_y"][rows] - py)
+        hits = within[within["query"] == q]
+        _same_rows(hits, rows[distance <= 15.0])
+        closest = nearest[nearest["query"] == q]
+        np.testing.assert_array_equal(closest["row"], rows[np.argsort(distance)[:3]])
+        np.testing.assert_allclose(closest["distance"], np.sort(distance)[:3])
@@ -0,0 +1,40 @@
+import numpy as np
+
+from soccer.core.events import NO_TEAM
+from soccer.core.teams import ROLES, assign_roles, vote_tracks
+
+
+def test_votes_take_each_tracks_majority_and_break_ties_low():
+    track_id = np.array([2, 1, 3, 1, 2, 1])
+    labels = np.array([4, 3, 0, 2, 1, 2])
+    tracks, label = vote_tracks(track_id, labels)
+    np.testing.assert_array_equal(tracks, [1, 2, 3])
+    np.testing.assert_array_equal(label, [2, 1, 0])
+
+
+def _match_columns(positions, frames=5):
+    """Rows for every track at a fixed pitch x in each of ``frames`` frames."""
+    track_id = np.repeat(list(positions), frames)
+    frame_index = np.tile(np.arange(frames), len(positions))
+    pitch_x = np.repeat(list(positions.values()), frames)
+    return {"track_id": track_id, "frame_index": frame_index, "pitch_x": pitch_x}
+
+
+def test_roles_from_cluster_sizes_and_pitch_positions():
+    # Clusters 0 and 1 are the outfield kits; 2 holds both goalkeepers and 3 the referee.
+    tracks = np.arange(1, 10)
+    clusters = np.array([1, 1, 1, 0, 0, 0, 2, 3, 2])
+    positions = {1: 30.0, 2: 35.0, 3: 40.0, 4: 65.0, 5: 70.0, 6: 75.0, 7: 3.0, 8: 52.0, 9: 101.0}
+    labels = assign_roles(tracks, clusters, _match_columns(positions))
+
+    player, keeper, referee = (ROLES.index(r) for r in ("player", "goalkeeper", "referee"))
+    np.testing.assert_array_equal(labels.team, [1, 1, 1, 0, 0, 0, 1, NO_TEAM, 0])
+    np.testing.assert_array_equal(labels.role, [player] * 6 + [keeper, referee, keeper])
+    team, role = labels.lookup(np.array([9, 42, 1]))
+    np.testing.assert_array_equal(team, [0, NO_TEAM, 1])
+    np.testing.assert_array_equal(role, [keeper, ROLES.index("unknown"), player])
+
+    # Without pitch coordinates the non-team tracks stay unknown.
+    blind = assign_roles(tracks, clusters)
+    np.testing.assert_array_equal(blind.team, [1, 1, 1, 0, 0, 0, NO_TEAM, NO_TEAM, NO_TEAM])
+    np.testing.assert_array_equal(blind.role[6:], [ROLES.index("unknown")] * 3)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from soccer.core.events import ACTION_COLUMNS
+from soccer.core.vaep import VAEPConfig, vaep_features, vaep_labels
+
+
+def _actions(rows):
+    """Action table from ``(game_id, team, direction, type, start_x, end_x, goal)`` rows, 10 frames each."""
+    game, team, direction, kind, start_x, end_x, goal = map(list, zip(*rows))
+    action_id = pd.Series(game).groupby(game).cumcount().to_numpy()
+    frame = 10 * action_id
+    return pd.DataFrame(
+        {
+            "game_id": game,
+            "action_id": action_id,
+            "frame_start": frame,
+            "frame_end": frame + 10,
+            "track_id": team,
+            "team": team,
+            "direction": direction,
+            "type": kind,
+            "start_x": start_x,
+            "start_y": 34.0,
+            "end_x": end_x,
+            "end_y": 34.0,
+            "result": 1,
+            "goal": goal,
+        },
+        columns=list(ACTION_COLUMNS),
+    )
+
+
+ROWS = [
+    (0, 0, 1, "carry", 50.0, 60.0, 0),
+    (0, 0, 1, "shot", 60.0, 105.0, 1),  # team 0 scores
+    (0, 1, -1, "pass", 50.0, 40.0, 0),
+    (0, 1, -1, "shot", 40.0, 105.0, -1),  # own goal by team 1, so team 0 scores again
+    (0, 0, 1, "pass", 30.0, 35.0, 0),
+    (1, 1, -1, "carry", 80.0, 70.0, 0),
+    (1, 0, 1, "pass", 20.0, 25.0, 0),
+]
+
+
+def test_features_look_back_within_each_game_from_the_actors_side():
+    actions = _actions(ROWS)
+    # Shuffled input: features are index-aligned, not positional.
+    shuffled = actions.sample(frac=1.0, random_state=0)
+    features = vaep_features(shuffled).loc[actions.index]
+
+    # Team 1 attacks towards x = 0, so its actions are mirrored.
+    np.testing.assert_array_equal(features["start_x_a0"], [50, 60, 55, 65, 30, 25, 20])
+    # Previous actions are seen from the current actor's side too.
+    assert features.loc[2, "start_x_a1"] == 105 - 60 and features.loc[2, "same_team_a1"] == 0
+    # The first action of a game looks back at itself, never into the previous game.
+    first = features.loc[5]
+    assert first["start_x_a1"] == first["start_x_a0"] == first["start_x_a2"] == 25
+    assert first["time_delta_a1"] == 0 and first["same_team_a2"] == 1
+    assert features.loc[4, "type_pass_a0"] == 1 and features.loc[4, "type_shot_a1"] == 1
+    assert features.loc[4, "time_delta_a2"] == 20 / VAEPConfig().fps
+
+    # Score before each action, from the acting team's side; an own goal counts for the opponent.
+    np.testing.assert_array_equal(features["goalscore_team"], [0, 0, 0, 0, 2, 0, 0])
+    np.testing.assert_array_equal(features["goalscore_opponent"], [0, 0, 1, 1, 0, 0, 0])
+    np.testing.assert_array_equal(features["goalscore_diff"], [0, 0, -1, -1, 2, 0, 0])
+
+
+def test_labels_credit_own_goals_to_the_opponent():
+    labels = vaep_labels(_actions(ROWS), VAEPConfig(horizon=2))
+    np.testing.assert_array_equal(labels["scores"], [1, 1, 0, 0, 0, 0, 0])
+    np.testing.assert_array_equal(labels["concedes"], [0, 0, 1, 1, 0, 0, 0])
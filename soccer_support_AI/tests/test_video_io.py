@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+
+from soccer.core.types import Detection
+from soccer.core.video_io import iter_frames_prefetch, make_ingest
+
+
+class _Capture:
+    """A 64x48 source of ``frames`` frames filled with their index."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: 64, cv2.CAP_PROP_FRAME_HEIGHT: 48}.get(prop, 0)
+
+    def read(self, buf=None):
+        if self.index >= self.frames:
+            return False, None
+        if buf is None:
+            buf = np.empty((48, 64, 3), np.uint8)
+        buf[...] = self.index
+        self.index += 1
+        return True, buf
+
+
+def test_unconfigured_ingest_reads_into_pooled_buffers():
+    cap = _Capture(20)
+    ingest = make_ingest(cap, None, pool_size=6)
+    assert ingest.identity and ingest.output_size == (64, 48)
+    pooled = ingest._frames.buffers
+    seen = 0
+    for frame_idx, frame in iter_frames_prefetch(cap, prefetch=2, ingest=ingest):
+        assert any(np.shares_memory(frame, buf) for buf in pooled)
+        assert frame.shape == (48, 64, 3) and np.all(frame == frame_idx)
+        seen += 1
+    assert seen == 20
+    detections = [Detection((1.5, 2.0, 10.0, 20.0), 0.9, 0)]
+    assert ingest.map_detections(detections) == detections
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from soccer.core.calibration import camera_homography
+from soccer.core.homography import HomographySequence
+from soccer.core.warp import ProjectionConfig, project_track_arrays
+
+IMAGE_SIZE = (1280, 720)
+
+
+def _players_in_view(H_pitch_to_image):
+    """Feet of a grid of on-pitch players that land inside the frame, as bboxes."""
+    x, y = np.meshgrid(np.linspace(5, 100, 20), np.linspace(5, 63, 12))
+    pitch = np.column_stack([x.ravel(), y.ravel()])
+    q = np.column_stack([pitch, np.ones(len(pitch))]) @ H_pitch_to_image.T
+    feet = q[:, :2] / q[:, 2:3]
+    w, h = IMAGE_SIZE
+    inside = (q[:, 2] > 0) & (feet[:, 0] >= 0) & (feet[:, 0] < w) & (feet[:, 1] >= 0) & (feet[:, 1] < h)
+    feet, pitch = feet[inside], pitch[inside]
+    bbox = np.column_stack([feet[:, 0] - 10, feet[:, 1] - 60, feet[:, 0] + 10, feet[:, 1]])
+    return bbox, pitch
+
+
+def test_horizon_in_frame_keeps_on_pitch_players_valid():
+    H_pitch_to_image = camera_homography(IMAGE_SIZE, 0, 8, 40)
+    # With an 8 degree tilt the horizon (the vanishing point of +y) crosses the frame.
+    vanishing = H_pitch_to_image @ np.array([0.0, 1.0, 0.0])
+    assert 0 < vanishing[1] / vanishing[2] < IMAGE_SIZE[1]
+    bbox, expected = _players_in_view(H_pitch_to_image)
+    assert len(bbox) > 20
+    config = ProjectionConfig(image_size=IMAGE_SIZE)
+    H = np.linalg.inv(H_pitch_to_image)
+    for sign in (1.0, -1.0):
+        frames = np.zeros(len(bbox), dtype=np.int64)
+        pitch, valid = project_track_arrays(frames, bbox, sign * H, config, return_valid=True)
+        assert valid.all()
+        np.testing.assert_allclose(pitch, expected, atol=1e-6)
+
+
+def test_points_beyond_horizon_are_invalid():
+    H_pitch_to_image = camera_homography(IMAGE_SIZE, 0, 8, 40)
+    H = HomographySequence.static(np.linalg.inv(H_pitch_to_image))
+    # Top-row pixels look at the sky: their rays never meet the pitch.
+    bbox = np.array([[100.0, 0.0, 120.0, 2.0], [600.0, 0.0, 620.0, 1.0]])
+    _, valid = project_track_arrays(np.zeros(2), bbox, H, ProjectionConfig(image_size=IMAGE_SIZE), True)
+    assert not valid.any()
+
+
+def test_sequence_rejects_repeated_keyframes():
+    shifted = np.eye(3)
+    shifted[0, 2] = 8.0
+    mats = np.stack([np.eye(3), shifted, np.eye(3)])
+    with pytest.raises(ValueError, match=r"\[10\]"):
+        HomographySequence(np.array([0, 10, 10]), mats)
+    seq = HomographySequence(np.array([10, 0]), mats[:2])
+    np.testing.assert_allclose(seq.at([0, 5, 10, 20])[:, 0, 2], [8.0, 4.0, 0.0, 0.0])
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from soccer.core.metrics import ExpectedThreatTable
+from soccer.core.xt_training import XTConfig, fit_xt, save_xt_table
+
+
+def _actions(rows):
+    """Actions from ``(type, direction, start_x, end_x, result, goal)`` rows, all along y = 34."""
+    kind, direction, start_x, end_x, result, goal = map(list, zip(*rows))
+    return pd.DataFrame(
+        {
+            "type": kind,
+            "direction": direction,
+            "start_x": start_x,
+            "start_y": 34.0,
+            "end_x": end_x,
+            "end_y": 34.0,
+            "result": result,
+            "goal": goal,
+        }
+    )
+
+
+def test_xt_is_the_fixed_point_of_a_hand_solved_grid(tmp_path):
+    # Three 35 m cells along the pitch. Per cell (actions started there):
+    #   cell 2: two shots (one scored), a kept pass and a lost one -> xT2 = 1/4 + xT2 / 4
+    #   cell 1: two passes into cell 2, one back to cell 0, one lost -> xT1 = xT2 / 2 + xT0 / 4
+    #   cell 0: a carry into cell 1 and a lost pass                 -> xT0 = xT1 / 2
+    # so xT2 = 1/3, xT1 = 4/21 and xT0 = 2/21.
+    actions = _actions(
+        [
+            ("shot", 1, 90.0, 105.0, 0, 0),
+            ("shot", -1, 15.0, 0.0, 1, 1),  # attacking towards x = 0: mirrored into cell 2
+            ("pass", 1, 95.0, 80.0, 1, 0),
+            ("pass", 1, 80.0, 100.0, 0, 0),
+            ("pass", 1, 50.0, 75.0, 1, 0),
+            ("carry", -1, 60.0, 30.0, 1, 0),  # mirrored: x 45 -> 75
+            ("pass", 1, 60.0, 20.0, 1, 0),
+            ("pass", 1, 40.0, 60.0, 0, 0),
+            ("carry", 1, 10.0, 40.0, 1, 0),
+            ("pass", 1, 20.0, 90.0, 0, 0),
+        ]
+    )
+    config = XTConfig(nx=3, ny=1, tol=1e-12)
+    result = fit_xt(actions, config)
+    np.testing.assert_allclose(result.grid, [[2 / 21, 4 / 21, 1 / 3]], rtol=1e-9)
+    assert result.residual <= config.tol and result.iterations < config.max_iter
+
+    save_xt_table(result.grid, tmp_path / "xt.csv")
+    table = ExpectedThreatTable(str(tmp_path / "xt.csv"))
+    values = table.values_at(np.array([5.0, 50.0, 104.0]), np.array([1.0, 34.0, 67.0]))
+    np.testing.assert_allclose(values, [2 / 21, 4 / 21, 1 / 3])